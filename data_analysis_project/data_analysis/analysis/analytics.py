@@ -0,0 +1,292 @@
+# analysis/analytics.py
+# Rolling-window statistics and lagged cross-correlation between the GDP growth
+# and inflation series of one area, for any window and year range. Every window
+# is computed at once from cumulative sums (O(n) per series whatever the window),
+# and results are memoized per (area, series, window, range) in a process-local
+# LRU keyed on the source table's stamp, so a write makes old entries unreachable.
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from .charts import LAST_APARTHEID_YEAR
+from .columns import indicator_columns
+from .models import EconomicIndicator, Observation
+from .observations import SERIES_INDICATORS, area_series, home_area
+from .versioning import table_stamp
+
+DEFAULT_WINDOW = 10
+DEFAULT_MAX_LAG = 5
+MAX_LAG = 100
+DEFAULT_BREAKS = (LAST_APARTHEID_YEAR + 1,)  # the era split of apartheid_comparison
+MAX_BREAKS = 100
+# home-area series name -> EconomicIndicator column
+HOME_FIELDS = {"gdp": "gdp_zar_bn", "inflation": "inflation_rate"}
+
+def cache_size() -> int:
+    return getattr(settings, "ANALYSIS_ANALYTICS_CACHE_SIZE", 256)
+
+# ---------------- kernels ----------------
+def _window_sums(a: np.ndarray, window: int) -> np.ndarray:
+    """Sum of every full window of `a` (len(a) - window + 1 values) from one cumulative sum."""
+    c = np.concatenate(([0.0], np.cumsum(a)))
+    return c[window:] - c[:-window]
+
+def rolling_moments(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Mean and sample standard deviation (ddof=1) of every full window of `x`."""
+    x = np.asarray(x, dtype=np.float64)
+    if window < 2 or x.size < window:
+        return np.empty(0), np.empty(0)
+    shift = x.mean()  # centre first so the sum of squares doesn't cancel catastrophically
+    c = x - shift
+    s1, s2 = _window_sums(c, window), _window_sums(c * c, window)
+    var = (s2 - s1 * s1 / window) / (window - 1)
+    return s1 / window + shift, np.sqrt(np.clip(var, 0.0, None))
+
+def rolling_corr(x: np.ndarray, y: np.ndarray, window: int) -> np.ndarray:
+    """Pearson correlation of every full window of the aligned series; NaN where either is constant."""
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    if window < 2 or x.size < window:
+        return np.empty(0)
+    cx, cy = x - x.mean(), y - y.mean()
+    sx, sy = _window_sums(cx, window), _window_sums(cy, window)
+    sxy = _window_sums(cx * cy, window) - sx * sy / window
+    sxx = _window_sums(cx * cx, window) - sx * sx / window
+    syy = _window_sums(cy * cy, window) - sy * sy / window
+    denom = np.sqrt(np.clip(sxx, 0.0, None) * np.clip(syy, 0.0, None))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        corr = np.where(denom > 1e-12 * window, sxy / denom, np.nan)
+    return np.clip(corr, -1.0, 1.0)
+
+def _pearson(x: np.ndarray, y: np.ndarray) -> float:
+    if x.size < 3:
+        return float("nan")
+    cx, cy = x - x.mean(), y - y.mean()
+    denom = np.sqrt((cx * cx).sum() * (cy * cy).sum())
+    return float(np.clip((cx * cy).sum() / denom, -1.0, 1.0)) if denom > 0 else float("nan")
+
+def lagged_xcorr(x: np.ndarray, y: np.ndarray, max_lag: int) -> Dict[str, np.ndarray]:
+    """corr(x[t], y[t + lag]) for lag in -max_lag..max_lag, with the number of pairs behind each.
+
+    A positive lag means y follows x. Lags leaving fewer than 3 pairs are not
+    evaluated: max_lag is capped at len(x) - 3 (a series that short gets lag 0, NaN).
+    """
+    x, y = np.asarray(x, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    n = x.size
+    max_lag = min(max_lag, max(n - 3, 0))
+    lags = np.arange(-max_lag, max_lag + 1, dtype=np.int64)
+    corr = np.empty(lags.size)
+    for i, lag in enumerate(lags.tolist()):
+        a, b = (x[:n - lag], y[lag:]) if lag >= 0 else (x[-lag:], y[:n + lag])
+        corr[i] = _pearson(a, b)
+    return {"lag": lags, "corr": corr, "pairs": np.clip(n - np.abs(lags), 0, None)}
+
+def segment_bounds(years: np.ndarray, breaks: Sequence[int]) -> np.ndarray:
+    """Row offsets of the segments of year-ordered `years` split at `breaks` (sorted; each starts a segment).
+
+    Segment i is rows bounds[i]:bounds[i + 1]; there are len(breaks) + 1 of them.
+    """
+    return np.concatenate(([0], np.searchsorted(years, breaks, side="left"), [years.size])).astype(np.int64)
+
+def segment_stats(values: np.ndarray, bounds: np.ndarray) -> Dict[str, np.ndarray]:
+    """Mean, median, mode, min, max, range and std (population, as StatisticalSummary) of every segment.
+
+    Sums come from one prefix sum; medians, extremes and modes from one sort of
+    the values within their segments. Empty segments get NaN.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    counts = np.diff(bounds)
+    n, full = counts.size, counts > 0
+    seg = np.repeat(np.arange(n), counts)  # rows are already grouped by segment
+
+    shift = values.mean() if values.size else 0.0  # centred, as in rolling_moments
+    c = values - shift
+    p1 = np.concatenate(([0.0], np.cumsum(c)))
+    p2 = np.concatenate(([0.0], np.cumsum(c * c)))
+    s1, s2 = p1[bounds[1:]] - p1[bounds[:-1]], p2[bounds[1:]] - p2[bounds[:-1]]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = s1 / counts
+        std = np.sqrt(np.clip(s2 / counts - mean * mean, 0.0, None))
+    mean += shift
+
+    v = values[np.lexsort((values, seg))]  # ascending within each segment
+    first, last = bounds[:-1][full], bounds[1:][full] - 1
+    out = {name: np.full(n, np.nan) for name in ("median", "mode", "min", "max")}
+    out["median"][full] = (v[first + (counts[full] - 1) // 2] + v[first + counts[full] // 2]) / 2
+    out["min"][full], out["max"][full] = v[first], v[last]
+
+    # mode: the longest run of equal values in each segment; ties go to the smallest, like materialize.mode
+    new_run = np.ones(v.size, dtype=bool)
+    new_run[1:] = (v[1:] != v[:-1]) | (seg[1:] != seg[:-1])
+    run_start = np.flatnonzero(new_run)
+    run_len = np.diff(np.append(run_start, v.size))
+    run_seg = seg[run_start]
+    best = np.lexsort((run_start, -run_len, run_seg))
+    leader = np.ones(best.size, dtype=bool)
+    leader[1:] = run_seg[best][1:] != run_seg[best][:-1]
+    out["mode"][run_seg[best][leader]] = v[run_start[best][leader]]
+
+    return {"mean": np.where(full, mean, np.nan), **out, "range": out["max"] - out["min"],
+            "std": np.where(full, std, np.nan)}
+
+# ---------------- memo ----------------
+class LRUCache:
+    """A small thread-safe least-recently-used map; capacity is read from settings on every insert."""
+
+    def __init__(self, maxsize: Callable[[], int] = cache_size):
+        self._maxsize = maxsize
+        self._data: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = self.misses = 0
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+        value = compute()  # outside the lock: a slow computation doesn't block other keys
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > max(self._maxsize(), 0):
+                self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+memo = LRUCache()
+
+# ---------------- queries ----------------
+def int_param(get, name: str, default: Optional[int] = None) -> Optional[int]:
+    """GET parameter `name` as an int, `default` when absent; ValueError if it isn't a whole number."""
+    value = get.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+
+class AnalyticsQuery:
+    """Which area, series pair, window / lag and year range an analytics request is about."""
+
+    def __init__(self, area: Optional[str] = None, x: str = "gdp", y: str = "inflation",
+                 window: int = DEFAULT_WINDOW, max_lag: int = DEFAULT_MAX_LAG,
+                 start: Optional[int] = None, end: Optional[int] = None,
+                 breaks: Sequence[int] = DEFAULT_BREAKS):
+        for name, value in (("x", x), ("y", y)):
+            if value not in SERIES_INDICATORS:
+                raise ValueError(f"{name} must be one of {', '.join(SERIES_INDICATORS)}")
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        if not 0 <= max_lag <= MAX_LAG:
+            raise ValueError(f"max_lag must be between 0 and {MAX_LAG}")
+        if start is not None and end is not None and start > end:
+            raise ValueError("start must not be after end")
+        self.area = area or home_area()
+        self.x, self.y = x, y
+        self.window, self.max_lag = window, max_lag
+        self.start, self.end = start, end
+        self.breaks = tuple(sorted(set(breaks)))
+        if len(self.breaks) > MAX_BREAKS:
+            raise ValueError(f"at most {MAX_BREAKS} breaks")
+
+    @classmethod
+    def from_request(cls, request) -> "AnalyticsQuery":
+        """Parse ?area=&x=&y=&window=&max_lag=&start=&end=&breaks=; ValueError on bad input.
+
+        `breaks` is a comma-separated list of years, each starting a new period.
+        """
+        get = request.GET
+        breaks = [b.strip() for b in (get.get("breaks") or "").split(",") if b.strip()]
+        if not all(b.lstrip("-").isdigit() for b in breaks):
+            raise ValueError(f"breaks must be comma-separated years, got {get.get('breaks')!r}")
+        return cls(
+            area=(get.get("area") or "").strip().upper() or None,
+            x=get.get("x") or "gdp", y=get.get("y") or "inflation",
+            window=int_param(get, "window", DEFAULT_WINDOW), max_lag=int_param(get, "max_lag", DEFAULT_MAX_LAG),
+            start=int_param(get, "start"), end=int_param(get, "end"),
+            breaks=[int(b) for b in breaks] or DEFAULT_BREAKS,
+        )
+
+    def meta(self, *fields: str) -> Dict[str, Any]:
+        """The area and range, plus `fields`, echoed beside a response's data."""
+        return {name: getattr(self, name) for name in ("area", "start", "end") + fields}
+
+
+def _stamp(area: str):
+    return table_stamp(EconomicIndicator) if area == home_area() else table_stamp(Observation)
+
+def load_series(area: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """Year-ordered {years, gdp, inflation} arrays for `area`; years missing either value are dropped."""
+    if area != home_area():
+        s = area_series(area, start, end)
+        return {"years": np.array(s["years"], dtype=np.int64),
+                **{name: np.array(s[name], dtype=np.float64) for name in SERIES_INDICATORS}}
+    cols = indicator_columns()
+    mask = cols.mask(start, end)
+    for field in HOME_FIELDS.values():
+        mask &= ~np.isnan(cols[field])
+    return {"years": cols["year"][mask], **{name: cols[field][mask] for name, field in HOME_FIELDS.items()}}
+
+def _frozen(table: Dict[str, Any]) -> Dict[str, Any]:
+    for a in table.values():
+        if isinstance(a, np.ndarray):
+            a.flags.writeable = False  # memoized results are shared by every request in the process
+    return table
+
+def _memoized(key: Tuple, q: AnalyticsQuery, compute: Callable[[Dict[str, np.ndarray]], Dict]) -> Dict:
+    key = key + (q.area, q.start, q.end, _stamp(q.area))
+    return memo.get_or_compute(key, lambda: _frozen(compute(load_series(q.area, q.start, q.end))))
+
+def rolling(q: AnalyticsQuery) -> Dict[str, np.ndarray]:
+    """One row per full window: its first and last year, mean/std of x and y, and their correlation.
+
+    Windows count observations, so a gap in an area's years widens the span a window covers.
+    """
+    def compute(s):
+        x, y, w = s[q.x], s[q.y], q.window
+        x_mean, x_std = rolling_moments(x, w)
+        y_mean, y_std = rolling_moments(y, w)
+        n = x_mean.size
+        return {"start_year": s["years"][:n].copy(), "end_year": s["years"][w - 1:w - 1 + n].copy(),
+                "x_mean": x_mean, "x_std": x_std, "y_mean": y_mean, "y_std": y_std,
+                "corr": rolling_corr(x, y, w)}
+    return _memoized(("rolling", q.x, q.y, q.window), q, compute)
+
+def xcorr(q: AnalyticsQuery) -> Dict[str, np.ndarray]:
+    """Lagged cross-correlation of x against y over the query's range."""
+    return _memoized(("xcorr", q.x, q.y, q.max_lag), q, lambda s: lagged_xcorr(s[q.x], s[q.y], q.max_lag))
+
+def periods(q: AnalyticsQuery) -> Dict[str, Any]:
+    """One row per segment between the query's breakpoints, with segment_stats() of every series.
+
+    Only breaks inside (start, end] split the range, and segments with no years are left out.
+    """
+    def compute(s):
+        breaks = [b for b in q.breaks if (q.start is None or b > q.start) and (q.end is None or b <= q.end)]
+        bounds = segment_bounds(s["years"], breaks)
+        starts = [q.start] + breaks
+        ends = [b - 1 for b in breaks] + [q.end]
+        counts = np.diff(bounds)
+        keep = np.flatnonzero(counts)
+        starts, ends = [starts[i] for i in keep.tolist()], [ends[i] for i in keep.tolist()]
+        table = {
+            "segment": tuple(f"{'' if a is None else a}-{'' if b is None else b}" for a, b in zip(starts, ends)),
+            "start_year": tuple(starts), "end_year": tuple(ends),
+            "years_count": counts[keep],
+        }
+        for name in SERIES_INDICATORS:
+            table.update({f"{name}_{stat}": v[keep] for stat, v in segment_stats(s[name], bounds).items()})
+        return table
+    return _memoized(("periods", q.breaks), q, compute)
@@ -0,0 +1,87 @@
+# analysis/async_views.py
+# Async (ASGI) twins of the read-only JSON endpoints, mounted under api/async/.
+# They read through the async cache/ORM APIs, so under ASGI a request waiting on
+# SQLite doesn't hold a worker thread, and dashboard_data answers every section in
+# one round-trip. The async ORM runs each query via sync_to_async(thread_sensitive=True),
+# so the queries behind its asyncio.gather still execute one after another on a
+# single thread: the one response saves client round-trips, not query time.
+import asyncio
+
+from . import endpoints
+from .columns import aindicator_columns
+from .models import EconomicIndicator, Observation, VolatilityAnalysis
+from .observations import aarea_series, era_comparison, requested_area
+from .renderers import FastJsonResponse, render_options, shape_table, table_response
+from .versioning import versioned
+
+async def _rows(qs) -> list:
+    return [r async for r in qs]
+
+def _no_area(area: str) -> FastJsonResponse:
+    return FastJsonResponse({'error': f"No observations for area {area}."}, status=404)
+
+@versioned(EconomicIndicator, Observation)
+async def apartheid_comparison(request):
+    area = requested_area(request)
+    if area:
+        rows = era_comparison(await aarea_series(area))
+        return table_response(request, rows) if rows else _no_area(area)
+    return table_response(request, endpoints.era_comparison_rows(await aindicator_columns()))
+
+@versioned(VolatilityAnalysis, EconomicIndicator)
+async def high_volatility_years(request):
+    return table_response(request, await _rows(endpoints.high_volatility_qs()))
+
+@versioned(EconomicIndicator)
+async def performance_summary(request):
+    return table_response(request, endpoints.performance_table(await aindicator_columns()))
+
+@versioned(EconomicIndicator)
+async def recent_trends(request):
+    return table_response(request, endpoints.recent_table(await aindicator_columns()))
+
+@versioned(VolatilityAnalysis, EconomicIndicator)
+async def outlier_years(request):
+    return table_response(request, await _rows(endpoints.outliers_qs()))
+
+@versioned(EconomicIndicator)
+async def avg_by_era(request):
+    return table_response(request, endpoints.avg_by_era_rows(await aindicator_columns()))
+
+@versioned(EconomicIndicator, Observation)
+async def series_economic(request):
+    area = requested_area(request)
+    if area:
+        series = await aarea_series(area)
+        return FastJsonResponse(series) if series['years'] else _no_area(area)
+    return FastJsonResponse(endpoints.series_payload(await aindicator_columns()))
+
+@versioned(EconomicIndicator, VolatilityAnalysis, Observation)
+async def dashboard_data(request):
+    """Every section above in one response, keyed by endpoint name; ?area= scopes the series."""
+    try:
+        layout, digits = render_options(request)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    area = requested_area(request)
+    cols, volatility, outliers, area_data = await asyncio.gather(
+        aindicator_columns(),
+        _rows(endpoints.high_volatility_qs()),
+        _rows(endpoints.outliers_qs()),
+        aarea_series(area) if area else asyncio.sleep(0, result=None),
+    )
+    if area and not area_data['years']:
+        return _no_area(area)
+
+    def shaped(table):
+        return shape_table(table, layout, digits)
+
+    return FastJsonResponse({
+        'apartheid_comparison': shaped(era_comparison(area_data) if area else endpoints.era_comparison_rows(cols)),
+        'high_volatility': shaped(volatility),
+        'performance_summary': shaped(endpoints.performance_table(cols)),
+        'recent_trends': shaped(endpoints.recent_table(cols)),
+        'outliers': shaped(outliers),
+        'avg_by_era': shaped(endpoints.avg_by_era_rows(cols)),
+        'series': area_data if area else endpoints.series_payload(cols),
+    })
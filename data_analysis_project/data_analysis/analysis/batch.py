@@ -0,0 +1,198 @@
+# analysis/batch.py
+# The StatisticalSummary / BricsComparison / volatility suite for every area in
+# Observation, behind `manage.py batch_analytics`. Observation is read once (from
+# the Parquet snapshot while it is fresh, see observations.observation_frame) into
+# (year, value) arrays ordered by area, indicator and year; the arrays go into one
+# shared-memory block that worker processes map instead of unpickling, and each
+# task names only a shard of areas by row offsets. Workers send back plain
+# tuples, which the parent turns into AreaSummary / AreaVolatility rows and writes
+# in one transaction.
+# Worker processes import this module before Django is set up (spawn start
+# method), so Django and the app's kernels are only imported inside functions.
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+TASKS_PER_WORKER = 4  # smaller shards even out areas with long and short histories
+Period = Tuple[str, Optional[int], Optional[int]]
+
+
+class SharedArrays:
+    """Named NumPy arrays copied into one shared-memory block; `spec` is what a worker needs to map them."""
+
+    def __init__(self, arrays: Dict[str, np.ndarray]):
+        layout, offset = [], 0
+        for name, a in arrays.items():
+            layout.append((name, a.dtype.str, a.shape, offset))
+            offset += -(-a.nbytes // 8) * 8  # keep every array 8-byte aligned
+        self.shm = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        self.spec = (self.shm.name, layout)
+        for (name, dtype, shape, start), a in zip(layout, arrays.values()):
+            np.ndarray(shape, dtype=dtype, buffer=self.shm.buf, offset=start)[...] = a
+
+    @staticmethod
+    def attach(spec) -> Tuple[shared_memory.SharedMemory, Dict[str, np.ndarray]]:
+        name, layout = spec
+        shm = shared_memory.SharedMemory(name=name)  # pool workers share the parent's resource tracker
+        arrays = {n: np.ndarray(shape, dtype=dtype, buffer=shm.buf, offset=start)
+                  for n, dtype, shape, start in layout}
+        for a in arrays.values():
+            a.flags.writeable = False
+        return shm, arrays
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+    def __enter__(self) -> "SharedArrays":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+# ---------------- per shard (runs in the workers) ----------------
+_shared: Dict[str, Any] = {}
+
+def _init_worker(spec) -> None:
+    import django
+    from django.apps import apps
+    if not apps.ready:  # spawned rather than forked
+        django.setup()
+    _shared["shm"], _shared["arrays"] = SharedArrays.attach(spec)
+
+def _run_shard(groups: np.ndarray, params: Dict[str, Any]):
+    return compute_shard(_shared["arrays"], groups, params)
+
+def _period_slices(years: np.ndarray, periods: Sequence[Period]) -> Tuple[np.ndarray, np.ndarray]:
+    lo = np.array([0 if s is None else np.searchsorted(years, s, side="left") for _, s, _ in periods])
+    hi = np.array([years.size if e is None else np.searchsorted(years, e, side="right") for _, _, e in periods])
+    return lo, np.maximum(hi, lo)
+
+def _count_within(years: np.ndarray, first: Optional[int], last: Optional[int]) -> int:
+    """How many of the sorted `years` fall in [first, last] (None: open-ended)."""
+    lo = 0 if first is None else np.searchsorted(years, first, side="left")
+    hi = years.size if last is None else np.searchsorted(years, last, side="right")
+    return int(max(hi - lo, 0))
+
+def yoy_changes(years: np.ndarray, values: np.ndarray) -> np.ndarray:
+    """Change from the previous year; NaN after a gap, as derived.recompute leaves it NULL."""
+    deltas = np.full(values.size, np.nan)
+    if values.size > 1:
+        consecutive = np.diff(years) == 1
+        deltas[1:][consecutive] = np.diff(values)[consecutive]
+    return deltas
+
+def compute_shard(arrays: Dict[str, np.ndarray], groups: np.ndarray, params: Dict[str, Any]):
+    """Statistics and volatility for each (group id, start row, end row) of `groups`.
+
+    Returns (summaries, flagged): summaries are (group, period index, sample size,
+    mean, median, mode, std, min, max, volatile years, outlier years) for periods
+    with data; flagged are (group, year, YoY change, z, is_outlier).
+    """
+    from .analytics import segment_stats
+    from .derived import rolling_zscores
+
+    periods, window, min_periods = params["periods"], params["window"], params["min_periods"]
+    flag_z, outlier_z = params["thresholds"]
+    summaries, flagged = [], []
+    for gid, start, end in groups.tolist():
+        years, values = arrays["year"][start:end], arrays["value"][start:end]
+        deltas = yoy_changes(years, values)
+        z = rolling_zscores(years, deltas, window, min_periods)
+        with np.errstate(invalid="ignore"):
+            hit, out = np.abs(z) >= flag_z, np.abs(z) >= outlier_z  # NaN (no score) compares False
+        hit_years, out_years = years[hit], years[out]
+        flagged += [(gid, *row) for row in
+                    zip(hit_years.tolist(), deltas[hit].tolist(), z[hit].tolist(), out[hit].tolist())]
+
+        lo, hi = _period_slices(years, periods)
+        parts = [values[a:b] for a, b in zip(lo, hi)]
+        stats = segment_stats(np.concatenate(parts), np.concatenate(([0], np.cumsum(hi - lo))))
+        for p, ((_, first, last), n) in enumerate(zip(periods, (hi - lo).tolist())):
+            if not n:
+                continue
+            moments = (float(stats[k][p]) for k in ("mean", "median", "mode", "std", "min", "max"))
+            summaries.append((gid, p, n, *moments, _count_within(hit_years, first, last),
+                              _count_within(out_years, first, last)))
+    return summaries, flagged
+
+# ---------------- the batch (runs in the parent) ----------------
+def periods() -> List[Period]:
+    """Whole history, the two eras (split as era_for_year does) and the BRICS windows."""
+    from .charts import LAST_APARTHEID_YEAR
+    from .materialize import brics_periods
+    from .pagination import ERAS
+    return ([("all", None, None), (ERAS[0], None, LAST_APARTHEID_YEAR), (ERAS[1], LAST_APARTHEID_YEAR + 1, None)]
+            + brics_periods())
+
+def shards(group_area: np.ndarray, offsets: np.ndarray, count: int) -> List[np.ndarray]:
+    """Split the groups into about `count` runs of similar row counts, never splitting an area."""
+    n = group_area.size
+    if not n:
+        return []
+    ids = np.arange(n)
+    area_end = np.flatnonzero(np.append(group_area[1:] != group_area[:-1], True)) + 1  # group index after each area
+    rows_before = offsets[area_end - 1, 1]  # rows up to the end of each area
+    targets = np.linspace(0, rows_before[-1], count + 1)[1:-1]
+    cuts = np.unique(area_end[np.searchsorted(rows_before, targets, side="left")])
+    table = np.column_stack((ids, offsets))
+    return [s for s in np.split(table, cuts[cuts < n]) if len(s)]
+
+def run_batch(workers: Optional[int] = None) -> Dict[str, Any]:
+    """Recompute AreaSummary and AreaVolatility for every area; returns counts for reporting.
+
+    workers=1 computes in this process (no pool, no shared memory).
+    """
+    from django.db import transaction
+
+    from .derived import volatility_min_periods, volatility_thresholds, volatility_window
+    from .models import AreaSummary, AreaVolatility
+    from .observations import observation_frame
+    from .versioning import bump_generation
+
+    workers = workers or os.cpu_count() or 1
+    df = observation_frame()
+    areas, indicators = df["ref_area"].to_numpy(dtype=object), df["indicator"].to_numpy(dtype=object)
+    arrays = {"year": df["year"].to_numpy(), "value": df["value"].to_numpy()}
+
+    # one group per (area, indicator) series: [start row, end row)
+    starts = np.flatnonzero(np.append(True, (areas[1:] != areas[:-1]) | (indicators[1:] != indicators[:-1])))
+    starts = starts[starts < len(df)]
+    offsets = np.column_stack((starts, np.append(starts[1:], len(df))[:starts.size])).astype(np.int64)
+    keys = [(areas[s], indicators[s]) for s in starts.tolist()]
+    params = {"periods": periods(), "window": volatility_window(), "min_periods": volatility_min_periods(),
+              "thresholds": volatility_thresholds()}
+    tasks = shards(np.array([a for a, _ in keys], dtype=object), offsets, workers * TASKS_PER_WORKER)
+
+    if workers == 1:
+        results = [compute_shard(arrays, t, params) for t in tasks]
+    else:
+        # workers never touch the database: everything they need is in the shared block
+        with SharedArrays(arrays) as shared, ProcessPoolExecutor(
+                workers, initializer=_init_worker, initargs=(shared.spec,)) as pool:
+            results = list(pool.map(_run_shard, tasks, repeat(params)))
+
+    summaries, volatility = [], []
+    for shard_summaries, shard_flagged in results:
+        for gid, p, n, mean, median, mode, std, lo, hi, vol, out in shard_summaries:
+            (area, indicator), (name, first, last) = keys[gid], params["periods"][p]
+            summaries.append(AreaSummary(
+                ref_area_id=area, indicator=indicator, period=name, start_year=first, end_year=last,
+                sample_size=n, mean_value=mean, median_value=median, mode_value=mode, std_dev=std,
+                min_value=lo, max_value=hi, volatile_years=vol, outlier_years=out))
+        volatility += [AreaVolatility(ref_area_id=keys[gid][0], indicator=keys[gid][1], year=year,
+                                      yoy_change=delta, z_score=z, is_outlier=outlier)
+                       for gid, year, delta, z, outlier in shard_flagged]
+
+    with transaction.atomic():
+        AreaSummary.objects.all().delete()
+        AreaVolatility.objects.all().delete()
+        AreaSummary.objects.bulk_create(summaries, batch_size=2000)
+        AreaVolatility.objects.bulk_create(volatility, batch_size=2000)
+        bump_generation(AreaSummary, AreaVolatility)
+    return {"observations": len(df), "series": len(keys), "areas": len({a for a, _ in keys}),
+            "summaries": len(summaries), "volatile": len(volatility), "workers": workers, "tasks": len(tasks)}
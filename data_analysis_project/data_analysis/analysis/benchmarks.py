@@ -0,0 +1,185 @@
+# analysis/benchmarks.py
+# Reproducible performance harness behind `manage.py benchmark_suite`. Each case
+# (a URL from analysis/urls.py, the CSV import/exports, the seed_db and
+# export_to_pandas commands) is run against a synthetic dataset at some
+# multiple of the real 63-row table and reported as latency (cold and warm),
+# query count and peak Python memory. Results are plain dicts, written as JSON
+# so runs from different releases can be compared.
+import contextlib
+import platform
+import re
+import tempfile
+import time
+import tracemalloc
+from io import StringIO
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+import django
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+
+from . import urls as analysis_urls
+from .charts import CHART_NAMES
+from .columns import forget_indicator_columns
+from .importers import FIRST_POST_APARTHEID_YEAR
+from .rankings import forget_ranking_index
+
+BASE_ROWS = 63          # 1961-2023, the embedded seed_db table
+FIRST_YEAR = 1961
+DEFAULT_SCALES = (1, 100, 10_000)
+ROUTE_ARGS = {"year": FIRST_YEAR, "name": CHART_NAMES[0]}  # fills <int:year>, <str:name>
+
+def host() -> str:
+    """A host the test client may use outside the test runner (ALLOWED_HOSTS or DEBUG's localhost)."""
+    return next((h.lstrip(".") for h in settings.ALLOWED_HOSTS if h != "*"), "localhost")
+
+# ---------------- synthetic data ----------------
+def synthetic_economic(rows: int, seed: int = 0) -> pd.DataFrame:
+    """`rows` consecutive years from 1961 with growth/inflation drawn around the real table's moments.
+
+    YoY columns are left blank: they are derived on write.
+    """
+    rng = np.random.default_rng(seed)
+    years = np.arange(FIRST_YEAR, FIRST_YEAR + rows, dtype=np.int64)
+    return pd.DataFrame({
+        "year": years,
+        "gdp_zar_bn": rng.normal(2.8, 2.4, rows).round(2),
+        "inflation_rate": rng.normal(8.0, 4.0, rows).clip(-50, 150).round(2),
+        "gdp_yoy_change": None,
+        "inflation_yoy_change": None,
+        "era": np.where(years >= FIRST_POST_APARTHEID_YEAR, "Post-Apartheid", "Apartheid"),
+    })
+
+def write_dataset(directory: Path, rows: int) -> Path:
+    """economic_indicators.csv in `directory`, the file name seed_db --source looks for."""
+    path = Path(directory) / "economic_indicators.csv"
+    synthetic_economic(rows).to_csv(path, index=False)
+    return path
+
+# ---------------- measuring ----------------
+def reset_caches() -> None:
+    # cold start: table generations, chart/panel payloads, the columnar copy and rankings all reload
+    cache.clear()
+    forget_indicator_columns()
+    forget_ranking_index()
+
+def measure(fn: Callable[[], Any], repeat: int = 3) -> Dict[str, Any]:
+    """Cold latency and queries, best warm latency over `repeat` runs, and cold peak traced memory."""
+    reset_caches()
+    with CaptureQueriesContext(connection) as cold_q:
+        t0 = time.perf_counter()
+        result = fn()
+        cold = time.perf_counter() - t0
+    queries = len(cold_q)  # count now: the next request resets the connection's query log
+    warm, warm_queries = float("inf"), 0
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as warm_q:
+            t0 = time.perf_counter()
+            fn()
+            warm = min(warm, time.perf_counter() - t0)
+        warm_queries = len(warm_q)
+    reset_caches()
+    tracemalloc.start()
+    try:
+        fn()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    out = {"cold_ms": round(cold * 1e3, 3), "warm_ms": round(warm * 1e3, 3),
+           "queries": queries, "warm_queries": warm_queries, "peak_kib": round(peak / 1024, 1)}
+    if isinstance(result, dict):
+        out.update(result)
+    return out
+
+# ---------------- cases ----------------
+def route_paths() -> Iterator[Tuple[str, str]]:
+    """(label, path) for every route in analysis/urls.py, converters filled from ROUTE_ARGS."""
+    for pattern in analysis_urls.urlpatterns:
+        if not isinstance(pattern, URLPattern):
+            continue
+        route = str(pattern.pattern)
+        path = "/" + re.sub(r"<(?:\w+:)?(\w+)>", lambda m: str(ROUTE_ARGS[m.group(1)]), route)
+        yield f"GET {path}", path
+
+def _get(client: Client, path: str) -> Callable[[], Dict[str, Any]]:
+    def run():
+        response = client.get(path)
+        body = b"".join(response.streaming_content) if response.streaming else response.content
+        return {"status": response.status_code, "bytes": len(body)}
+    return run
+
+def _import(client: Client, csv_bytes: bytes) -> Callable[[], Dict[str, Any]]:
+    def run():
+        upload = SimpleUploadedFile("economic_indicators.csv", csv_bytes, content_type="text/csv")
+        response = client.post(reverse("import_csv"), {"target_model": "economic", "csv_file": upload})
+        return {"status": response.status_code, "bytes": len(csv_bytes)}
+    return run
+
+def _command(name: str, *args, cwd: Optional[Path] = None) -> Callable[[], Dict[str, Any]]:
+    def run():
+        with contextlib.chdir(cwd) if cwd else contextlib.nullcontext():
+            call_command(name, *args, stdout=StringIO())
+    return run
+
+def cases(workdir: Path, client: Client) -> Iterator[Tuple[str, Callable[[], Any]]]:
+    """Everything the suite times, in order; seed_db comes first since it loads the dataset."""
+    csv_path = workdir / "economic_indicators.csv"
+    yield "command seed_db", _command("seed_db", "--source", str(workdir))
+    yield from ((label, _get(client, path)) for label, path in route_paths())
+    yield "POST import_csv (economic)", _import(client, csv_path.read_bytes())
+    out = workdir / "export_to_pandas"
+    out.mkdir(exist_ok=True)
+    yield "command export_to_pandas", _command("export_to_pandas", cwd=out)
+
+def run_scale(scale: int, repeat: int = 3, log: Callable[[str], None] = lambda s: None) -> List[Dict[str, Any]]:
+    """Run every case against BASE_ROWS * scale synthetic rows in the current database."""
+    rows = BASE_ROWS * scale
+    client = Client(raise_request_exception=False, HTTP_HOST=host())  # a failing view is a 500 result, not an abort
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        write_dataset(workdir, rows)
+        for label, fn in cases(workdir, client):
+            result = {"scale": scale, "rows": rows, "case": label, **measure(fn, repeat)}
+            results.append(result)
+            log(format_result(result))
+    return results
+
+def format_result(r: Dict[str, Any]) -> str:
+    return (f"{r['scale']:>6}x {r['case']:<46} {r['cold_ms']:>11,.1f} ms cold {r['warm_ms']:>11,.1f} ms warm "
+            f"{r['queries']:>4} q {r['peak_kib']:>11,.0f} KiB")
+
+def environment() -> Dict[str, Any]:
+    return {
+        "python": platform.python_version(), "django": django.get_version(),
+        "numpy": np.__version__, "pandas": pd.__version__,
+        "database": connection.vendor, "machine": platform.machine(),
+    }
+
+# ---------------- regressions ----------------
+def _key(r: Dict[str, Any]) -> Tuple[int, str]:
+    return r["scale"], r["case"]
+
+def compare(results: List[Dict[str, Any]], baseline: List[Dict[str, Any]],
+            tolerance: float = 1.5, floor_ms: float = 1.0) -> List[str]:
+    """Cases that got slower than `tolerance` x the baseline (ignoring sub-`floor_ms` noise) or run more queries."""
+    before = {_key(r): r for r in baseline}
+    problems = []
+    for r in results:
+        b = before.get(_key(r))
+        if b is None:
+            continue
+        if r["warm_ms"] > max(b["warm_ms"] * tolerance, b["warm_ms"] + floor_ms):
+            problems.append(f"{r['scale']}x {r['case']}: {b['warm_ms']:.1f} -> {r['warm_ms']:.1f} ms warm")
+        if r["queries"] > b["queries"]:
+            problems.append(f"{r['scale']}x {r['case']}: {b['queries']} -> {r['queries']} queries")
+    return problems
@@ -0,0 +1,50 @@
+# analysis/bootstrap.py
+# Everything the dashboard needs on first paint, in one response: chart payloads
+# and panel KPIs, split into sections that each carry the version of the tables
+# they read. A client that already holds a section at that version says so with
+# ?have=<section>@<version> and gets {"version": ..., "unchanged": true} back
+# instead of the data.
+from typing import Any, Callable, Dict, Iterable, Tuple
+
+from .charts import chart_payloads
+from .models import EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary
+from .panel import panel_data
+from .versioning import generations
+
+def _panel(*keys) -> Callable[[], Any]:
+    # one key -> that value; several -> a dict of them
+    if len(keys) == 1:
+        return lambda: panel_data()[keys[0]]
+    return lambda: {k: panel_data()[k] for k in keys}
+
+# section -> (tables it reads, payload builder)
+SECTIONS: Dict[str, Tuple[Tuple, Callable[[], Any]]] = {
+    "charts": ((EconomicIndicator,), chart_payloads),
+    "kpis": ((EconomicIndicator,), _panel("kpi_era", "best", "worst", "recent", "avg_by_era")),
+    "volatility": ((VolatilityAnalysis, EconomicIndicator), _panel("volatility")),
+    "brics": ((BricsComparison,), _panel("brics")),
+    "stats": ((StatisticalSummary,), _panel("stats")),
+}
+BOOTSTRAP_MODELS = (EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary)
+
+def section_version(name: str) -> str:
+    return ".".join(str(g) for g in generations(*SECTIONS[name][0]))
+
+def parse_have(values: Iterable[str]) -> Dict[str, str]:
+    """['charts@3', 'stats@1'] -> {'charts': '3', 'stats': '1'}; unknown or malformed entries are ignored."""
+    have = {}
+    for value in values:
+        name, sep, version = value.partition("@")
+        if sep and name in SECTIONS:
+            have[name] = version
+    return have
+
+def bootstrap_payload(have: Dict[str, str]) -> Dict[str, Any]:
+    sections = {}
+    for name, (_, build) in SECTIONS.items():
+        version = section_version(name)
+        if have.get(name) == version:
+            sections[name] = {"version": version, "unchanged": True}
+        else:
+            sections[name] = {"version": version, "data": build()}
+    return {"sections": sections}
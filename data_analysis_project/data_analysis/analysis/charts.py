@@ -0,0 +1,69 @@
+# analysis/charts.py
+# The dashboard's chart payloads, computed from EconomicIndicator with NumPy
+# (same maths as python_analytics/falang.ipynb, which used to export them to
+# static/*.json). Payloads are cached per data version.
+from typing import Dict, Any, Optional
+
+import numpy as np
+from django.core.cache import cache
+
+from .columns import indicator_columns
+from .importers import FIRST_POST_APARTHEID_YEAR
+from .models import EconomicIndicator
+from .versioning import data_version
+
+CHART_CACHE_PREFIX = "analysis:charts"
+CHART_CACHE_TIMEOUT = 60 * 60 * 24
+CHART_NAMES = ("scatter", "line", "gdpMean", "bar", "bar_extremes")
+EXTREME_COLORS = ['#66b3ff', '#ff9999', '#99ff99', '#ffcc99']
+LAST_APARTHEID_YEAR = FIRST_POST_APARTHEID_YEAR - 1
+
+def _era_label(year) -> str:
+    return 'Pre-Apartheid' if year <= LAST_APARTHEID_YEAR else 'Post-Apartheid'
+
+def _mean(a: np.ndarray) -> Optional[float]:
+    return float(a.mean()) if a.size else None
+
+def _shares(pair) -> list:
+    # pie/doughnut slices: each era's mean as a % of the two means combined
+    if None in pair or not sum(pair):
+        return [None, None]
+    total = sum(pair)
+    return [round(x / total * 100, 1) for x in pair]
+
+def load_arrays():
+    cols = indicator_columns()
+    return cols['year'], cols['gdp_zar_bn'], cols['inflation_rate']
+
+def build_payloads(years: np.ndarray, gdp: np.ndarray, infl: np.ndarray) -> Dict[str, Any]:
+    pre = years <= LAST_APARTHEID_YEAR
+    gdp_means = [_mean(gdp[pre]), _mean(gdp[~pre])]
+    infl_means = [_mean(infl[pre]), _mean(infl[~pre])]
+
+    payloads = {
+        "scatter": {"gdp": gdp.tolist(), "inflation": infl.tolist()},
+        "line": {"years": years[1:].tolist(), "gdp": np.diff(gdp).tolist(), "inflation": np.diff(infl).tolist()},
+        "gdpMean": {"gdp_mean": _shares(gdp_means), "infl_mean": _shares(infl_means)},
+        "bar": {"bar_gdp": gdp_means, "bar_inflation": infl_means},
+        "bar_extremes": {"labels": [], "values": [], "colors": EXTREME_COLORS},
+    }
+    if years.size:
+        picks = [
+            ("Best GDP", gdp, int(np.argmax(gdp))),
+            ("Worst GDP", gdp, int(np.argmin(gdp))),
+            ("Best Inflation", infl, int(np.argmin(infl))),
+            ("Worst Inflation", infl, int(np.argmax(infl))),
+        ]
+        payloads["bar_extremes"]["labels"] = [
+            f"{label}\n({years[i]}, {_era_label(years[i])})" for label, _, i in picks
+        ]
+        payloads["bar_extremes"]["values"] = [float(series[i]) for _, series, i in picks]
+    return payloads
+
+def chart_payloads() -> Dict[str, Any]:
+    key = f"{CHART_CACHE_PREFIX}:{data_version(EconomicIndicator)}"
+    payloads = cache.get(key)
+    if payloads is None:
+        payloads = build_payloads(*load_arrays())
+        cache.set(key, payloads, CHART_CACHE_TIMEOUT)
+    return payloads
@@ -0,0 +1,132 @@
+# analysis/columns.py
+# Process-local columnar copy of EconomicIndicator: one contiguous NumPy array per
+# column, loaded with a single query and reloaded only when the table's generation
+# moves. Read endpoints slice it with boolean masks instead of querying SQLite and
+# converting Decimals row by row.
+import threading
+from typing import Any, Dict, List, Optional, Sequence
+
+import numpy as np
+
+from .models import EconomicIndicator
+from .versioning import atable_stamp, table_stamp
+
+FIELDS = ("year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change", "inflation_yoy_change", "era")
+FLOAT_FIELDS = FIELDS[1:5]
+
+# NumPy twins of panel.growth_label / panel.inflation_label
+def growth_categories(gdp: np.ndarray) -> np.ndarray:
+    return np.select([np.isnan(gdp), gdp > 3, gdp >= 0],
+                     ["Unknown", "High Growth", "Moderate Growth"], "Recession/Decline")
+
+def inflation_categories(infl: np.ndarray) -> np.ndarray:
+    return np.select([np.isnan(infl), infl < 3, infl <= 6],
+                     ["Unknown", "Low Inflation", "Target Range"], "High Inflation")
+
+
+def _rows_qs():
+    return EconomicIndicator.objects.order_by("year").values_list(*FIELDS)
+
+
+class IndicatorColumns:
+    """EconomicIndicator as parallel arrays ordered by year; NaN where a value is NULL."""
+
+    def __init__(self, stamp, data: Dict[str, np.ndarray]):
+        self.stamp = stamp
+        self.data = data
+        for name, arr in data.items():
+            arr.flags.writeable = False  # shared by every request in the process
+
+    @classmethod
+    def load(cls, stamp=None) -> "IndicatorColumns":
+        return cls.from_rows(stamp, list(_rows_qs()))
+
+    @classmethod
+    async def aload(cls, stamp=None) -> "IndicatorColumns":
+        return cls.from_rows(stamp, [r async for r in _rows_qs()])
+
+    @classmethod
+    def from_rows(cls, stamp, rows: List[tuple]) -> "IndicatorColumns":
+        data = {"year": np.array([r[0] for r in rows], dtype=np.int64)}
+        for i, name in enumerate(FLOAT_FIELDS, start=1):
+            data[name] = np.array([r[i] for r in rows], dtype=np.float64)  # Decimal/None -> float/NaN
+        data["era"] = np.array([r[5] for r in rows], dtype=str) if rows else np.array([], dtype=str)
+        return cls(stamp, data)
+
+    def __len__(self) -> int:
+        return self.data["year"].size
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.data[name]
+
+    def mask(self, start: Optional[int] = None, end: Optional[int] = None, era: Optional[str] = None) -> np.ndarray:
+        m = np.ones(len(self), dtype=bool)
+        if start is not None:
+            m &= self.data["year"] >= start
+        if end is not None:
+            m &= self.data["year"] <= end
+        if era is not None:
+            m &= self.data["era"] == era
+        return m
+
+    def table(self, fields: Sequence[str], mask: Optional[np.ndarray] = None, reverse: bool = False,
+              extra: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, np.ndarray]:
+        """Struct-of-arrays slice {field: array}, plus any `extra` arrays aligned with the rows."""
+        sources = {f: self.data[f] for f in fields}
+        sources.update(extra or {})
+        out = {}
+        for name, a in sources.items():
+            a = a if mask is None else a[mask]
+            out[name] = np.ascontiguousarray(a[::-1] if reverse else a)
+        return out
+
+    def era_summary(self) -> List[Dict[str, Any]]:
+        """Per-era count / mean / best / worst, ordered by era like the SQL GROUP BY."""
+        gdp, infl, era = self.data["gdp_zar_bn"], self.data["inflation_rate"], self.data["era"]
+        out = []
+        for name in np.unique(era).tolist():
+            m = era == name
+            out.append({
+                "era": name,
+                "years_count": int(m.sum()),
+                "mean_gdp": float(gdp[m].mean()),
+                "mean_inflation": float(infl[m].mean()),
+                "best_gdp": float(gdp[m].max()),
+                "worst_gdp": float(gdp[m].min()),
+            })
+        return out
+
+
+# ---------------- process-local cache ----------------
+_current: Optional[IndicatorColumns] = None
+_lock = threading.Lock()
+
+def indicator_columns() -> IndicatorColumns:
+    """The current columns, reloading (once, under a lock) after the table's generation moves."""
+    global _current
+    # generation plus its timestamp, so a reset DataGeneration row can't alias an old load
+    stamp = table_stamp(EconomicIndicator)
+    cols = _current
+    if cols is None or cols.stamp != stamp:
+        with _lock:
+            cols = _current
+            if cols is None or cols.stamp != stamp:
+                cols = _current = IndicatorColumns.load(stamp)
+    return cols
+
+def forget_indicator_columns() -> None:
+    """Drop this process's copy; the next read reloads (benchmarks use it to measure cold reads)."""
+    global _current
+    _current = None
+
+async def aindicator_columns() -> IndicatorColumns:
+    """indicator_columns() for async views: a stale copy is reloaded through the async ORM.
+
+    Concurrent reloads on one event loop are harmless (last one wins, same data).
+    """
+    global _current
+    stamp = await atable_stamp(EconomicIndicator)
+    cols = _current
+    if cols is None or cols.stamp != stamp:
+        cols = _current = await IndicatorColumns.aload(stamp)
+    return cols
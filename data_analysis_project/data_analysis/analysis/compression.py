@@ -0,0 +1,136 @@
+# analysis/compression.py
+# Content-encoding for the data responses (api/* JSON and CSV exports) and for
+# collected static assets. gzip always works; brotli is used when the optional
+# `brotli` package is installed and the client accepts it.
+import gzip
+from typing import Iterable, Iterator, Optional
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import StaticFilesStorage
+from django.core.files.base import ContentFile
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+DEFAULT_PATHS = ("/api/", "/database/export/")
+DEFAULT_MIN_BYTES = 1024
+BROTLI_QUALITY = 5          # per response: cheap enough to run on every request
+PRECOMPRESS_EXTENSIONS = (".json", ".css", ".js", ".svg")
+
+_accepts = _lazy_re_compile(r"\b(br|gzip)\b")
+
+def compress_paths() -> tuple:
+    return tuple(getattr(settings, "ANALYSIS_COMPRESS_PATHS", DEFAULT_PATHS))
+
+def compress_min_bytes() -> int:
+    return getattr(settings, "ANALYSIS_COMPRESS_MIN_BYTES", DEFAULT_MIN_BYTES)
+
+def encodings() -> tuple:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """'br' if the client accepts it and brotli is installed, else 'gzip' if accepted, else None."""
+    offered = set(_accepts.findall(accept_encoding or ""))
+    return next((e for e in encodings() if e in offered), None)
+
+def encode(data: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=BROTLI_QUALITY)
+    return compress_string(data)
+
+def encode_sequence(chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+    if encoding != "br":
+        yield from compress_sequence(chunks)
+        return
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in chunks:
+        out = compressor.process(chunk)
+        if out:
+            yield out
+    yield compressor.finish()
+
+
+class CompressionMiddleware:
+    """Compress api/* and export responses over ANALYSIS_COMPRESS_MIN_BYTES.
+
+    Same rules as Django's GZipMiddleware (skip already-encoded responses, add
+    Vary: Accept-Encoding, weaken strong ETags since the bytes differ per
+    encoding), but scoped to the data paths and able to speak brotli.
+    Streaming exports have no length up front, so they are always compressed,
+    chunk by chunk.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.path.startswith(compress_paths()):
+            self.compress(request, response)
+        return response
+
+    def compress(self, request, response) -> None:
+        if response.has_header("Content-Encoding") or not 200 <= response.status_code < 300:
+            return
+        if not response.streaming and len(response.content) < compress_min_bytes():
+            return
+        patch_vary_headers(response, ("Accept-Encoding",))
+        encoding = choose_encoding(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        if encoding is None:
+            return
+
+        if response.streaming:
+            if response.is_async:
+                return  # async iterators would have to be buffered; leave them as they are
+            response.streaming_content = encode_sequence(response.streaming_content, encoding)
+            del response.headers["Content-Length"]
+        else:
+            compressed = encode(response.content, encoding)
+            if len(compressed) >= len(response.content):
+                return
+            response.content = compressed
+            response.headers["Content-Length"] = str(len(compressed))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = encoding
+
+
+# ---------------- static files ----------------
+def precompress(data: bytes) -> dict:
+    """{'.gz': ..., '.br': ...} at maximum effort; only done once, at collectstatic time."""
+    out = {".gz": gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        out[".br"] = brotli.compress(data, quality=11)
+    return out
+
+
+class PrecompressedStaticFilesStorage(StaticFilesStorage):
+    """collectstatic also writes <name>.gz (and <name>.br) next to each text asset.
+
+    The front server hands those out as-is (nginx `gzip_static on;` /
+    `brotli_static on;`, or WhiteNoise), so the stylesheet is never compressed
+    per request. A sibling is only kept when it is actually smaller.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+        for name in paths:
+            if not name.endswith(PRECOMPRESS_EXTENSIONS):
+                continue
+            with self.open(name) as f:
+                data = f.read()
+            for suffix, blob in precompress(data).items():
+                if len(blob) >= len(data):
+                    continue
+                if self.exists(name + suffix):
+                    self.delete(name + suffix)
+                self.save(name + suffix, ContentFile(blob))
+                yield name + suffix, name + suffix, True
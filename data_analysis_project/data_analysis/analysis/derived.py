@@ -0,0 +1,155 @@
+# analysis/derived.py
+# YoY deltas and volatility flags are derived from EconomicIndicator rather than
+# typed in. A write to year Y only changes the deltas of Y and Y+1, and a flag
+# only looks back over the previous `window` deltas, so recomputation touches the
+# slice [Y - window, Y + 1 + window] instead of the whole table.
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Set
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from .models import EconomicIndicator, VolatilityAnalysis
+from .versioning import bump_generation
+
+YOY_FIELDS = ("gdp_yoy_change", "inflation_yoy_change")
+# EconomicIndicator column -> its derived delta column
+DELTA_OF = {"gdp_zar_bn": "gdp_yoy_change", "inflation_rate": "inflation_yoy_change"}
+
+def volatility_window() -> int:
+    return getattr(settings, "ANALYSIS_VOLATILITY_WINDOW", 10)
+
+def volatility_min_periods() -> int:
+    return getattr(settings, "ANALYSIS_VOLATILITY_MIN_PERIODS", 5)
+
+def volatility_thresholds():
+    # (volatility_flag, is_outlier) cut-offs on |z|
+    return (getattr(settings, "ANALYSIS_VOLATILITY_Z", 2.0), getattr(settings, "ANALYSIS_OUTLIER_Z", 3.0))
+
+def _delta(value: Decimal, previous: Optional[Decimal]) -> Optional[Decimal]:
+    return None if previous is None else value - previous
+
+def rolling_zscore(years: np.ndarray, deltas: np.ndarray, targets: Iterable[int],
+                   window: int, min_periods: int) -> Dict[int, float]:
+    """z of each target year's delta against the deltas of the `window` years before it.
+
+    Years with too little history (or a flat window) get no score.
+    """
+    scores = {}
+    for t in targets:
+        i = int(np.searchsorted(years, t))
+        if i == years.size or years[i] != t or np.isnan(deltas[i]):
+            continue
+        lo = int(np.searchsorted(years, t - window))
+        history = deltas[lo:i]
+        history = history[~np.isnan(history)]
+        if history.size < min_periods:
+            continue
+        sd = history.std()
+        if sd > 0:
+            scores[t] = float((deltas[i] - history.mean()) / sd)
+    return scores
+
+def rolling_zscores(years: np.ndarray, deltas: np.ndarray, window: int, min_periods: int) -> np.ndarray:
+    """rolling_zscore() for every year at once (NaN where it gives no score).
+
+    Years are unique, so a history holds at most `window` rows: they are gathered
+    into one (years x window) matrix and reduced two-pass, like ndarray.std().
+    For batch runs over many series, where a loop per year dominates.
+    """
+    hi = np.arange(years.size)
+    lo = np.searchsorted(years, years - window, side="left")
+    idx = hi[:, None] - np.arange(1, window + 1)[None, :]  # the `window` rows before each year
+    safe = np.clip(idx, 0, None)
+    member = (idx >= lo[:, None]) & ~np.isnan(deltas[safe])
+    count = member.sum(axis=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mean = np.where(member, deltas[safe], 0.0).sum(axis=1) / count
+        sd = np.sqrt((np.where(member, deltas[safe] - mean[:, None], 0.0) ** 2).sum(axis=1) / count)
+        z = (deltas - mean) / sd
+    return np.where(~np.isnan(deltas) & (count >= min_periods) & (sd > 0), z, np.nan)
+
+def _note(z_gdp: Optional[float], z_infl: Optional[float], window: int) -> str:
+    parts = [f"{name} z={z:+.1f}" for name, z in (("GDP", z_gdp), ("inflation", z_infl)) if z is not None]
+    return f"Rolling {window}y z-score: " + ", ".join(parts)
+
+def recompute(years: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Recompute YoY deltas and volatility flags affected by writes to `years` (all when None).
+
+    Deltas are refreshed for Y and Y+1, flags for Y..Y+1+window; only rows whose
+    values actually change are written, with one bulk_update per table. Existing
+    VolatilityAnalysis rows keep their notes; newly flagged years get a row.
+    """
+    window, min_periods = volatility_window(), volatility_min_periods()
+    flag_z, outlier_z = volatility_thresholds()
+
+    qs = EconomicIndicator.objects.order_by("year")
+    delta_years: Optional[Set[int]] = None
+    flag_years: Optional[Set[int]] = None
+    if years is not None:
+        years = set(years)
+        if not years:
+            return {"yoy": 0, "volatility": 0}
+        delta_years = {y + k for y in years for k in (0, 1)}
+        flag_years = {y + k for y in years for k in range(window + 2)}
+        qs = qs.filter(year__gte=min(years) - window, year__lte=max(years) + window + 1)
+    rows: List[EconomicIndicator] = list(qs.only("id", "year", *DELTA_OF, *YOY_FIELDS))
+
+    # ---------------- YoY deltas ----------------
+    by_year = {r.year: r for r in rows}
+    changed = []
+    for r in rows:
+        if delta_years is not None and r.year not in delta_years:
+            continue
+        prev = by_year.get(r.year - 1)
+        dirty = False
+        for col, field in DELTA_OF.items():
+            value = _delta(getattr(r, col), getattr(prev, col) if prev else None)
+            if getattr(r, field) != value:
+                setattr(r, field, value)
+                dirty = True
+        if dirty:
+            changed.append(r)
+
+    # ---------------- volatility flags ----------------
+    year_arr = np.array([r.year for r in rows], dtype=np.int64)
+    targets = year_arr.tolist() if flag_years is None else sorted(flag_years & set(by_year))
+    scores = {}
+    for field in YOY_FIELDS:
+        deltas = np.array([np.nan if getattr(r, field) is None else float(getattr(r, field)) for r in rows],
+                          dtype=np.float64)
+        scores[field] = rolling_zscore(year_arr, deltas, targets, window, min_periods)
+
+    # a year range rather than IN (...): a full recompute would exceed the database's bind-parameter limit
+    existing = {v.indicator_id: v for v in VolatilityAnalysis.objects.filter(
+        indicator_id__gte=targets[0], indicator_id__lte=targets[-1])} if targets else {}
+    to_update, to_create = [], []
+    for t in targets:
+        z_gdp, z_infl = scores["gdp_yoy_change"].get(t), scores["inflation_yoy_change"].get(t)
+        peak = max((abs(z) for z in (z_gdp, z_infl) if z is not None), default=0.0)
+        r = by_year[t]
+        values = dict(gdp_yoy_change=r.gdp_yoy_change, inflation_yoy_change=r.inflation_yoy_change,
+                      volatility_flag=peak >= flag_z, is_outlier=peak >= outlier_z)
+        v = existing.get(t)
+        if v is None:
+            if values["volatility_flag"]:
+                to_create.append(VolatilityAnalysis(indicator_id=t, notes=_note(z_gdp, z_infl, window), **values))
+            continue
+        if any(getattr(v, k) != val for k, val in values.items()):
+            for k, val in values.items():
+                setattr(v, k, val)
+            to_update.append(v)
+
+    with transaction.atomic():
+        if changed:
+            EconomicIndicator.objects.bulk_update(changed, list(YOY_FIELDS))
+            bump_generation(EconomicIndicator)
+        if to_update:
+            VolatilityAnalysis.objects.bulk_update(
+                to_update, [*YOY_FIELDS, "volatility_flag", "is_outlier"])
+        if to_create:
+            VolatilityAnalysis.objects.bulk_create(to_create)
+        if to_update or to_create:
+            bump_generation(VolatilityAnalysis)
+    return {"yoy": len(changed), "volatility": len(to_update) + len(to_create)}
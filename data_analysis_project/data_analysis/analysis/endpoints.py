@@ -0,0 +1,55 @@
+# analysis/endpoints.py
+# What each read-only JSON endpoint returns, independent of how it is served.
+# The sync views (views.py), their async twins (async_views.py) and the combined
+# dashboard endpoint all build their payloads here, so the shapes can't drift.
+from typing import Any, Dict, List
+
+from django.db.models import F
+
+from .columns import IndicatorColumns, growth_categories, inflation_categories
+from .models import VolatilityAnalysis
+from .panel import RECENT_SINCE
+
+# ---------------- from the indicator columns ----------------
+def era_comparison_rows(cols: IndicatorColumns) -> List[Dict[str, Any]]:
+    return cols.era_summary()
+
+def performance_table(cols: IndicatorColumns) -> Dict[str, Any]:
+    return cols.table(("year", "gdp_zar_bn", "inflation_rate", "era"), extra={
+        "growth_category": growth_categories(cols["gdp_zar_bn"]),
+        "inflation_category": inflation_categories(cols["inflation_rate"]),
+    })
+
+def recent_table(cols: IndicatorColumns) -> Dict[str, Any]:
+    return cols.table(("year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change"),
+                      mask=cols.mask(start=RECENT_SINCE), reverse=True)
+
+def avg_by_era_rows(cols: IndicatorColumns) -> List[Dict[str, Any]]:
+    return [{"era": e["era"], "avg_gdp": round(e["mean_gdp"], 2), "avg_inflation": round(e["mean_inflation"], 2)}
+            for e in cols.era_summary()]
+
+def series_payload(cols: IndicatorColumns) -> Dict[str, Any]:
+    return {"years": cols["year"], "gdp": cols["gdp_zar_bn"], "inflation": cols["inflation_rate"]}
+
+# ---------------- from VolatilityAnalysis (evaluate with list() or async for) ----------------
+def high_volatility_qs():
+    return (
+        VolatilityAnalysis.objects.filter(volatility_flag=True)
+        .values(
+            "gdp_yoy_change",
+            "inflation_yoy_change",
+            "notes",
+            year=F("indicator__year"),
+            gdp_zar_bn=F("indicator__gdp_zar_bn"),
+            era=F("indicator__era"),
+        )
+        .order_by("indicator__year")
+    )
+
+def outliers_qs():
+    return VolatilityAnalysis.objects.filter(is_outlier=True).values(
+        "gdp_yoy_change",
+        "inflation_yoy_change",
+        "notes",
+        year=F("indicator__year"),
+    ).order_by("indicator__year")
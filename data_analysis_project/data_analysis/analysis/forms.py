@@ -3,11 +3,11 @@ from django import forms
 from .models import EconomicIndicator
 
 class EconomicIndicatorForm(forms.ModelForm):
+    # YoY changes are derived from neighbouring years on save (analysis/derived.py)
     class Meta:
         model = EconomicIndicator
         fields = [
-            'year', 'gdp_zar_bn', 'inflation_rate',
-            'gdp_yoy_change', 'inflation_yoy_change', 'era',
+            'year', 'gdp_zar_bn', 'inflation_rate', 'era',
         ]
         widgets = {
             'era': forms.Select(choices=[('Apartheid','Apartheid'), ('Post-Apartheid','Post-Apartheid')])
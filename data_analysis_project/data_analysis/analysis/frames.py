@@ -0,0 +1,115 @@
+# analysis/frames.py
+# Typed pandas frames read straight off a DB cursor, and chunked writers for them.
+# Rows never become model instances or dicts, and Decimal columns arrive as
+# float64 rather than object dtype. Frames come one chunk at a time, so an export
+# of millions of observations holds one chunk in memory. Parquet/Feather output
+# needs the optional `pyarrow`; CSV works with pandas alone.
+import bz2
+import gzip
+import lzma
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional
+
+import pandas as pd
+from django.db import connections
+from django.db.models import TextField
+from django.db.models.functions import Cast
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+except ImportError:  # optional: Parquet / Feather output
+    pyarrow = None
+
+DEFAULT_CHUNK_SIZE = 50_000
+UTC = pd.DatetimeTZDtype(tz="UTC")
+
+FORMATS = {"csv": ".csv", "parquet": ".parquet", "feather": ".feather"}
+# format -> accepted compression codecs (first is the default)
+COMPRESSION = {
+    "csv": ("none", "gzip", "bz2", "xz"),
+    "parquet": ("snappy", "zstd", "gzip", "brotli", "lz4", "none"),
+    "feather": ("lz4", "zstd", "none"),
+}
+CSV_OPENERS = {"gzip": (gzip.open, ".gz"), "bz2": (bz2.open, ".bz2"), "xz": (lzma.open, ".xz")}
+
+# ---------------- reading ----------------
+def as_text(field: str) -> Cast:
+    """Select a datetime column as text, parsed by pandas per chunk instead of by the driver per row."""
+    return Cast(field, output_field=TextField())
+
+def _typed(df: pd.DataFrame, dtypes: Dict[str, object]) -> pd.DataFrame:
+    for col, dtype in dtypes.items():
+        # naive (SQLite) or offset (PostgreSQL) timestamps -> one UTC dtype
+        df[col] = pd.to_datetime(df[col], utc=True, format="ISO8601") if dtype == UTC else df[col].astype(dtype)
+    return df
+
+def iter_frames(qs, dtypes: Dict[str, object], chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """The rows of `qs` (a values_list over the keys of `dtypes`, in order) as typed DataFrames.
+
+    Runs on a chunked cursor (server-side on PostgreSQL); an empty result still
+    yields one empty, typed frame so writers can emit a header/schema.
+    """
+    names = list(dtypes)
+    sql, params = qs.query.sql_with_params()
+    empty = True
+    with connections[qs.db].chunked_cursor() as cursor:
+        cursor.execute(sql, params)
+        while rows := cursor.fetchmany(chunk_size):
+            empty = False
+            yield _typed(pd.DataFrame.from_records(rows, columns=names, coerce_float=True), dtypes)
+    if empty:
+        yield _typed(pd.DataFrame({name: [] for name in names}), dtypes)
+
+def read_frame(qs, dtypes: Dict[str, object], chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    return pd.concat(iter_frames(qs, dtypes, chunk_size), ignore_index=True)
+
+# ---------------- writing ----------------
+def output_path(directory: Path, stem: str, fmt: str, compression: Optional[str] = None) -> Path:
+    suffix = FORMATS[fmt] + (CSV_OPENERS[compression][1] if fmt == "csv" and compression in CSV_OPENERS else "")
+    return Path(directory) / f"{stem}{suffix}"
+
+def _require_pyarrow(fmt: str) -> None:
+    if pyarrow is None:
+        raise ImportError(f"{fmt} output needs pyarrow (pip install pyarrow)")
+
+def write_frames(frames: Iterable[pd.DataFrame], path: Path, fmt: str = "csv",
+                 compression: Optional[str] = None) -> int:
+    """Append each frame to `path` as it arrives; returns the number of rows written."""
+    compression = compression or COMPRESSION[fmt][0]
+    if compression not in COMPRESSION[fmt]:
+        raise ValueError(f"{fmt} compression must be one of {', '.join(COMPRESSION[fmt])}")
+    if fmt == "csv":
+        return _write_csv(frames, path, compression)
+    _require_pyarrow(fmt)
+    return _write_arrow(frames, path, fmt, None if compression == "none" else compression)
+
+def _write_csv(frames, path: Path, compression: str) -> int:
+    opener = CSV_OPENERS[compression][0] if compression in CSV_OPENERS else open
+    rows = 0
+    with opener(path, "wt", newline="", encoding="utf-8") as f:
+        for i, df in enumerate(frames):
+            # the values are UTC; naive timestamps format several times faster
+            naive = {c: df[c].dt.tz_localize(None) for c in df.columns if df[c].dtype == UTC}
+            df.assign(**naive).to_csv(f, header=i == 0, index=False)
+            rows += len(df)
+    return rows
+
+def _write_arrow(frames, path: Path, fmt: str, compression: Optional[str]) -> int:
+    writer, rows = None, 0
+    try:
+        for df in frames:
+            table = pyarrow.Table.from_pandas(df, preserve_index=False)
+            if writer is None:
+                if fmt == "parquet":
+                    writer = pyarrow.parquet.ParquetWriter(path, table.schema, compression=compression or "none")
+                else:  # Feather v2 is the Arrow IPC file format
+                    options = pyarrow.ipc.IpcWriteOptions(compression=compression)
+                    writer = pyarrow.ipc.new_file(path, table.schema, options=options)
+            writer.write_table(table)
+            rows += len(df)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
@@ -0,0 +1,237 @@
+# analysis/importers.py
+# Batched CSV import: rows are streamed from the upload, parsed, and written
+# chunk by chunk with one upsert (bulk_create(update_conflicts=True)) per chunk
+# instead of a SELECT + INSERT/UPDATE per line.
+import csv
+import time
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+
+from .models import (
+    EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary
+)
+from .derived import YOY_FIELDS
+from .materialize import schedule_refresh
+from .versioning import bump_generation
+
+DEFAULT_CHUNK_SIZE = 1000
+MAX_REPORTED_ERRORS = 5
+FIRST_POST_APARTHEID_YEAR = 1994  # the era cut-off everywhere an era is derived from a year
+
+def era_for_year(year: int) -> str:
+    return "Post-Apartheid" if year >= FIRST_POST_APARTHEID_YEAR else "Apartheid"
+
+def _dec(v):
+    return None if v in (None, '', 'NULL', 'null') else Decimal(v.replace(',', '.'))
+
+def _bool(v):
+    if isinstance(v, bool): return v
+    s = (v or '').strip().lower()
+    return s in ('1', 'true', 't', 'yes', 'y')
+
+
+class ImportReport:
+    def __init__(self, target: str):
+        self.target = target
+        self.inserted = 0
+        self.updated = 0
+        self.rejected = 0
+        self.duplicates = 0  # rows repeating an earlier key in the file; the last one wins
+        self.errors: List[str] = []
+        self.seconds = 0.0
+
+    @property
+    def rows(self) -> int:
+        return self.inserted + self.updated + self.rejected + self.duplicates
+
+    @property
+    def rows_per_sec(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def reject(self, line: int, reason) -> None:
+        self.rejected += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {line}: {reason}")
+
+    def summary(self) -> str:
+        duplicates = f", {self.duplicates} duplicate" if self.duplicates else ""
+        return (f"{self.inserted} inserted, {self.updated} updated, {self.rejected} rejected{duplicates} "
+                f"in {self.seconds:.2f}s ({self.rows_per_sec:,.0f} rows/s)")
+
+
+class ImportTarget:
+    """How one CSV flavour maps onto a model: required headers, upsert key and row parser."""
+
+    def __init__(self, model, label: str, required: Iterable[str], unique_fields: List[str],
+                 parse: Callable[[Dict[str, str]], Dict[str, Any]], derived: Iterable[str] = ()):
+        self.model = model
+        self.label = label
+        self.required = set(required)
+        self.unique_fields = unique_fields
+        self.parse = parse
+        # columns computed after the write (analysis/derived.py), never taken from the file
+        self.derived = set(derived)
+        self.not_null = {f.attname: f.name for f in model._meta.concrete_fields if not f.null}
+
+    @property
+    def update_fields(self) -> List[str]:
+        skip = {'created_at', *self.unique_fields, *self.derived}
+        return [f.name for f in self.model._meta.concrete_fields if not f.primary_key and f.name not in skip]
+
+    def parse_row(self, row: Dict[str, str]) -> Dict[str, Any]:
+        """Parsed values; ValueError for a blank value in a NOT NULL column, which would fail the whole chunk."""
+        values = self.parse(row)
+        missing = [self.not_null[k] for k, v in values.items() if v is None and k in self.not_null]
+        if missing:
+            raise ValueError(f"missing value for {', '.join(missing)}")
+        return values
+
+    def key(self, values: Dict[str, Any]) -> Tuple:
+        return tuple(values[self.model._meta.get_field(f).attname] for f in self.unique_fields)
+
+    def existing_keys(self, keys: List[Tuple]) -> set:
+        lookup = {f"{f}__in": {k[i] for k in keys} for i, f in enumerate(self.unique_fields)}
+        wanted = set(keys)
+        # composite keys: the IN lookups over-match, so intersect with what was asked for
+        return wanted & set(self.model.objects.filter(**lookup).values_list(*self.unique_fields))
+
+
+def _parse_economic(row):
+    year = int(row['year'])
+    return dict(
+        year=year,
+        gdp_zar_bn=_dec(row['gdp_zar_bn']),
+        inflation_rate=_dec(row['inflation_rate']),
+        era=row.get('era') or era_for_year(year),
+    )
+
+def _parse_volatility(row):
+    return dict(
+        # the FK targets EconomicIndicator.year, so the year *is* the related key
+        indicator_id=int(row['year']),
+        gdp_yoy_change=_dec(row['gdp_yoy_change']),
+        inflation_yoy_change=_dec(row['inflation_yoy_change']),
+        volatility_flag=_bool(row['volatility_flag']),
+        is_outlier=_bool(row['is_outlier']),
+        notes=row.get('notes', ''),
+    )
+
+def _parse_brics(row):
+    return dict(
+        period_type=row['period_type'],
+        start_year=int(row['start_year']),
+        end_year=int(row['end_year']),
+        mean_gdp_zar_bn=_dec(row['mean_gdp_zar_bn']),
+        median_inflation=_dec(row['median_inflation']),
+        gdp_range_min=_dec(row['gdp_range_min']),
+        gdp_range_max=_dec(row['gdp_range_max']),
+        inflation_mode=_dec(row['inflation_mode']),
+        insights=row.get('insights', ''),
+    )
+
+def _parse_stats(row):
+    return dict(
+        indicator=row['indicator'],
+        mean_value=_dec(row['mean_value']),
+        median_value=_dec(row['median_value']),
+        std_dev=_dec(row['std_dev']),
+        min_value=_dec(row['min_value']),
+        max_value=_dec(row['max_value']),
+        sample_size=int(row['sample_size']) if row.get('sample_size') else None,
+    )
+
+
+TARGETS = {
+    'economic': ImportTarget(
+        EconomicIndicator, "Economic",
+        {'year', 'gdp_zar_bn', 'inflation_rate'},
+        ['year'], _parse_economic, derived=YOY_FIELDS),
+    'volatility': ImportTarget(
+        VolatilityAnalysis, "Volatility",
+        {'year', 'gdp_yoy_change', 'inflation_yoy_change', 'volatility_flag', 'is_outlier', 'notes'},
+        ['indicator'], _parse_volatility),
+    'brics': ImportTarget(
+        BricsComparison, "BRICS",
+        {'period_type', 'start_year', 'end_year', 'mean_gdp_zar_bn', 'median_inflation',
+         'gdp_range_min', 'gdp_range_max', 'inflation_mode', 'insights'},
+        ['period_type', 'start_year', 'end_year'], _parse_brics),
+    'stats': ImportTarget(
+        StatisticalSummary, "Statistical Summary",
+        {'indicator', 'mean_value', 'median_value', 'std_dev', 'min_value', 'max_value', 'sample_size'},
+        ['indicator'], _parse_stats),
+}
+
+def import_chunk_size() -> int:
+    return getattr(settings, 'ANALYSIS_IMPORT_CHUNK_SIZE', DEFAULT_CHUNK_SIZE)
+
+def import_csv_stream(target: str, stream, chunk_size: Optional[int] = None) -> ImportReport:
+    """Upsert every row of a CSV text stream into the model behind `target`.
+
+    Malformed rows (and volatility rows for unknown years) are rejected and
+    counted rather than aborting the import; a bad header raises ValueError.
+    A key repeated within the file is written once, from its last row, and the
+    earlier rows are counted as duplicates.
+    """
+    spec = TARGETS.get(target)
+    if spec is None:
+        raise ValueError("Unknown target model for import.")
+    reader = csv.DictReader(stream)
+    if not spec.required.issubset(reader.fieldnames or []):
+        raise ValueError(f"{spec.label} CSV must have headers: {sorted(spec.required)}")
+
+    chunk_size = max(1, chunk_size or import_chunk_size())
+    report = ImportReport(target)
+    started = time.perf_counter()
+
+    # volatility rows hang off an indicator year: resolve them all in one query
+    known_years = None
+    if spec.model is VolatilityAnalysis:
+        known_years = set(EconomicIndicator.objects.values_list('year', flat=True))
+
+    written_years = set()
+    seen = set()  # every key written so far: a repeat in a later chunk is still a duplicate
+    rows = enumerate(reader, start=2)  # line 1 is the header
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        parsed: Dict[Tuple, Dict[str, Any]] = {}
+        for line, row in chunk:
+            try:
+                values = spec.parse_row(row)
+            except (KeyError, TypeError, ValueError, InvalidOperation) as e:
+                report.reject(line, e)
+                continue
+            if known_years is not None and values['indicator_id'] not in known_years:
+                report.reject(line, f"no economic indicator for year {values['indicator_id']}")
+                continue
+            key = spec.key(values)
+            if key in parsed or key in seen:
+                report.duplicates += 1
+            parsed[key] = values
+        if not parsed:
+            continue
+
+        fresh = [k for k in parsed if k not in seen]
+        existing = spec.existing_keys(fresh) if fresh else set()
+        spec.model.objects.bulk_create(
+            [spec.model(**values) for values in parsed.values()],
+            update_conflicts=True,
+            unique_fields=spec.unique_fields,
+            update_fields=spec.update_fields,
+        )
+        if spec.model is EconomicIndicator:
+            written_years.update(k[0] for k in parsed)
+        report.updated += len(existing)
+        report.inserted += len(fresh) - len(existing)
+        seen.update(fresh)
+
+    report.seconds = time.perf_counter() - started
+    if report.inserted or report.updated:
+        bump_generation(spec.model)
+    if written_years:
+        schedule_refresh(written_years)
+    return report
@@ -0,0 +1,204 @@
+# analysis/instrumentation.py
+# Opt-in per-request instrumentation (ANALYSIS_INSTRUMENTATION): wall time, DB
+# time, query count, duplicate queries and response size, keyed by URL name.
+# Each response reports its own numbers in a Server-Timing header; totals are
+# kept as Prometheus histograms in this process and served by /metrics.
+# SQL is attributed through a context variable rather than a wrapper on the
+# request thread's connection: async views run their queries on sync_to_async
+# executor threads, whose connections are wrapped when they open.
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 10 * 1024, 100 * 1024, 1024 ** 2, 10 * 1024 ** 2)
+UNRESOLVED = "<unresolved>"
+
+LOCAL_ADDRS = ("127.0.0.1", "::1")
+
+def enabled() -> bool:
+    return getattr(settings, "ANALYSIS_INSTRUMENTATION", False)
+
+def metrics_allowed(request) -> bool:
+    """/metrics answers loopback and INTERNAL_IPS only, and only while instrumentation is on."""
+    addr = request.META.get("REMOTE_ADDR")
+    return enabled() and (addr in LOCAL_ADDRS or addr in settings.INTERNAL_IPS)
+
+# ---------------- metrics ----------------
+def _fmt(value: float) -> str:
+    return "+Inf" if value == float("inf") else repr(value)
+
+def _labels(names: Sequence[str], values: Tuple[str, ...], **extra) -> str:
+    pairs = list(zip(names, values)) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n") for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Histogram:
+    """A labelled Prometheus histogram (cumulative buckets, _sum, _count)."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ("view",)):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(buckets) + (float("inf"),)
+        self._series: Dict[Tuple[str, ...], List] = {}  # labels -> [bucket counts, sum, count]
+
+    def observe(self, labels: Tuple[str, ...], value: float) -> None:
+        series = self._series.setdefault(labels, [[0] * len(self.buckets), 0.0, 0])
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[0][i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, n in zip(self.buckets, counts):
+                cumulative += n
+                lines.append(f"{self.name}_bucket{_labels(self.labelnames, labels, le=_fmt(bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_fmt(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {count}")
+        return lines
+
+
+class CounterMetric:
+    def __init__(self, name: str, help: str, labelnames: Sequence[str]):
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self._values: Counter = Counter()
+
+    def inc(self, labels: Tuple[str, ...], amount: int = 1) -> None:
+        self._values[labels] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, k)} {v}" for k, v in sorted(self._values.items())]
+        return lines
+
+
+class Registry:
+    """Everything /metrics reports; process-local, so each worker exposes its own."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = CounterMetric("analysis_requests_total", "Requests by URL name and status.", ("view", "status"))
+        self.duration = Histogram("analysis_request_duration_seconds", "Wall time in the view stack.", DURATION_BUCKETS)
+        self.db_duration = Histogram("analysis_db_duration_seconds", "Time spent executing SQL.", DURATION_BUCKETS)
+        self.queries = Histogram("analysis_db_queries", "SQL statements per request.", QUERY_BUCKETS)
+        self.duplicates = CounterMetric("analysis_db_duplicate_queries_total",
+                                        "Statements repeated verbatim (same SQL and params) within one request.",
+                                        ("view",))
+        self.size = Histogram("analysis_response_size_bytes", "Response body size (non-streaming responses).",
+                              SIZE_BUCKETS)
+
+    def record(self, view: str, status: int, sample: "RequestSample") -> None:
+        with self._lock:
+            self.requests.inc((view, str(status)))
+            self.duration.observe((view,), sample.wall)
+            self.db_duration.observe((view,), sample.db_time)
+            self.queries.observe((view,), sample.count)
+            if sample.duplicates:
+                self.duplicates.inc((view,), sample.duplicates)
+            if sample.size is not None:
+                self.size.observe((view,), sample.size)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = (self.requests, self.duration, self.db_duration, self.queries, self.duplicates, self.size)
+            return "\n".join(line for m in metrics for line in m.render()) + "\n"
+
+    def reset(self) -> None:
+        self.__init__()
+
+registry = Registry()
+
+# ---------------- per request ----------------
+class RequestSample:
+    """SQL seen while handling one request; also usable directly as an execute_wrapper."""
+
+    def __init__(self):
+        self.statements: Counter = Counter()
+        self.db_time = 0.0
+        self.wall = 0.0
+        self.size = None
+
+    def __call__(self, execute, sql, params, many, context):
+        t0 = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - t0
+            self.statements[(sql, repr(params))] += 1
+
+    @property
+    def count(self) -> int:
+        return sum(self.statements.values())
+
+    @property
+    def duplicates(self) -> int:
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def server_timing(self) -> str:
+        return (f'app;dur={self.wall * 1e3:.1f}, '
+                f'db;dur={self.db_time * 1e3:.1f};desc="{self.count} queries, {self.duplicates} duplicate"')
+
+
+_sample: ContextVar[Optional[RequestSample]] = ContextVar("analysis_request_sample", default=None)
+
+def _record_sql(execute, sql, params, many, context):
+    # on every connection: charge the statement to the request being served, whatever thread runs it
+    sample = _sample.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+    return sample(execute, sql, params, many, context)
+
+def install(connection, **kwargs) -> None:
+    """Add the SQL recorder to `connection` (once); connected to connection_created."""
+    if _record_sql not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_sql)
+
+
+class InstrumentationMiddleware:
+    """Times each request and its SQL; adds Server-Timing and feeds `registry`.
+
+    Removed from the stack at startup unless ANALYSIS_INSTRUMENTATION is on.
+    Streaming responses are timed up to the first byte and have no size.
+    """
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        connection_created.connect(install, dispatch_uid="analysis_instrumentation")
+
+    def __call__(self, request):
+        for conn in connections.all(initialized_only=True):  # opened before the receiver was connected
+            install(conn)
+        sample = RequestSample()
+        token = _sample.set(sample)
+        t0 = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _sample.reset(token)
+        sample.wall = time.perf_counter() - t0
+        if not response.streaming:
+            sample.size = len(response.content)
+
+        match = request.resolver_match
+        view = (match.view_name if match else None) or UNRESOLVED
+        if view != "metrics":
+            registry.record(view, response.status_code, sample)
+        response.headers["Server-Timing"] = sample.server_timing()
+        return response
@@ -0,0 +1,70 @@
+# analysis/management/commands/benchmark_json.py
+import json
+import time
+from decimal import Decimal
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+
+from analysis.renderers import dumps, orjson, quantize, to_rows
+
+FIELDS = ("year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change", "era")
+
+def synthetic_table(n: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    years = np.arange(n, dtype=np.int64)
+    gdp = rng.normal(2.5, 2.0, n)
+    return {
+        "year": years,
+        "gdp_zar_bn": gdp,
+        "inflation_rate": rng.normal(6.0, 3.0, n),
+        "gdp_yoy_change": np.concatenate([[np.nan], np.diff(gdp)]),
+        "era": np.where(years % 2, "Post-Apartheid", "Apartheid"),
+    }
+
+def legacy_rows(table: dict) -> list:
+    # what JsonResponse(list(qs)) used to get: dicts of Decimals
+    rows = to_rows(quantize(table, 2))
+    for r in rows:
+        for k in ("gdp_zar_bn", "inflation_rate", "gdp_yoy_change"):
+            r[k] = None if r[k] is None else Decimal(f"{r[k]:.2f}")
+    return rows
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+class Command(BaseCommand):
+    help = "Compare bytes and time per API response for each JSON backend, layout and quantization."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000],
+                            help="Table sizes to render (default 10000 100000).")
+        parser.add_argument("--repeat", type=int, default=5, help="Runs per case; the best is reported.")
+
+    def handle(self, *args, **options):
+        backends = ["json"] + (["orjson"] if orjson is not None else [])
+        for n in options["rows"]:
+            table = synthetic_table(n)
+            legacy = legacy_rows(table)
+            cases = [("DjangoJSONEncoder rows (before)", lambda: json.dumps(legacy, cls=DjangoJSONEncoder).encode())]
+            for using in backends:
+                for digits in (None, 2):
+                    q = "" if digits is None else f", {digits} digits"
+                    cases.append((f"{using} rows{q}",
+                                  lambda u=using, d=digits: dumps(to_rows(quantize(table, d)), using=u)))
+                    cases.append((f"{using} columns{q}",
+                                  lambda u=using, d=digits: dumps(table, d, using=u)))
+
+            self.stdout.write(f"\n{n:,} rows")
+            for label, fn in cases:
+                size = len(fn())
+                seconds = best_of(fn, options["repeat"])
+                self.stdout.write(f"  {label:<34} {size:>12,} bytes {seconds * 1e6:>14,.0f} µs")
+        self.stdout.write(self.style.SUCCESS("Benchmark finished."))
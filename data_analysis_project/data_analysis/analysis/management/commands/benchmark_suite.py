@@ -0,0 +1,55 @@
+# analysis/management/commands/benchmark_suite.py
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from analysis.benchmarks import DEFAULT_SCALES, compare, environment, run_scale
+
+
+class Command(BaseCommand):
+    help = ("Time every analysis URL, the CSV import/exports and the seed_db/export_to_pandas commands "
+            "against synthetic data at several multiples of the 63-row table; results go to JSON.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scales", type=int, nargs="+", default=list(DEFAULT_SCALES),
+                            help="Dataset sizes as multiples of 63 rows (default 1 100 10000).")
+        parser.add_argument("--repeat", type=int, default=3, help="Warm runs per case; the best is reported.")
+        parser.add_argument("--output", default="benchmark_results.json", help="Where to write the JSON results.")
+        parser.add_argument("--baseline", help="Earlier results JSON to compare against.")
+        parser.add_argument("--tolerance", type=float, default=1.5,
+                            help="Warm latency ratio over the baseline that counts as a regression (default 1.5).")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit with an error when the baseline comparison finds regressions.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())["results"]
+
+        # a throwaway database, so the real tables are never reseeded
+        old_name = connection.settings_dict["NAME"]
+        connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            env = environment()
+            results = []
+            for scale in options["scales"]:
+                results += run_scale(scale, options["repeat"], log=self.stdout.write)
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {"created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                  "environment": env, "repeat": options["repeat"], "results": results}
+        Path(options["output"]).write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Wrote {len(results)} results to {options['output']}."))
+
+        if baseline is not None:
+            problems = compare(results, baseline, options["tolerance"])
+            for p in problems:
+                self.stdout.write(self.style.WARNING(f"Regression: {p}"))
+            if problems and options["fail_on_regression"]:
+                raise CommandError(f"{len(problems)} regression(s) against {options['baseline']}.")
+            if not problems:
+                self.stdout.write(self.style.SUCCESS("No regressions against the baseline."))
@@ -0,0 +1,37 @@
+# analysis/management/commands/convert_worldbank.py
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.management.commands.ingest_worldbank import resolve_datasets
+from analysis.matrices import convert, matrix_paths
+from analysis.observations import matrix_dir
+
+
+class Command(BaseCommand):
+    help = ("Convert the wide World Bank CSVs into float64 area x year .npy matrices plus a JSON area index, "
+            "for memory-mapped loading (analysis.matrices.load_matrix).")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dataset", action="append", metavar="INDICATOR=PATH",
+            help="Indicator code and CSV path; repeatable. Defaults to settings.WORLD_BANK_DATASETS.",
+        )
+        parser.add_argument("--output-dir", help="Directory for the matrices (default: ANALYSIS_MATRIX_DIR).")
+
+    def handle(self, *args, **options):
+        out_dir = options.get("output_dir") or matrix_dir()
+        for indicator, path in resolve_datasets(options.get("dataset")).items():
+            if not path.exists():
+                raise CommandError(f"{path} not found")
+            t0 = time.perf_counter()
+            try:
+                matrix = convert(path, out_dir, indicator)
+            except ValueError as e:
+                raise CommandError(str(e))
+            npy, _ = matrix_paths(out_dir, indicator)
+            self.stdout.write(self.style.SUCCESS(
+                f"{indicator}: {len(matrix)} areas x {matrix.years.size} years "
+                f"({path.stat().st_size:,} -> {npy.stat().st_size:,} bytes) -> {npy} "
+                f"in {time.perf_counter() - t0:.2f}s"
+            ))
@@ -1,22 +1,80 @@
+# analysis/management/commands/export_to_pandas.py
+from pathlib import Path
+import time
 
-from django.core.management.base import BaseCommand
 import pandas as pd
-from analysis.models import EconomicIndicator, VolatilityAnalysis
+from django.core.management.base import BaseCommand, CommandError
 
-class Command(BaseCommand):
-    help = "Load DB tables into Pandas and export CSVs"
+from analysis.frames import (
+    COMPRESSION, DEFAULT_CHUNK_SIZE, FORMATS, UTC, as_text, iter_frames, output_path, write_frames
+)
+from analysis.models import EconomicIndicator, VolatilityAnalysis, Observation
+from analysis.pagination import ERAS
+
+ERA = pd.CategoricalDtype(ERAS)
+
+def economic():
+    dtypes = {"id": "int64", "year": "int32", "gdp_zar_bn": "float64", "inflation_rate": "float64",
+              "gdp_yoy_change": "float64", "inflation_yoy_change": "float64", "era": ERA, "created_at": UTC}
+    qs = EconomicIndicator.objects.order_by("year").values_list(*list(dtypes)[:-1], as_text("created_at"))
+    return qs, dtypes
+
+def volatility():
+    # indicator_id is the year itself (the FK targets EconomicIndicator.year), so no join
+    dtypes = {"year": "int32", "gdp_yoy_change": "float64", "inflation_yoy_change": "float64",
+              "volatility_flag": "bool", "is_outlier": "bool", "notes": "string"}
+    qs = VolatilityAnalysis.objects.order_by("indicator_id").values_list(
+        "indicator_id", *list(dtypes)[1:])
+    return qs, dtypes
 
-    def handle(self, *args, **kwargs):
-        ei = list(EconomicIndicator.objects.values())
-        va = list(VolatilityAnalysis.objects.values(
-            "indicator__year", "gdp_yoy_change", "inflation_yoy_change", "volatility_flag", "is_outlier", "notes"
-        ))
-        df_ei = pd.DataFrame(ei)
-        df_va = pd.DataFrame(va).rename(columns={"indicator__year": "year"})
+def observations():
+    # fixed category sets, so every chunk (and Arrow batch) shares one dictionary
+    areas = sorted(Observation.objects.values_list("ref_area_id", flat=True).distinct())
+    indicators = sorted(Observation.objects.values_list("indicator", flat=True).distinct())
+    dtypes = {"ref_area": pd.CategoricalDtype(areas), "indicator": pd.CategoricalDtype(indicators),
+              "year": "int32", "value": "float64"}
+    qs = Observation.objects.order_by("ref_area_id", "indicator", "year").values_list(
+        "ref_area_id", "indicator", "year", "value")
+    return qs, dtypes
 
-        df_ei.to_csv("economic_indicators.csv", index=False)
-        df_va.to_csv("volatility_analysis.csv", index=False)
+# table -> (file stem, queryset + dtypes builder); stems match what seed_db --source reads
+TABLES = {
+    "economic": ("economic_indicators", economic),
+    "volatility": ("volatility_analysis", volatility),
+    "observations": ("observations", observations),
+}
+
+
+class Command(BaseCommand):
+    help = ("Export tables as typed frames (float64/int32/category) read straight from the DB cursor, "
+            "written chunk by chunk to CSV, Parquet or Feather.")
 
-        self.stdout.write(self.style.SUCCESS(f"economic_indicators shape: {df_ei.shape}"))
-        self.stdout.write(self.style.SUCCESS(f"volatility_analysis shape: {df_va.shape}"))
+    def add_arguments(self, parser):
+        parser.add_argument("--tables", nargs="+", choices=list(TABLES), default=["economic", "volatility"],
+                            help="Tables to export (default economic volatility).")
+        parser.add_argument("--format", choices=list(FORMATS), default="csv",
+                            help="Output format; parquet and feather need pyarrow (default csv).")
+        parser.add_argument("--compression",
+                            help="Codec: " + "; ".join(f"{f}: {', '.join(c)}" for f, c in COMPRESSION.items())
+                                 + " (default: the first listed).")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Rows fetched and written per chunk (default {DEFAULT_CHUNK_SIZE}).")
+        parser.add_argument("--output-dir", default=".", help="Directory for the files (default: current).")
 
+    def handle(self, *args, **options):
+        fmt, compression = options["format"], options["compression"]
+        out_dir = Path(options["output_dir"])
+        out_dir.mkdir(parents=True, exist_ok=True)
+        for table in options["tables"]:
+            stem, build = TABLES[table]
+            qs, dtypes = build()
+            path = output_path(out_dir, stem, fmt, compression)
+            started = time.perf_counter()
+            try:
+                rows = write_frames(iter_frames(qs, dtypes, options["chunk_size"]), path, fmt, compression)
+            except (ImportError, ValueError) as e:
+                raise CommandError(str(e))
+            elapsed = time.perf_counter() - started
+            self.stdout.write(self.style.SUCCESS(
+                f"{table}: {rows:,} rows x {len(dtypes)} columns -> {path} in {elapsed:.2f}s"
+            ))
@@ -0,0 +1,118 @@
+# analysis/management/commands/ingest_worldbank.py
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from analysis.matrices import AREA_ID, AREA_NAME, convert, load_matrix, year_columns
+from analysis.models import Observation, RefArea
+from analysis.observations import matrix_dir
+from analysis.versioning import bump_generation
+
+def resolve_datasets(specs) -> dict:
+    """indicator -> CSV path from repeated INDICATOR=PATH specs, or settings.WORLD_BANK_DATASETS."""
+    if not specs:
+        return {k: Path(v) for k, v in settings.WORLD_BANK_DATASETS.items()}
+    datasets = {}
+    for spec in specs:
+        indicator, sep, path = spec.partition("=")
+        if not sep or not indicator or not path:
+            raise CommandError(f"--dataset expects INDICATOR=PATH, got {spec!r}")
+        datasets[indicator] = Path(path)
+    return datasets
+
+def iter_long_chunks(path: Path, chunksize: int):
+    """Yield (areas, years, values) arrays for each chunk of a wide World Bank CSV.
+
+    Only the area columns and the year block are read, with explicit dtypes, and
+    each chunk is unpivoted on its own so memory is bounded by `chunksize` rows.
+    """
+    years = year_columns(path)
+    if not years:
+        raise CommandError(f"{path} has no year columns")
+    dtypes = {AREA_ID: "string", AREA_NAME: "string", **{y: "float64" for y in years}}
+    year_ints = np.array(years, dtype=np.int32)
+
+    for chunk in pd.read_csv(path, usecols=[AREA_ID, AREA_NAME, *years], dtype=dtypes, chunksize=chunksize):
+        chunk = chunk[chunk[AREA_ID].notna()]
+        matrix = chunk[years].to_numpy()          # areas x years, NaN for gaps
+        rows, cols = np.nonzero(~np.isnan(matrix))
+        names = dict(zip(chunk[AREA_ID].to_numpy(), chunk[AREA_NAME].fillna("").to_numpy()))
+        yield names, chunk[AREA_ID].to_numpy()[rows], year_ints[cols], matrix[rows, cols]
+
+
+class Command(BaseCommand):
+    help = "Load the wide-format World Bank CSVs (GDP.csv, Inflation1.csv) for every area into Observation."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dataset", action="append", metavar="INDICATOR=PATH",
+            help="Indicator code and CSV path; repeatable. Defaults to settings.WORLD_BANK_DATASETS.",
+        )
+        parser.add_argument("--chunksize", type=int, default=100,
+                            help="CSV rows (areas) parsed per chunk (default 100).")
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Rows per bulk_create batch (default 5000).")
+        parser.add_argument("--convert", action="store_true",
+                            help="(Re)write the .npy matrices (manage.py convert_worldbank) first and read those.")
+        parser.add_argument("--snapshot", action="store_true",
+                            help="Publish a Parquet snapshot of Observation afterwards (needs pyarrow).")
+
+    def _chunks(self, indicator: str, path: Path, options):
+        """(source label, chunk iterator): a converted matrix of this CSV if there is one, else the CSV."""
+        try:
+            matrix = (convert(path, matrix_dir(), indicator) if options["convert"]
+                      else load_matrix(matrix_dir(), indicator))
+        except ValueError as e:
+            raise CommandError(str(e))
+        if matrix is not None and matrix.is_fresh(path):
+            return f"{indicator}.npy", matrix.iter_long_chunks(options["chunksize"])
+        return path.name, iter_long_chunks(path, options["chunksize"])
+
+    def handle(self, *args, **options):
+        datasets = resolve_datasets(options.get("dataset"))
+        for path in datasets.values():
+            if not path.exists():
+                raise CommandError(f"{path} not found")
+
+        total, started = 0, time.perf_counter()
+        for indicator, path in datasets.items():
+            loaded, t0 = 0, time.perf_counter()
+            source, chunks = self._chunks(indicator, path, options)
+            with transaction.atomic():
+                # full reload of this indicator: drop its old rows, then append chunk by chunk.
+                # A plain DELETE, since QuerySet.delete() would fetch and signal (post_delete in
+                # signals.py) each of tens of thousands of rows; the generation is bumped once below.
+                table, column = Observation._meta.db_table, Observation._meta.get_field("indicator").column
+                with connection.cursor() as cursor:
+                    cursor.execute(f"DELETE FROM {connection.ops.quote_name(table)} "
+                                   f"WHERE {connection.ops.quote_name(column)} = %s", [indicator])
+                for names, areas, years, values in chunks:
+                    RefArea.objects.bulk_create(
+                        [RefArea(code=c, name=n) for c, n in names.items()],
+                        update_conflicts=True, unique_fields=["code"], update_fields=["name"],
+                    )
+                    Observation.objects.bulk_create(
+                        [Observation(ref_area_id=a, indicator=indicator, year=int(y), value=float(v))
+                         for a, y, v in zip(areas, years, values)],
+                        batch_size=options["batch_size"],
+                    )
+                    loaded += len(values)
+            elapsed = time.perf_counter() - t0
+            self.stdout.write(f"{indicator}: {loaded} observations from {source} in {elapsed:.2f}s")
+            total += loaded
+
+        bump_generation(RefArea, Observation)
+        elapsed = time.perf_counter() - started
+        rate = total / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Ingested {total} observations for {RefArea.objects.count()} areas "
+            f"in {elapsed:.2f}s ({rate:,.0f} rows/s)."
+        ))
+        if options["snapshot"]:
+            call_command("snapshot_observations", stdout=self.stdout)
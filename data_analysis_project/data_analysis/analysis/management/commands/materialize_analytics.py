@@ -0,0 +1,21 @@
+# analysis/management/commands/materialize_analytics.py
+from django.core.management.base import BaseCommand
+
+from analysis.derived import recompute
+from analysis.materialize import refresh
+
+class Command(BaseCommand):
+    help = ("Recompute YoY deltas, volatility flags, StatisticalSummary and BricsComparison "
+            "from EconomicIndicator.")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--years", type=int, nargs="+",
+                            help="Only refresh what these years feed into (default: everything).")
+
+    def handle(self, *args, **options):
+        metrics = recompute(options.get("years"))
+        counts = refresh(options.get("years"))
+        self.stdout.write(self.style.SUCCESS(
+            f"Updated YoY for {metrics['yoy']} years and volatility for {metrics['volatility']} years; "
+            f"materialized {counts['stats']} statistical summaries and {counts['brics']} BRICS periods."
+        ))
@@ -0,0 +1,58 @@
+# analysis/management/commands/measure_compression.py
+from django.contrib.staticfiles import finders
+from django.core.management.base import BaseCommand
+from django.test import Client
+
+from analysis.benchmarks import host
+from analysis.charts import CHART_NAMES
+from analysis.compression import encodings, precompress
+
+PATHS = (
+    "/api/apartheid-comparison/", "/api/high-volatility/", "/api/performance-summary/", "/api/recent-trends/",
+    "/api/outliers/", "/api/avg-by-era/", "/api/series/economic/", "/api/indicators/", "/api/bootstrap/",
+    *(f"/api/charts/{name}/" for name in CHART_NAMES),
+    "/database/export/economic.csv", "/database/export/volatility.csv",
+    "/database/export/performance_summary.csv",
+)
+STATIC_FILES = ("css/dashboard.css",)
+
+def body(response) -> bytes:
+    return b"".join(response.streaming_content) if response.streaming else response.content
+
+
+class Command(BaseCommand):
+    help = "Bytes on the wire for the api/* and export responses, and the static assets, with and without compression."
+
+    def handle(self, *args, **options):
+        client = Client(HTTP_HOST=host())
+        encs = encodings()
+        self.stdout.write(f"{'':<42} {'identity':>10}" + "".join(f" {e:>10}" for e in encs))
+        totals = dict.fromkeys(("identity",) + encs, 0)
+        for url in PATHS:
+            sizes = {"identity": len(body(client.get(url, headers={"accept-encoding": "identity"})))}
+            for enc in encs:
+                sizes[enc] = len(body(client.get(url, headers={"accept-encoding": enc})))
+            self._row(url, sizes, totals)
+
+        for name in STATIC_FILES:
+            path = finders.find(name)
+            if path is None:
+                continue
+            with open(path, "rb") as f:
+                data = f.read()
+            # a sibling that isn't smaller is never written, so the file goes out as-is
+            packed = {s: min(len(b), len(data)) for s, b in precompress(data).items()}
+            sizes = {"identity": len(data), "gzip": packed[".gz"]}
+            if ".br" in packed:
+                sizes["br"] = packed[".br"]
+            self._row(f"static/{name}", sizes, totals)
+
+        self._row("total", totals, None)
+        saved = 1 - min(totals[e] for e in encs) / max(totals["identity"], 1)
+        self.stdout.write(self.style.SUCCESS(f"Compression saves {saved:.0%} of the bytes sent."))
+
+    def _row(self, label, sizes, totals):
+        self.stdout.write(f"{label:<42} " + " ".join(f"{sizes.get(k, 0):>10,}" for k in ("identity",) + encodings()))
+        if totals is not None:
+            for k, v in sizes.items():
+                totals[k] += v
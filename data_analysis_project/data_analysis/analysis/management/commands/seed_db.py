@@ -1,9 +1,13 @@
-
 # analysis/management/commands/seed_db.py
-from django.core.management.base import BaseCommand
 from decimal import Decimal
 from io import StringIO
-import csv
+from pathlib import Path
+import time
+
+import numpy as np
+import pandas as pd
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
 from analysis.models import (
     EconomicIndicator,
@@ -11,9 +15,22 @@ from analysis.models import (
     BricsComparison,
     StatisticalSummary,
 )
+from analysis.derived import recompute
+from analysis.importers import FIRST_POST_APARTHEID_YEAR
+from analysis.materialize import refresh
+from analysis.versioning import bump_generation
+
+ECONOMIC_COLUMNS = ["year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change", "inflation_yoy_change", "era"]
+VOLATILITY_COLUMNS = ["year", "gdp_yoy_change", "inflation_yoy_change", "volatility_flag", "is_outlier", "notes"]
+DECIMAL_COLUMNS = ["gdp_zar_bn", "inflation_rate", "gdp_yoy_change", "inflation_yoy_change"]
 
-def era_for_year(year: int) -> str:
-    return "Post-Apartheid" if year >= 1994 else "Apartheid"
+# file names looked up when --source is a directory (same names export_to_pandas writes)
+ECONOMIC_FILE = "economic_indicators.csv"
+VOLATILITY_FILE = "volatility_analysis.csv"
+
+def era_for_years(years: np.ndarray) -> np.ndarray:
+    # importers.era_for_year over an array
+    return np.where(years >= FIRST_POST_APARTHEID_YEAR, "Post-Apartheid", "Apartheid")
 
 # PASTE your full 1961–2023 dataset here as CSV.
 # Decimals can be with dots or commas; we normalize commas -> dots.
@@ -86,116 +103,149 @@ EMBEDDED_ECONOMIC_CSV = """year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflati
 
 """
 
-class Command(BaseCommand):
-    help = "Seed database with economic data (embedded CSV), plus Volatility, BRICS, and Statistical Summary."
-
-    def handle(self, *args, **kwargs):
-        # Reset tables so seeding is deterministic
-        VolatilityAnalysis.objects.all().delete()
-        EconomicIndicator.objects.all().delete()
-        BricsComparison.objects.all().delete()
-        StatisticalSummary.objects.all().delete()
-
-        # ---------- Economic Indicators from embedded CSV ----------
-        # strip comments & blanks
-        content_lines = [
-            line for line in EMBEDDED_ECONOMIC_CSV.splitlines()
-            if line.strip() and not line.strip().startswith("#")
-        ]
-        reader = csv.DictReader(StringIO("\n".join(content_lines)))
-
-        need = {"year","gdp_zar_bn","inflation_rate","gdp_yoy_change","inflation_yoy_change","era"}
-        if not reader.fieldnames or set(reader.fieldnames) != need:
-            self.stdout.write(self.style.ERROR(
-                "Embedded CSV header must be exactly:\n"
-                "year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflation_yoy_change,era"
-            ))
-            return
-
-        def dec(val):
-            if val is None:
-                return None
-            s = str(val).strip()
-            if s == "" or s.lower() in ("null","none"):
-                return None
-            # normalize decimal comma to dot
-            s = s.replace(",", ".")
-            return Decimal(s)
-
-        added = 0
-        for row in reader:
-            try:
-                year = int(row["year"])
-            except Exception:
-                continue
-            era = row.get("era") or era_for_year(year)
-            EconomicIndicator.objects.update_or_create(
-                year=year,
-                defaults=dict(
-                    gdp_zar_bn=dec(row["gdp_zar_bn"]),
-                    inflation_rate=dec(row["inflation_rate"]),
-                    gdp_yoy_change=dec(row["gdp_yoy_change"]),
-                    inflation_yoy_change=dec(row["inflation_yoy_change"]),
-                    era=era,
-                ),
-            )
-            added += 1
+# ---------- Volatility (sample — expand if you have more) ----------
+SAMPLE_VOLATILITY = pd.DataFrame(
+    [
+        (2008, "-1.23", "2.34", True, True, "Global Financial Crisis impact"),
+        (2020, "-2.45", "3.21", True, True, "COVID-19 pandemic impact"),
+        (2016, "0.56", "-1.78", False, False, "Stable growth period"),
+        (1985, "-2.10", "4.20", True, True, "Apartheid era instability"),
+        (2007, "5.60", "1.80", False, False, "Pre-crisis peak"),
+    ],
+    columns=VOLATILITY_COLUMNS,
+)
 
-        self.stdout.write(self.style.SUCCESS(f"Seeded EconomicIndicator rows: {added}"))
+def _to_number(col: pd.Series) -> pd.Series:
+    # decimals can be with dots or commas; normalize commas -> dots, blanks/"null" -> NaN
+    return pd.to_numeric(col.astype("string").str.strip().str.replace(",", ".", regex=False),
+                         errors="coerce")
+
+def _to_bool(col: pd.Series) -> pd.Series:
+    if col.dtype == bool:
+        return col
+    return col.astype("string").str.strip().str.lower().isin(["1", "true", "t", "yes", "y"])
+
+def _decimals(col: pd.Series, places: int = 2) -> list:
+    # quantize once per column; NaN becomes None for nullable fields
+    return [None if np.isnan(v) else Decimal(f"{v:.{places}f}") for v in col.to_numpy(dtype="float64")]
+
+def read_economic(source) -> pd.DataFrame:
+    df = pd.read_csv(source, usecols=lambda c: c in ECONOMIC_COLUMNS, dtype="string",
+                     comment="#", skip_blank_lines=True)
+    missing = set(ECONOMIC_COLUMNS[:-1]) - set(df.columns)
+    if missing:
+        raise CommandError(f"Economic CSV is missing columns: {sorted(missing)}")
+
+    years = pd.to_numeric(df["year"], errors="coerce")
+    df = df[years.notna()].copy()
+    df["year"] = years[years.notna()].astype("int64")
+    df = df.drop_duplicates("year", keep="last")
+    for c in DECIMAL_COLUMNS:
+        df[c] = _to_number(df[c])
+    df = df[df["gdp_zar_bn"].notna() & df["inflation_rate"].notna()]
+
+    derived = era_for_years(df["year"].to_numpy())
+    era = df["era"].fillna("").str.strip() if "era" in df else pd.Series("", index=df.index)
+    df["era"] = np.where(era.to_numpy() == "", derived, era.to_numpy())
+    return df
+
+def read_volatility(source) -> pd.DataFrame:
+    df = pd.read_csv(source, usecols=lambda c: c in VOLATILITY_COLUMNS, dtype="string")
+    missing = set(VOLATILITY_COLUMNS) - set(df.columns)
+    if missing:
+        raise CommandError(f"Volatility CSV is missing columns: {sorted(missing)}")
+    return df
 
-        # ---------- Volatility (sample — expand if you have more) ----------
-        vol_rows = [
-            (2008, "-1.23", "2.34", True, True, "Global Financial Crisis impact"),
-            (2020, "-2.45", "3.21", True, True, "COVID-19 pandemic impact"),
-            (2016, "0.56", "-1.78", False, False, "Stable growth period"),
-            (1985, "-2.10", "4.20", True, True, "Apartheid era instability"),
-            (2007, "5.60", "1.80", False, False, "Pre-crisis peak"),
-        ]
-        for y, gdp_yoy, infl_yoy, flag, outlier, notes in vol_rows:
-            ind = EconomicIndicator.objects.filter(year=y).first()
-            if not ind:
-                continue
-            VolatilityAnalysis.objects.update_or_create(
-                indicator=ind,
-                defaults=dict(
-                    gdp_yoy_change=Decimal(gdp_yoy.replace(",", ".")),
-                    inflation_yoy_change=Decimal(infl_yoy.replace(",", ".")),
-                    volatility_flag=flag,
-                    is_outlier=outlier,
-                    notes=notes,
-                ),
-            )
-
-        # ---------- BRICS (kept) ----------
-        BricsComparison.objects.create(
-            period_type="pre-brics",
-            start_year=1994, end_year=2009,
-            mean_gdp_zar_bn=Decimal("2345.67"),
-            median_inflation=Decimal("6.78"),
-            gdp_range_min=Decimal("1234.56"),
-            gdp_range_max=Decimal("3456.78"),
-            inflation_mode=Decimal("7.00"),
-            insights="GDP growth improved post-BRICS, inflation mixed",
-        )
-        BricsComparison.objects.create(
-            period_type="post-brics",
-            start_year=2010, end_year=2022,
-            mean_gdp_zar_bn=Decimal("4567.89"),
-            median_inflation=Decimal("4.56"),
-            gdp_range_min=Decimal("3456.78"),
-            gdp_range_max=Decimal("5678.90"),
-            inflation_mode=Decimal("4.00"),
-            insights="Higher GDP levels, more stable inflation post-BRICS membership",
-        )
 
-        # ---------- Statistical Summary (kept) ----------
-        StatisticalSummary.objects.create(
-            indicator="GDP (ZAR bn)", mean_value="3456.78", median_value="3400.00",
-            std_dev="789.12", min_value="987.65", max_value="5678.90", sample_size=63
+class Command(BaseCommand):
+    help = ("Seed database with economic data (embedded CSV or --source file/directory), "
+            "plus Volatility, BRICS, and Statistical Summary.")
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--source",
+            help=f"Economic CSV file, or a directory holding {ECONOMIC_FILE} "
+                 f"(and optionally {VOLATILITY_FILE}). Defaults to the embedded dataset.",
         )
-        StatisticalSummary.objects.create(
-            indicator="Inflation (%)", mean_value="6.78", median_value="6.50",
-            std_dev="2.34", min_value="2.00", max_value="12.34", sample_size=63
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Rows per bulk_create batch (default 5000).")
+
+    def _sources(self, source):
+        if not source:
+            return StringIO(EMBEDDED_ECONOMIC_CSV), None
+        path = Path(source)
+        if path.is_dir():
+            economic, volatility = path / ECONOMIC_FILE, path / VOLATILITY_FILE
+            if not economic.exists():
+                raise CommandError(f"{economic} not found")
+            return economic, (volatility if volatility.exists() else None)
+        if not path.exists():
+            raise CommandError(f"{path} not found")
+        return path, None
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        economic_src, volatility_src = self._sources(options.get("source"))
+        started = time.perf_counter()
+
+        econ = read_economic(economic_src)
+        vol = read_volatility(volatility_src) if volatility_src else SAMPLE_VOLATILITY.copy()
+
+        # Reset tables so seeding is deterministic. Plain DELETEs rather than
+        # QuerySet.delete(): the post_delete receivers in signals.py would make Django
+        # fetch every row, bump a generation per row and schedule a refresh of every
+        # old year. Generations are bumped and derived rows rebuilt once at the end.
+        with connection.cursor() as cursor:
+            for model in (VolatilityAnalysis, EconomicIndicator, BricsComparison, StatisticalSummary):
+                cursor.execute(f"DELETE FROM {connection.ops.quote_name(model._meta.db_table)}")
+
+        # ---------- Economic Indicators ----------
+        cols = {c: _decimals(econ[c]) for c in DECIMAL_COLUMNS}
+        EconomicIndicator.objects.bulk_create(
+            [
+                EconomicIndicator(year=int(y), era=e, **{c: cols[c][i] for c in DECIMAL_COLUMNS})
+                for i, (y, e) in enumerate(zip(econ["year"].to_numpy(), econ["era"].to_numpy()))
+            ],
+            batch_size=batch_size,
         )
+        added = len(econ)
+        self.stdout.write(self.style.SUCCESS(f"Seeded EconomicIndicator rows: {added}"))
 
-        self.stdout.write(self.style.SUCCESS("Seeded database successfully."))
+        # ---------- Volatility (only for years that were seeded) ----------
+        vol_years = pd.to_numeric(vol["year"], errors="coerce")
+        vol = vol[vol_years.isin(econ["year"])].copy()
+        vol["year"] = vol_years[vol.index].astype("int64")
+        vol = vol.drop_duplicates("year", keep="last")
+        vol_gdp = _decimals(_to_number(vol["gdp_yoy_change"]))
+        vol_infl = _decimals(_to_number(vol["inflation_yoy_change"]))
+        flags, outliers = _to_bool(vol["volatility_flag"]).to_numpy(), _to_bool(vol["is_outlier"]).to_numpy()
+        notes = vol["notes"].fillna("").to_numpy()
+        VolatilityAnalysis.objects.bulk_create(
+            [
+                VolatilityAnalysis(indicator_id=int(y), gdp_yoy_change=vol_gdp[i], inflation_yoy_change=vol_infl[i],
+                                   volatility_flag=bool(flags[i]), is_outlier=bool(outliers[i]), notes=notes[i])
+                for i, y in enumerate(vol["year"].to_numpy())
+            ],
+            batch_size=batch_size,
+        )
+        added += len(vol)
+
+        # ---------- YoY deltas + volatility flags, derived from the seeded years ----------
+        metrics = recompute()
+        self.stdout.write(self.style.SUCCESS(
+            f"Derived YoY for {metrics['yoy']} years and volatility for {metrics['volatility']} years"
+        ))
+
+        # ---------- BRICS + Statistical Summary, derived from what was just seeded ----------
+        derived = refresh()
+        self.stdout.write(self.style.SUCCESS(
+            f"Materialized {derived['stats']} statistical summaries and {derived['brics']} BRICS periods"
+        ))
+
+        bump_generation(EconomicIndicator, VolatilityAnalysis)
+        elapsed = time.perf_counter() - started
+        rate = added / elapsed if elapsed else 0.0
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded database successfully: {added} rows in {elapsed:.2f}s ({rate:,.0f} rows/s)."
+        ))
@@ -0,0 +1,33 @@
+# analysis/management/commands/snapshot_observations.py
+from pathlib import Path
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from analysis.observations import snapshot_dir
+from analysis.snapshots import DEFAULT_KEEP, DEFAULT_ROW_GROUP_SIZE, write_snapshot
+
+
+class Command(BaseCommand):
+    help = ("Write Observation to a Parquet snapshot partitioned by ref_area/indicator, with a manifest, "
+            "and publish it for the notebooks (snapshots.load) and bulk loads (needs pyarrow).")
+
+    def add_arguments(self, parser):
+        parser.add_argument("--root", help="Snapshot directory (default settings.ANALYSIS_SNAPSHOT_DIR).")
+        parser.add_argument("--row-group-size", type=int, default=DEFAULT_ROW_GROUP_SIZE,
+                            help=f"Years per Parquet row group (default {DEFAULT_ROW_GROUP_SIZE}).")
+        parser.add_argument("--keep", type=int, default=DEFAULT_KEEP,
+                            help=f"Snapshots to keep on disk, newest first (default {DEFAULT_KEEP}).")
+
+    def handle(self, *args, **options):
+        root = Path(options["root"]) if options["root"] else snapshot_dir()
+        started = time.perf_counter()
+        try:
+            manifest = write_snapshot(root, row_group_size=options["row_group_size"], keep=options["keep"])
+        except ImportError as e:
+            raise CommandError(str(e))
+        size = sum(p["bytes"] for p in manifest.partitions)
+        self.stdout.write(self.style.SUCCESS(
+            f"Snapshot {manifest.id}: {manifest.data['rows']:,} observations in {len(manifest.partitions)} "
+            f"partitions ({size / 1024:,.0f} KiB) under {root} in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,130 @@
+# analysis/materialize.py
+# StatisticalSummary and BricsComparison are derived tables: they are recomputed
+# here from EconomicIndicator (same statistics as jordan.ipynb / testingJ.ipynb)
+# whenever indicator years change, touching only the windows that contain them.
+import threading
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+
+from . import derived
+from .models import EconomicIndicator, BricsComparison, StatisticalSummary
+from .versioning import bump_generation
+
+# StatisticalSummary.indicator label -> EconomicIndicator column
+STAT_COLUMNS = {
+    "GDP (ZAR bn)": "gdp_zar_bn",
+    "Inflation (%)": "inflation_rate",
+}
+# (period_type, start_year, end_year), inclusive, as in jordan.ipynb
+DEFAULT_BRICS_PERIODS = [("pre-brics", 1990, 2010), ("post-brics", 2010, 2023)]
+
+def brics_periods() -> List[Tuple[str, int, int]]:
+    return [tuple(p) for p in getattr(settings, "ANALYSIS_BRICS_PERIODS", DEFAULT_BRICS_PERIODS)]
+
+def _dec(v) -> Optional[Decimal]:
+    return None if v is None or np.isnan(v) else Decimal(f"{v:.2f}")
+
+def mode(values: np.ndarray) -> float:
+    # most frequent value; ties go to the smallest, like pandas .mode()[0]
+    uniq, counts = np.unique(values, return_counts=True)
+    return float(uniq[np.argmax(counts)])
+
+def _columns(start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+    qs = EconomicIndicator.objects.all()
+    if start is not None:
+        qs = qs.filter(year__gte=start, year__lte=end)
+    rows = np.array(list(qs.values_list("gdp_zar_bn", "inflation_rate")), dtype=np.float64).reshape(-1, 2)
+    return {"gdp_zar_bn": rows[:, 0], "inflation_rate": rows[:, 1]}
+
+def statistical_summaries() -> List[StatisticalSummary]:
+    cols = _columns()
+    out = []
+    for label, col in STAT_COLUMNS.items():
+        v = cols[col]
+        if not v.size:
+            continue
+        out.append(StatisticalSummary(
+            indicator=label,
+            mean_value=_dec(v.mean()), median_value=_dec(np.median(v)), std_dev=_dec(v.std()),
+            min_value=_dec(v.min()), max_value=_dec(v.max()), sample_size=int(v.size),
+        ))
+    return out
+
+def brics_comparison(period_type: str, start: int, end: int) -> Optional[BricsComparison]:
+    cols = _columns(start, end)
+    gdp, infl = cols["gdp_zar_bn"], cols["inflation_rate"]
+    if not gdp.size:
+        return None
+    return BricsComparison(
+        period_type=period_type, start_year=start, end_year=end,
+        mean_gdp_zar_bn=_dec(gdp.mean()),
+        median_inflation=_dec(np.median(infl)),
+        gdp_range_min=_dec(gdp.min()),
+        gdp_range_max=_dec(gdp.max()),
+        inflation_mode=_dec(mode(infl)),
+        insights=(f"Mean GDP growth {gdp.mean():.2f}% over {gdp.size} years; "
+                  f"median inflation {np.median(infl):.2f}%."),
+    )
+
+def refresh(years: Optional[Iterable[int]] = None) -> Dict[str, int]:
+    """Recompute derived rows affected by `years` (everything when None).
+
+    StatisticalSummary spans every year, so any change recomputes it; BRICS rows
+    are only recomputed for periods whose window contains a changed year. A
+    recomputed indicator or period with no data left has its old row deleted.
+    """
+    years = None if years is None else set(years)
+    recompute_stats = years is None or bool(years)
+    stats = statistical_summaries() if recompute_stats else []
+    empty_stats = set(STAT_COLUMNS) - {s.indicator for s in stats} if recompute_stats else set()
+    periods = [p for p in brics_periods()
+               if years is None or any(p[1] <= y <= p[2] for y in years)]
+    computed = [(p, brics_comparison(*p)) for p in periods]
+    brics = [b for _, b in computed if b is not None]
+    empty_periods = [p for p, b in computed if b is None]
+
+    with transaction.atomic():
+        removed = 0
+        if empty_stats:
+            removed += StatisticalSummary.objects.filter(indicator__in=empty_stats).delete()[0]
+        for period_type, start, end in empty_periods:
+            removed += BricsComparison.objects.filter(
+                period_type=period_type, start_year=start, end_year=end).delete()[0]
+        if stats:
+            StatisticalSummary.objects.bulk_create(
+                stats, update_conflicts=True, unique_fields=["indicator"],
+                update_fields=["mean_value", "median_value", "std_dev", "min_value", "max_value", "sample_size"],
+            )
+        if brics:
+            BricsComparison.objects.bulk_create(
+                brics, update_conflicts=True, unique_fields=["period_type", "start_year", "end_year"],
+                update_fields=["mean_gdp_zar_bn", "median_inflation", "gdp_range_min", "gdp_range_max",
+                               "inflation_mode", "insights"],
+            )
+        if stats or brics or removed:
+            bump_generation(StatisticalSummary, BricsComparison)
+    return {"stats": len(stats), "brics": len(brics)}
+
+# ---------------- write-triggered refresh ----------------
+# Years written inside one transaction are coalesced and refreshed once, after commit:
+# first the per-year YoY/volatility columns (analysis/derived.py), then the summaries.
+_pending = threading.local()
+
+def _flush():
+    years = getattr(_pending, "years", None)
+    if years:
+        _pending.years = set()
+        derived.recompute(years)
+        refresh(years)
+
+def schedule_refresh(years: Iterable[int]) -> None:
+    if not getattr(settings, "ANALYSIS_MATERIALIZE_ON_WRITE", True):
+        return
+    if not hasattr(_pending, "years"):
+        _pending.years = set()
+    _pending.years.update(years)
+    transaction.on_commit(_flush)
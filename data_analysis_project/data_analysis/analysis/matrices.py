@@ -0,0 +1,147 @@
+# analysis/matrices.py
+# The wide World Bank CSVs (one row per area, ~23 metadata columns, one column
+# per year) converted once into a float64 area x year matrix (.npy, NaN for
+# gaps) plus a small JSON index of area codes, names and years:
+#
+#   <dir>/gdp.npy          float64[areas, years]
+#   <dir>/gdp.index.json   {"areas": [...], "names": [...], "years": [...], "source": ...}
+#
+# Loading memory-maps the .npy, so opening it costs nothing and a country row or
+# year range is a view into the page cache, not a copy. Like snapshots.py this
+# needs nothing from Django: notebooks can call load_matrix(directory, "gdp").
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+AREA_ID, AREA_NAME = "REF_AREA_ID", "REF_AREA_NAME"
+FORMAT_VERSION = 1
+INDEX_SUFFIX = ".index.json"
+
+def year_columns(path: Path) -> list:
+    # only the header is read; the ~20 metadata columns are never parsed
+    header = pd.read_csv(path, nrows=0).columns
+    return [c for c in header if c.isdigit()]
+
+def matrix_paths(directory, indicator: str) -> Tuple[Path, Path]:
+    directory = Path(directory)
+    return directory / f"{indicator}.npy", directory / f"{indicator}{INDEX_SUFFIX}"
+
+def _source_stamp(path: Path) -> Dict[str, int]:
+    st = path.stat()
+    return {"source_size": st.st_size, "source_mtime_ns": st.st_mtime_ns}
+
+
+class WideMatrix:
+    """A converted indicator: `values[i, j]` is area `areas[i]` in year `years[j]`."""
+
+    def __init__(self, values: np.ndarray, index: Dict):
+        self.values = values
+        self.index = index
+        self.areas = np.array(index["areas"], dtype=str)
+        self.years = np.array(index["years"], dtype=np.int64)
+        self.names = dict(zip(index["areas"], index["names"]))
+        self._rows = {code: i for i, code in enumerate(index["areas"])}
+
+    def __len__(self) -> int:
+        return len(self.areas)
+
+    def _columns(self, start: Optional[int], end: Optional[int]) -> slice:
+        lo = 0 if start is None else int(np.searchsorted(self.years, start, side="left"))
+        hi = self.years.size if end is None else int(np.searchsorted(self.years, end, side="right"))
+        return slice(lo, max(hi, lo))
+
+    def row(self, area: str) -> Optional[int]:
+        return self._rows.get(area)
+
+    def series(self, area: str, start: Optional[int] = None,
+               end: Optional[int] = None) -> Optional[Tuple[np.ndarray, np.ndarray]]:
+        """(years, values) of one area within [start, end], gaps as NaN; values is a view. None if unknown."""
+        i = self.row(area)
+        if i is None:
+            return None
+        cols = self._columns(start, end)
+        return self.years[cols], self.values[i, cols]
+
+    def block(self, start: Optional[int] = None, end: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """(years, areas x years values) for a year range; a strided view, nothing is read until used."""
+        cols = self._columns(start, end)
+        return self.years[cols], self.values[:, cols]
+
+    def is_fresh(self, source: Path) -> bool:
+        """Whether this was converted from `source` as it is now (same size and modification time)."""
+        try:
+            return all(self.index.get(k) == v for k, v in _source_stamp(Path(source)).items())
+        except FileNotFoundError:
+            return False
+
+    def iter_long_chunks(self, chunksize: int) -> Iterator[Tuple[Dict[str, str], np.ndarray, np.ndarray, np.ndarray]]:
+        """(names, areas, years, values) per `chunksize` areas, skipping gaps; the shape ingest_worldbank writes."""
+        for lo in range(0, len(self), chunksize):
+            block = self.values[lo:lo + chunksize]
+            rows, cols = np.nonzero(~np.isnan(block))
+            codes = self.areas[lo:lo + chunksize]
+            yield ({c: self.names[c] for c in codes.tolist()}, codes[rows], self.years[cols], block[rows, cols])
+
+# ---------------- loading ----------------
+_matrices: Dict[Path, tuple] = {}  # index path -> (index mtime_ns, WideMatrix)
+_lock = threading.Lock()
+
+def load_matrix(directory, indicator: str) -> Optional[WideMatrix]:
+    """The converted `indicator` under `directory`, memory-mapped (None if not converted).
+
+    Kept per process and re-opened only when the index file changes.
+    """
+    npy, index_path = matrix_paths(directory, indicator)
+    try:
+        mtime = index_path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _matrices.get(index_path)
+    if cached is None or cached[0] != mtime:
+        with _lock:  # opened once per index file version, even with several threads asking
+            cached = _matrices.get(index_path)
+            if cached is None or cached[0] != mtime:
+                cached = _matrices[index_path] = (mtime, WideMatrix(np.load(npy, mmap_mode="r"),
+                                                                    json.loads(index_path.read_text())))
+    return cached[1]
+
+# ---------------- converting ----------------
+def convert(source: Path, directory, indicator: str, chunksize: int = 100) -> WideMatrix:
+    """Extract the year block of a wide World Bank CSV into `<directory>/<indicator>.npy` and its index.
+
+    Only the area columns and the year block are parsed, with explicit dtypes.
+    Both files are written under temporary names and renamed into place, the
+    index last, so a reader never pairs a new matrix with an old index.
+    """
+    source = Path(source)
+    years = year_columns(source)
+    if not years:
+        raise ValueError(f"{source} has no year columns")
+    dtypes = {AREA_ID: "string", AREA_NAME: "string", **{y: "float64" for y in years}}
+    blocks: List[np.ndarray] = []
+    areas: List[str] = []
+    names: List[str] = []
+    for chunk in pd.read_csv(source, usecols=[AREA_ID, AREA_NAME, *years], dtype=dtypes, chunksize=chunksize):
+        chunk = chunk[chunk[AREA_ID].notna()]
+        blocks.append(chunk[years].to_numpy(dtype=np.float64))
+        areas += chunk[AREA_ID].tolist()
+        names += chunk[AREA_NAME].fillna("").tolist()
+    values = np.concatenate(blocks) if blocks else np.empty((0, len(years)))
+
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    npy, index_path = matrix_paths(directory, indicator)
+    index = {"format": FORMAT_VERSION, "indicator": indicator, "source": source.name, **_source_stamp(source),
+             "areas": areas, "names": names, "years": [int(y) for y in years]}
+    tmp_npy, tmp_index = npy.with_name(f".{npy.name}.tmp"), index_path.with_name(f".{index_path.name}.tmp")
+    with open(tmp_npy, "wb") as f:
+        np.save(f, np.ascontiguousarray(values))
+    tmp_index.write_text(json.dumps(index, separators=(",", ":")))
+    os.replace(tmp_npy, npy)
+    os.replace(tmp_index, index_path)
+    return load_matrix(directory, indicator)
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='statisticalsummary',
+            name='indicator',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AddConstraint(
+            model_name='bricscomparison',
+            constraint=models.UniqueConstraint(fields=('period_type', 'start_year', 'end_year'), name='uniq_brics_period'),
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0002_unique_import_keys'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RefArea',
+            fields=[
+                ('code', models.CharField(max_length=10, primary_key=True, serialize=False)),
+                ('name', models.CharField(max_length=150)),
+            ],
+            options={
+                'ordering': ['code'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Observation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indicator', models.CharField(max_length=32)),
+                ('year', models.IntegerField()),
+                ('value', models.FloatField()),
+                ('ref_area', models.ForeignKey(db_column='ref_area', on_delete=django.db.models.deletion.CASCADE, related_name='observations', to='analysis.refarea')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-17 02:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0003_observation_store'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='observation',
+            name='ref_area',
+            field=models.ForeignKey(db_column='ref_area', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='observations', to='analysis.refarea'),
+        ),
+        migrations.AddIndex(
+            model_name='observation',
+            index=models.Index(fields=['indicator', 'year'], name='obs_indicator_year_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='observation',
+            constraint=models.UniqueConstraint(fields=('ref_area', 'indicator', 'year'), name='uniq_observation'),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-17 03:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analysis', '0005_data_generation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AreaSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indicator', models.CharField(max_length=32)),
+                ('period', models.CharField(max_length=20)),
+                ('start_year', models.IntegerField(blank=True, null=True)),
+                ('end_year', models.IntegerField(blank=True, null=True)),
+                ('sample_size', models.IntegerField()),
+                ('mean_value', models.FloatField(blank=True, null=True)),
+                ('median_value', models.FloatField(blank=True, null=True)),
+                ('mode_value', models.FloatField(blank=True, null=True)),
+                ('std_dev', models.FloatField(blank=True, null=True)),
+                ('min_value', models.FloatField(blank=True, null=True)),
+                ('max_value', models.FloatField(blank=True, null=True)),
+                ('volatile_years', models.IntegerField(default=0)),
+                ('outlier_years', models.IntegerField(default=0)),
+                ('ref_area', models.ForeignKey(db_column='ref_area', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='summaries', to='analysis.refarea')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ref_area', 'indicator', 'period'), name='uniq_area_summary')],
+            },
+        ),
+        migrations.CreateModel(
+            name='AreaVolatility',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('indicator', models.CharField(max_length=32)),
+                ('year', models.IntegerField()),
+                ('yoy_change', models.FloatField()),
+                ('z_score', models.FloatField()),
+                ('is_outlier', models.BooleanField(default=False)),
+                ('ref_area', models.ForeignKey(db_column='ref_area', db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='volatility', to='analysis.refarea')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('ref_area', 'indicator', 'year'), name='uniq_area_volatility')],
+            },
+        ),
+    ]
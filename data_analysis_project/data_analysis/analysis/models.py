@@ -52,12 +52,18 @@ class BricsComparison(models.Model):
     insights = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["period_type", "start_year", "end_year"],
+                                    name="uniq_brics_period"),
+        ]
+
     def __str__(self):
         return f"{self.period_type} {self.start_year}-{self.end_year}"
 
 
 class StatisticalSummary(models.Model):
-    indicator = models.CharField(max_length=50, db_index=True)
+    indicator = models.CharField(max_length=50, unique=True)
     mean_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     median_value = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     std_dev = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
@@ -70,5 +76,97 @@ class StatisticalSummary(models.Model):
         return self.indicator
 
 
+class RefArea(models.Model):
+    # World Bank REF_AREA_ID (ISO3 country or aggregate code, e.g. 'ZAF', 'SSF')
+    code = models.CharField(max_length=10, primary_key=True)
+    name = models.CharField(max_length=150)
+
+    class Meta:
+        ordering = ["code"]
+
+    def __str__(self):
+        return f"{self.code} ({self.name})"
+
+
+class Observation(models.Model):
+    # long-format store: one row per (area, indicator, year); gaps simply have no row
+    # no single-column FK index: (ref_area, indicator, year) below already leads with ref_area
+    ref_area = models.ForeignKey(RefArea, on_delete=models.CASCADE, db_column="ref_area",
+                                 related_name="observations", db_index=False)
+    indicator = models.CharField(max_length=32)  # 'gdp' | 'inflation' (see WORLD_BANK_DATASETS)
+    year = models.IntegerField()
+    value = models.FloatField()
+
+    class Meta:
+        constraints = [
+            # doubles as the (ref_area, indicator, year) index for per-country range scans
+            models.UniqueConstraint(fields=["ref_area", "indicator", "year"], name="uniq_observation"),
+        ]
+        indexes = [
+            # cross-country scans: one indicator, one year (or range), every area
+            models.Index(fields=["indicator", "year"], name="obs_indicator_year_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.ref_area_id} {self.indicator} {self.year}: {self.value}"
+
+
+class AreaSummary(models.Model):
+    # StatisticalSummary / BricsComparison statistics for every area and indicator (manage.py batch_analytics)
+    ref_area = models.ForeignKey(RefArea, on_delete=models.CASCADE, db_column="ref_area",
+                                 related_name="summaries", db_index=False)
+    indicator = models.CharField(max_length=32)
+    period = models.CharField(max_length=20)  # 'all' | era | BRICS period_type
+    start_year = models.IntegerField(null=True, blank=True)  # NULL: open-ended
+    end_year = models.IntegerField(null=True, blank=True)
+    sample_size = models.IntegerField()
+    mean_value = models.FloatField(null=True, blank=True)
+    median_value = models.FloatField(null=True, blank=True)
+    mode_value = models.FloatField(null=True, blank=True)
+    std_dev = models.FloatField(null=True, blank=True)
+    min_value = models.FloatField(null=True, blank=True)
+    max_value = models.FloatField(null=True, blank=True)
+    volatile_years = models.IntegerField(default=0)
+    outlier_years = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ref_area", "indicator", "period"], name="uniq_area_summary"),
+        ]
+
+    def __str__(self):
+        return f"{self.ref_area_id} {self.indicator} {self.period}"
+
+
+class AreaVolatility(models.Model):
+    # years whose YoY change is a rolling z-score outlier, per area (VolatilityAnalysis for every area)
+    ref_area = models.ForeignKey(RefArea, on_delete=models.CASCADE, db_column="ref_area",
+                                 related_name="volatility", db_index=False)
+    indicator = models.CharField(max_length=32)
+    year = models.IntegerField()
+    yoy_change = models.FloatField()
+    z_score = models.FloatField()
+    is_outlier = models.BooleanField(default=False)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["ref_area", "indicator", "year"], name="uniq_area_volatility"),
+        ]
+
+    def __str__(self):
+        return f"{self.ref_area_id} {self.indicator} {self.year} (z={self.z_score:+.1f})"
+
+
+
+class DataGeneration(models.Model):
+    # per-table write counter behind cache keys and API ETags (see versioning.py)
+    table = models.CharField(max_length=64, primary_key=True)
+    generation = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.table}@{self.generation}"
+
+
 
 # Create your models here.
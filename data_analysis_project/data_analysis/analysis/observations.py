@@ -0,0 +1,103 @@
+# analysis/observations.py
+# Country-scoped reads over the long-format Observation store. Every query is
+# filtered on (ref_area, indicator[, year]) so it is served by the composite
+# index instead of a table scan. Single-area series always come from the
+# database: one indexed query beats opening Parquet partition files, so Parquet
+# snapshots (snapshots.py) serve only the bulk, whole-table load of observation_frame.
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+from django.conf import settings
+
+from . import snapshots
+from .frames import read_frame
+from .importers import era_for_year
+from .models import Observation
+from .versioning import table_stamp
+
+SERIES_INDICATORS = ("gdp", "inflation")
+FRAME_DTYPES = {"ref_area": "string", "indicator": "string", "year": "int64", "value": "float64"}
+
+def home_area() -> str:
+    return getattr(settings, "ANALYSIS_HOME_AREA", "ZAF")
+
+def snapshot_dir() -> Path:
+    return Path(getattr(settings, "ANALYSIS_SNAPSHOT_DIR", settings.BASE_DIR / "snapshots"))
+
+def matrix_dir() -> Path:
+    return Path(getattr(settings, "ANALYSIS_MATRIX_DIR", settings.BASE_DIR / "matrices"))
+
+def fresh_snapshot() -> Optional[snapshots.Manifest]:
+    """The published snapshot if it matches Observation as it is now, else None (it is stale or missing)."""
+    if snapshots.pyarrow is None:
+        return None
+    manifest = snapshots.load_manifest(snapshot_dir())
+    if manifest is None or manifest.stamp != snapshots.stamp_key(*table_stamp(Observation)):
+        return None
+    return manifest
+
+def observation_frame() -> pd.DataFrame:
+    """Every observation as (ref_area, indicator, year, value), ordered by area, indicator and year.
+
+    Read from the published snapshot while it is fresh (its partitions are stored
+    in that order, so no SQL and no sort), else from the database.
+    """
+    manifest = fresh_snapshot()
+    if manifest is not None:
+        df = snapshots.read_snapshot(manifest=manifest, columns=list(FRAME_DTYPES)).to_pandas()
+        return df.astype(FRAME_DTYPES)
+    qs = Observation.objects.order_by("ref_area_id", "indicator", "year").values_list(
+        "ref_area_id", "indicator", "year", "value")
+    return read_frame(qs, FRAME_DTYPES)
+
+def requested_area(request) -> Optional[str]:
+    """The ?area= code if it names a non-home area, else None (serve the curated tables)."""
+    area = (request.GET.get("area") or "").strip().upper()
+    return area if area and area != home_area() else None
+
+def _series_qs(area: str, start: Optional[int], end: Optional[int]):
+    qs = Observation.objects.filter(ref_area_id=area, indicator__in=SERIES_INDICATORS)
+    if start is not None:
+        qs = qs.filter(year__gte=start)
+    if end is not None:
+        qs = qs.filter(year__lte=end)
+    return qs.values_list("indicator", "year", "value")
+
+def _align(rows) -> Dict[str, List]:
+    by_indicator: Dict[str, Dict[int, float]] = {name: {} for name in SERIES_INDICATORS}
+    for indicator, year, value in rows:
+        by_indicator[indicator][year] = value
+
+    gdp, infl = by_indicator["gdp"], by_indicator["inflation"]
+    years = sorted(gdp.keys() & infl.keys())
+    return {"years": years, "gdp": [gdp[y] for y in years], "inflation": [infl[y] for y in years]}
+
+def area_series(area: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, List]:
+    """Year-aligned GDP growth / inflation for one area; years missing either value are dropped."""
+    return _align(_series_qs(area, start, end))
+
+async def aarea_series(area: str, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, List]:
+    return _align([r async for r in _series_qs(area, start, end)])
+
+def era_comparison(series: Dict[str, List]) -> List[Dict]:
+    """Same shape as the apartheid_comparison endpoint, computed from an area_series()."""
+    eras: Dict[str, Dict] = {}
+    for year, gdp, infl in zip(series["years"], series["gdp"], series["inflation"]):
+        e = eras.setdefault(era_for_year(year), {"gdp": [], "inflation": []})
+        e["gdp"].append(gdp)
+        e["inflation"].append(infl)
+    return [
+        {
+            "era": era,
+            "years_count": len(e["gdp"]),
+            "mean_gdp": sum(e["gdp"]) / len(e["gdp"]),
+            "mean_inflation": sum(e["inflation"]) / len(e["inflation"]),
+            "best_gdp": max(e["gdp"]),
+            "worst_gdp": min(e["gdp"]),
+        }
+        for era, e in sorted(eras.items())
+    ]
+
+def area_era_comparison(area: str) -> List[Dict]:
+    return era_comparison(area_series(area))
@@ -0,0 +1,135 @@
+# analysis/pagination.py
+# Keyset pagination for the indicator table. A page is "the next N rows after
+# (ref_area, year)", so every page is an index range scan no matter how deep the
+# reader goes, and growth/inflation labels are computed by the database.
+# The home area pages over EconomicIndicator; any other area list pages over
+# Observation (gdp rows, inflation joined by a correlated subquery).
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db.models import Case, CharField, F, FloatField, OuterRef, Q, Subquery, Value, When
+
+from .importers import FIRST_POST_APARTHEID_YEAR
+from .models import EconomicIndicator, Observation
+from .observations import home_area
+from .panel import growth_category_expr, inflation_category_expr
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+ERAS = ("Apartheid", "Post-Apartheid")
+ROW_FIELDS = ("ref_area", "year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change", "inflation_yoy_change",
+              "era", "growth_category", "inflation_category")
+
+def page_size() -> int:
+    return getattr(settings, "ANALYSIS_TABLE_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+
+def encode_cursor(area: str, year: int) -> str:
+    return f"{area}:{year}"
+
+def decode_cursor(cursor: str) -> Tuple[str, int]:
+    area, sep, year = cursor.rpartition(":")
+    if not sep or not area:
+        raise ValueError(f"bad cursor {cursor!r}")
+    return area, int(year)
+
+def _int(value: Optional[str], name: str) -> Optional[int]:
+    if value in (None, ""):
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"{name} must be a whole number, got {value!r}")
+
+
+class PageQuery:
+    """Filters plus keyset position for one page of the indicator table."""
+
+    def __init__(self, areas: Optional[List[str]] = None, year_from: Optional[int] = None,
+                 year_to: Optional[int] = None, era: Optional[str] = None,
+                 after: Optional[Tuple[str, int]] = None, limit: Optional[int] = None):
+        self.areas = areas or [home_area()]
+        self.year_from = year_from
+        self.year_to = year_to
+        self.era = era
+        self.after = after
+        self.limit = max(1, min(limit or page_size(), MAX_PAGE_SIZE))
+
+    @classmethod
+    def from_request(cls, request) -> "PageQuery":
+        """Parse ?area=&year_from=&year_to=&era=&after=&limit=; ValueError on bad input.
+
+        `area` is a comma-separated list of ISO3 codes; `year` is kept as a shorthand
+        for year_from = year_to = year (the panel's year search).
+        """
+        get = request.GET
+        areas = [a.strip().upper() for a in (get.get("area") or "").split(",") if a.strip()]
+        year = _int(get.get("year"), "year")
+        era = get.get("era") or None
+        if era is not None and era not in ERAS:
+            raise ValueError(f"era must be one of {', '.join(ERAS)}")
+        after = decode_cursor(get["after"]) if get.get("after") else None
+        return cls(
+            areas=areas,
+            year_from=year if year is not None else _int(get.get("year_from"), "year_from"),
+            year_to=year if year is not None else _int(get.get("year_to"), "year_to"),
+            era=era, after=after, limit=_int(get.get("limit"), "limit"),
+        )
+
+    @property
+    def home_only(self) -> bool:
+        return self.areas == [home_area()]
+
+    def querystring(self, after: Optional[str] = None) -> str:
+        params = {
+            "area": ",".join(self.areas) if not self.home_only else None,
+            "year_from": self.year_from, "year_to": self.year_to, "era": self.era,
+            "limit": self.limit if self.limit != page_size() else None,
+            "after": after,
+        }
+        return urlencode({k: v for k, v in params.items() if v is not None})
+
+
+def _home_rows(q: PageQuery):
+    qs = EconomicIndicator.objects.all()
+    if q.after is not None:
+        qs = qs.filter(year__gt=q.after[1])
+    if q.era is not None:
+        qs = qs.filter(era=q.era)
+    return (qs.annotate(ref_area=Value(q.areas[0]),
+                        growth_category=growth_category_expr(),
+                        inflation_category=inflation_category_expr())
+              .order_by("year"))
+
+def _observation_rows(q: PageQuery):
+    inflation = Observation.objects.filter(
+        ref_area=OuterRef("ref_area"), year=OuterRef("year"), indicator="inflation"
+    ).values("value")[:1]
+    qs = Observation.objects.filter(indicator="gdp", ref_area__in=q.areas)
+    if q.after is not None:
+        area, year = q.after
+        qs = qs.filter(Q(ref_area__gt=area) | Q(ref_area=area, year__gt=year))
+    if q.era == "Apartheid":
+        qs = qs.filter(year__lt=FIRST_POST_APARTHEID_YEAR)
+    elif q.era == "Post-Apartheid":
+        qs = qs.filter(year__gte=FIRST_POST_APARTHEID_YEAR)
+    return (qs.annotate(gdp_zar_bn=F("value"), inflation_rate=Subquery(inflation),
+                        gdp_yoy_change=Value(None, output_field=FloatField()),
+                        inflation_yoy_change=Value(None, output_field=FloatField()),
+                        era=Case(When(year__gte=FIRST_POST_APARTHEID_YEAR, then=Value("Post-Apartheid")),
+                                 default=Value("Apartheid"), output_field=CharField()))
+              .annotate(growth_category=growth_category_expr(), inflation_category=inflation_category_expr())
+              .order_by("ref_area", "year"))
+
+def indicator_page(q: PageQuery) -> Dict[str, Any]:
+    """{'rows': [...], 'next': cursor or None}; one LIMIT n+1 query tells us if there is more."""
+    qs = _home_rows(q) if q.home_only else _observation_rows(q)
+    if q.year_from is not None:
+        qs = qs.filter(year__gte=q.year_from)
+    if q.year_to is not None:
+        qs = qs.filter(year__lte=q.year_to)
+    rows = list(qs.values(*ROW_FIELDS)[:q.limit + 1])
+    more = len(rows) > q.limit
+    rows = rows[:q.limit]
+    last = rows[-1] if rows else None
+    return {"rows": rows, "next": encode_cursor(last["ref_area"], last["year"]) if more else None}
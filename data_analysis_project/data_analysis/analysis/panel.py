@@ -0,0 +1,129 @@
+# analysis/panel.py
+# Context engine for the database page/panel: one scan of EconomicIndicator
+# produces every KPI the templates need, and the result is cached until the
+# next write bumps the data version.
+from decimal import Decimal
+from typing import Dict, Any, List
+
+from django.core.cache import cache
+from django.db.models import Case, CharField, F, Value, When
+
+from .models import (
+    EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary
+)
+from .versioning import data_version
+
+PANEL_CACHE_PREFIX = "analysis:panel"
+PANEL_CACHE_TIMEOUT = 60 * 60 * 24  # superseded versions just age out
+RECENT_SINCE = 2013
+
+PANEL_MODELS = (EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary)
+
+INDICATOR_FIELDS = ('id', 'year', 'gdp_zar_bn', 'inflation_rate',
+                    'gdp_yoy_change', 'inflation_yoy_change', 'era')
+
+# growth is classified on the growth rate itself (gdp_zar_bn holds annual GDP growth %);
+# gdp_yoy_change is the derived change in that rate from the previous year
+def growth_label(v):
+    if v is None: return "Unknown"
+    if v > 3: return "High Growth"
+    if Decimal('0') <= v <= 3: return "Moderate Growth"
+    return "Recession/Decline"
+
+def inflation_label(v):
+    if v is None: return "Unknown"
+    if v < 3: return "Low Inflation"
+    if 3 <= v <= 6: return "Target Range"
+    return "High Inflation"
+
+# SQL twins of the labels above, for querysets that should not load model instances;
+# `field` lets other row sources (e.g. an annotated Observation value) reuse them
+def growth_category_expr(field: str = "gdp_zar_bn") -> Case:
+    return Case(
+        When(**{f"{field}__isnull": True}, then=Value("Unknown")),
+        When(**{f"{field}__gt": 3}, then=Value("High Growth")),
+        When(**{f"{field}__gte": 0, f"{field}__lte": 3}, then=Value("Moderate Growth")),
+        default=Value("Recession/Decline"),
+        output_field=CharField(),
+    )
+
+def inflation_category_expr(field: str = "inflation_rate") -> Case:
+    return Case(
+        When(**{f"{field}__isnull": True}, then=Value("Unknown")),
+        When(**{f"{field}__lt": 3}, then=Value("Low Inflation")),
+        When(**{f"{field}__gte": 3, f"{field}__lte": 6}, then=Value("Target Range")),
+        default=Value("High Inflation"),
+        output_field=CharField(),
+    )
+
+def _extremes(rows: List[Dict[str, Any]], value) -> List[Dict[str, Any]]:
+    keep = ('year', 'gdp_zar_bn', 'inflation_rate', 'era')
+    return [{k: r[k] for k in keep} for r in rows if r['gdp_zar_bn'] == value]
+
+def compute_panel_data() -> Dict[str, Any]:
+    indicators = list(EconomicIndicator.objects.order_by('year').values(*INDICATOR_FIELDS))
+
+    eras: Dict[str, Dict[str, Any]] = {}
+    for r in indicators:
+        gdp, infl = r['gdp_zar_bn'], r['inflation_rate']
+        e = eras.get(r['era'])
+        if e is None:
+            eras[r['era']] = {'era': r['era'], 'years_count': 1, 'gdp_sum': gdp, 'inflation_sum': infl,
+                              'best_gdp': gdp, 'worst_gdp': gdp}
+            continue
+        e['years_count'] += 1
+        e['gdp_sum'] += gdp
+        e['inflation_sum'] += infl
+        e['best_gdp'] = max(e['best_gdp'], gdp)
+        e['worst_gdp'] = min(e['worst_gdp'], gdp)
+
+    kpi_era = []
+    for name in sorted(eras):
+        e = eras[name]
+        kpi_era.append({
+            'era': name,
+            'years_count': e['years_count'],
+            'mean_gdp': e['gdp_sum'] / e['years_count'],
+            'mean_inflation': e['inflation_sum'] / e['years_count'],
+            'best_gdp': e['best_gdp'],
+            'worst_gdp': e['worst_gdp'],
+        })
+
+    best_value = max((e['best_gdp'] for e in kpi_era), default=None)
+    worst_value = min((e['worst_gdp'] for e in kpi_era), default=None)
+
+    recent = [
+        {k: r[k] for k in ('year', 'gdp_zar_bn', 'inflation_rate', 'gdp_yoy_change')}
+        for r in reversed(indicators) if r['year'] >= RECENT_SINCE
+    ]
+
+    volatility = list(
+        VolatilityAnalysis.objects
+            .filter(volatility_flag=True)
+            .values('gdp_yoy_change', 'inflation_yoy_change', 'notes',
+                    year=F('indicator__year'),
+                    gdp_zar_bn=F('indicator__gdp_zar_bn'),
+                    era=F('indicator__era'))
+            .order_by('indicator__year')
+    )
+
+    return {
+        'kpi_era': kpi_era,
+        'volatility': volatility,
+        'brics': list(BricsComparison.objects.order_by('period_type', 'start_year').values()),
+        'stats': list(StatisticalSummary.objects.order_by('indicator').values()),
+        'best': _extremes(indicators, best_value),
+        'worst': _extremes(indicators, worst_value),
+        'recent': recent,
+        # same GROUP BY as the KPI tiles, so reuse it instead of a second query
+        'avg_by_era': [{'era': e['era'], 'avg_gdp': e['mean_gdp'], 'avg_inflation': e['mean_inflation']}
+                       for e in kpi_era],
+    }
+
+def panel_data() -> Dict[str, Any]:
+    key = f"{PANEL_CACHE_PREFIX}:{data_version(*PANEL_MODELS)}"
+    data = cache.get(key)
+    if data is None:
+        data = compute_panel_data()
+        cache.set(key, data, PANEL_CACHE_TIMEOUT)
+    return data
@@ -0,0 +1,147 @@
+# analysis/rankings.py
+# Cross-country leaderboards over Observation: top/bottom k areas for one
+# indicator and year, and where a given area ranks. Observation is loaded once
+# per table generation into one value-sorted array per (indicator, year), so a
+# leaderboard is a slice of k entries and a rank is a binary search; no request
+# scans or sorts the table.
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from .analytics import int_param
+from .frames import read_frame
+from .models import Observation, RefArea
+from .observations import home_area
+from .versioning import table_stamp
+
+DEFAULT_K = 10
+MAX_K = 500
+ORDERS = ("top", "bottom")
+
+# World Bank regional / income / lending aggregates in the WDI files: not countries,
+# so they are left out of every ranking (WLD would otherwise sit mid-table)
+WORLD_BANK_AGGREGATES = frozenset("""
+    AFE AFW ARB CEB CSS EAP EAR EAS ECA ECS EMU EUU FCS HIC HPC IBD IBT IDA IDB IDX
+    INX LAC LCN LDC LIC LMC LMY LTE MEA MIC MNA NAC OED OSS PRE PSS PST SAS SSA SSF
+    SST TEA TEC TLA TMN TSA TSS UMC WLD
+""".split())
+
+
+class Leaderboard:
+    """The areas reporting one indicator in one year, ascending by value (ties by area code)."""
+
+    def __init__(self, areas: np.ndarray, values: np.ndarray):
+        self.areas, self.values = areas, values
+        self._by_code = np.argsort(areas, kind="stable")  # area lookup by binary search
+        self._codes = areas[self._by_code]
+        for a in (self.areas, self.values, self._by_code, self._codes):
+            a.flags.writeable = False
+
+    def __len__(self) -> int:
+        return self.values.size
+
+    def rank_of(self, values: np.ndarray) -> np.ndarray:
+        """1 = highest; equal values share the best rank ("1224" competition ranking)."""
+        return len(self) - np.searchsorted(self.values, values, side="right") + 1
+
+    def head(self, k: int, order: str = "top") -> Tuple[np.ndarray, np.ndarray]:
+        """(areas, values) of the k highest (top) or lowest (bottom) entries, in that order."""
+        if order == "top":
+            return self.areas[::-1][:k], self.values[::-1][:k]
+        return self.areas[:k], self.values[:k]
+
+    def value_of(self, area: str) -> Optional[float]:
+        i = np.searchsorted(self._codes, area)
+        if i < len(self) and self._codes[i] == area:
+            return float(self.values[self._by_code[i]])
+        return None
+
+    def percentile(self, value: float) -> float:
+        """Share of areas below `value`, counting ties as half (scipy's percentileofscore, kind='mean')."""
+        below = np.searchsorted(self.values, value, side="left")
+        equal = np.searchsorted(self.values, value, side="right") - below
+        return float((below + 0.5 * equal) / len(self) * 100)
+
+
+class RankingIndex:
+    """Every (indicator, year) leaderboard of Observation, plus area names."""
+
+    def __init__(self, stamp, boards: Dict[Tuple[str, int], Leaderboard], names: Dict[str, str]):
+        self.stamp = stamp
+        self.boards = boards
+        self.names = names
+        self.latest: Dict[str, int] = {}
+        for indicator, year in boards:
+            self.latest[indicator] = max(year, self.latest.get(indicator, year))
+
+    @classmethod
+    def load(cls, stamp=None) -> "RankingIndex":
+        qs = (Observation.objects.exclude(ref_area_id__in=WORLD_BANK_AGGREGATES)
+              .order_by("indicator", "year", "value", "ref_area_id")
+              .values_list("indicator", "year", "value", "ref_area_id"))
+        df = read_frame(qs, {"indicator": "string", "year": "int32", "value": "float64", "ref_area": "string"})
+        indicators = df["indicator"].to_numpy(dtype=object)
+        years = df["year"].to_numpy()
+        values = df["value"].to_numpy()
+        areas = df["ref_area"].to_numpy(dtype=str)
+        # rows arrive grouped and sorted; split at every (indicator, year) change
+        edges = np.flatnonzero((indicators[1:] != indicators[:-1]) | (years[1:] != years[:-1])) + 1
+        starts, ends = np.concatenate(([0], edges)), np.concatenate((edges, [len(df)]))
+        boards = {
+            (indicators[s], int(years[s])): Leaderboard(areas[s:e].copy(), values[s:e].copy())
+            for s, e in zip(starts.tolist(), ends.tolist()) if e > s
+        }
+        return cls(stamp, boards, dict(RefArea.objects.values_list("code", "name")))
+
+    def year(self, indicator: str, year: Optional[int] = None) -> Optional[int]:
+        """`year`, or by default the latest year `indicator` has data."""
+        return self.latest.get(indicator) if year is None else year
+
+    def leaders(self, indicator: str, year: int, k: int = DEFAULT_K, order: str = "top") -> Dict[str, Any]:
+        board = self.boards[(indicator, year)]
+        areas, values = board.head(k, order)
+        return {"rank": board.rank_of(values), "code": areas,
+                "name": [self.names.get(a, "") for a in areas.tolist()], "value": values}
+
+    def position(self, indicator: str, year: int, area: str) -> Optional[Dict[str, Any]]:
+        board = self.boards.get((indicator, year))
+        value = board.value_of(area) if board is not None else None
+        if value is None:
+            return None
+        return {"area": area, "name": self.names.get(area, ""), "indicator": indicator, "year": year,
+                "value": value, "rank": int(board.rank_of(np.array([value]))[0]), "of": len(board),
+                "percentile": board.percentile(value)}
+
+# ---------------- process-local cache ----------------
+_current: Optional[RankingIndex] = None
+_lock = threading.Lock()
+
+def ranking_index() -> RankingIndex:
+    """The current index, rebuilt (once, under a lock) after Observation or RefArea change."""
+    global _current
+    stamp = (table_stamp(Observation), table_stamp(RefArea))
+    index = _current
+    if index is None or index.stamp != stamp:
+        with _lock:
+            index = _current
+            if index is None or index.stamp != stamp:
+                index = _current = RankingIndex.load(stamp)
+    return index
+
+def forget_ranking_index() -> None:
+    global _current
+    _current = None
+
+# ---------------- requests ----------------
+def parse_request(request) -> Dict[str, Any]:
+    """?indicator=&year=&k=&order=&area= with defaults filled in; ValueError on bad input."""
+    get = request.GET
+    k = int_param(get, "k")
+    if k is not None and not 1 <= k <= MAX_K:
+        raise ValueError(f"k must be between 1 and {MAX_K}")
+    order = get.get("order") or "top"
+    if order not in ORDERS:
+        raise ValueError(f"order must be one of {', '.join(ORDERS)}")
+    return {"indicator": get.get("indicator") or "gdp", "year": int_param(get, "year"), "k": k or DEFAULT_K,
+            "order": order, "area": (get.get("area") or "").strip().upper() or home_area()}
@@ -0,0 +1,121 @@
+# analysis/renderers.py
+# JSON rendering for the api/* endpoints. orjson is used when it is installed
+# (NumPy arrays are written natively, no per-element Python calls); otherwise the
+# stdlib encoder with compact separators. Tables can be rendered as rows (a list
+# of objects, the historical shape) or as columns (one array per field), and
+# floats can be quantized to a fixed number of decimals.
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional, Union
+
+import numpy as np
+from django.conf import settings
+from django.http import HttpResponse
+
+try:
+    import orjson
+except ImportError:  # optional speed-up
+    orjson = None
+
+Table = Union[List[Dict[str, Any]], Dict[str, Any]]
+LAYOUTS = ("rows", "columns")
+MAX_DIGITS = 10
+
+def _default(o):
+    if isinstance(o, np.ndarray):
+        if o.dtype.kind == "f" and np.isnan(o).any():
+            out = o.astype(object)
+            out[np.isnan(o)] = None
+            return out.tolist()
+        return o.tolist()
+    if isinstance(o, np.generic):
+        return o.item()
+    if isinstance(o, Decimal):
+        return float(o)
+    if isinstance(o, (datetime, date)):
+        return o.isoformat()
+    raise TypeError(f"Object of type {type(o).__name__} is not JSON serializable")
+
+def backend() -> str:
+    """'orjson' or 'json'; ANALYSIS_JSON_BACKEND = 'auto' picks orjson when installed."""
+    choice = getattr(settings, "ANALYSIS_JSON_BACKEND", "auto")
+    if choice == "auto":
+        return "orjson" if orjson is not None else "json"
+    if choice == "orjson" and orjson is None:
+        raise ImportError("ANALYSIS_JSON_BACKEND = 'orjson' but orjson is not installed")
+    return choice
+
+def quantize(data, digits: Optional[int]):
+    """Round every float (and float array) in `data` to `digits` decimals."""
+    if digits is None:
+        return data
+    if isinstance(data, np.ndarray):
+        return np.round(data, digits) if data.dtype.kind == "f" else data
+    if isinstance(data, float):
+        return round(data, digits)
+    if isinstance(data, dict):
+        return {k: quantize(v, digits) for k, v in data.items()}
+    if isinstance(data, (list, tuple)):
+        return [quantize(v, digits) for v in data]
+    return data
+
+def dumps(data, digits: Optional[int] = None, using: Optional[str] = None) -> bytes:
+    data = quantize(data, digits)
+    if (using or backend()) == "orjson":
+        return orjson.dumps(data, default=_default, option=orjson.OPT_SERIALIZE_NUMPY)
+    # NaN must not leak out as the non-standard NaN literal; arrays map it to null in _default
+    return json.dumps(data, default=_default, separators=(",", ":"), allow_nan=False).encode()
+
+def to_rows(table: Dict[str, Any]) -> List[Dict[str, Any]]:
+    names = list(table)
+    cols = [_default(v) if isinstance(v, np.ndarray) else list(v) for v in table.values()]
+    return [dict(zip(names, values)) for values in zip(*cols)]
+
+def to_columns(rows: List[Dict[str, Any]]) -> Dict[str, list]:
+    if not rows:
+        return {}
+    return {k: [r[k] for r in rows] for k in rows[0]}
+
+
+class FastJsonResponse(HttpResponse):
+    """Drop-in for JsonResponse that renders through dumps()."""
+
+    def __init__(self, data, digits: Optional[int] = None, **kwargs):
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=dumps(data, digits), **kwargs)
+
+
+def render_options(request):
+    """(layout, digits) from ?layout=rows|columns&digits=N; ValueError on bad input."""
+    layout = request.GET.get("layout") or "rows"
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+    digits = request.GET.get("digits")
+    if digits in (None, ""):
+        return layout, getattr(settings, "ANALYSIS_JSON_FLOAT_DIGITS", None)
+    digits = int(digits)
+    if not 0 <= digits <= MAX_DIGITS:
+        raise ValueError(f"digits must be between 0 and {MAX_DIGITS}")
+    return layout, digits
+
+def shape_table(table: Table, layout: str, digits: Optional[int]) -> Table:
+    """Quantize, then transpose `table` into `layout` if it isn't already in it."""
+    table = quantize(table, digits)  # before transposing, while floats are still whole arrays
+    if layout == "columns" and isinstance(table, list):
+        return to_columns(table)
+    if layout == "rows" and isinstance(table, dict):
+        return to_rows(table)
+    return table
+
+def table_response(request, table: Table, meta: Optional[Dict[str, Any]] = None, **kwargs) -> FastJsonResponse:
+    """Render a table, given as rows (list of dicts) or columns (dict of arrays), in the requested layout.
+
+    With `meta` the table is wrapped as {"data": table, **meta} (e.g. a next-page cursor).
+    """
+    try:
+        layout, digits = render_options(request)
+    except ValueError as e:
+        return FastJsonResponse({"error": str(e)}, status=400)
+    table = shape_table(table, layout, digits)
+    return FastJsonResponse(table if meta is None else {"data": table, **meta}, **kwargs)
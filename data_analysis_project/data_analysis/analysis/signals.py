@@ -0,0 +1,27 @@
+# analysis/signals.py
+from django.db.models.signals import post_delete, post_save
+
+from .models import (
+    EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary, RefArea, Observation
+)
+from .materialize import schedule_refresh
+from .versioning import bump_generation
+
+TRACKED_MODELS = (EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary,
+                  RefArea, Observation)
+
+def bump_table_generation(sender, **kwargs):
+    # bulk_create / queryset.update() don't send signals; those paths bump explicitly
+    bump_generation(sender)
+
+def refresh_derived_tables(sender, instance, **kwargs):
+    schedule_refresh([instance.year])
+
+post_save.connect(refresh_derived_tables, sender=EconomicIndicator, dispatch_uid="analysis_materialize_save")
+post_delete.connect(refresh_derived_tables, sender=EconomicIndicator, dispatch_uid="analysis_materialize_delete")
+
+for _model in TRACKED_MODELS:
+    post_save.connect(bump_table_generation, sender=_model,
+                      dispatch_uid=f"analysis_bump_save_{_model.__name__}")
+    post_delete.connect(bump_table_generation, sender=_model,
+                        dispatch_uid=f"analysis_bump_delete_{_model.__name__}")
@@ -0,0 +1,215 @@
+# analysis/snapshots.py
+# Partitioned Parquet snapshots of the long-format Observation store, so whole-table
+# loads (the notebooks, and batch_analytics via observations.observation_frame)
+# read the World Bank data without a SQL scan or re-parsing the wide CSVs.
+#
+#   <root>/manifest.json                                   the published snapshot
+#   <root>/<snapshot id>/ref_area=ZAF/indicator=gdp/part-0.parquet
+#
+# The manifest lists every partition with its row count and year range, so a
+# reader picks files (partition pruning) without listing directories; each file
+# is opened memory-mapped and only the requested columns and the row groups
+# whose year statistics overlap the requested range are read.
+# Reading needs pyarrow and nothing from Django: a notebook can call
+# load(path_to_root, area="ZAF") for a DataFrame. Only write_snapshot() touches the ORM.
+import json
+import os
+import shutil
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import pandas as pd
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:  # optional: without it no snapshot is fresh and observation_frame reads the database
+    pyarrow = None
+
+MANIFEST = "manifest.json"
+FORMAT_VERSION = 1
+COLUMNS = ("ref_area", "indicator", "year", "value")
+DEFAULT_ROW_GROUP_SIZE = 20  # years per row group: a range query skips the rest of the file
+DEFAULT_KEEP = 2
+
+def _require_pyarrow() -> None:
+    if pyarrow is None:
+        raise ImportError("Parquet snapshots need pyarrow (pip install pyarrow)")
+
+def schema():
+    _require_pyarrow()
+    return pyarrow.schema([("ref_area", pyarrow.string()), ("indicator", pyarrow.string()),
+                           ("year", pyarrow.int32()), ("value", pyarrow.float64())])
+
+
+class Manifest:
+    """The published snapshot: id, source table stamp, and one entry per partition file."""
+
+    def __init__(self, root: Path, data: Dict[str, Any]):
+        self.root = Path(root)
+        self.data = data
+
+    @property
+    def id(self) -> str:
+        return self.data["id"]
+
+    @property
+    def stamp(self) -> str:
+        return self.data["stamp"]
+
+    @property
+    def partitions(self) -> List[Dict[str, Any]]:
+        return self.data["partitions"]
+
+    def path(self, partition: Dict[str, Any]) -> Path:
+        return self.root / self.id / partition["path"]
+
+    def select(self, areas: Optional[Iterable[str]] = None, indicators: Optional[Iterable[str]] = None,
+               start: Optional[int] = None, end: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Partitions that can hold rows for these areas/indicators within [start, end]."""
+        areas = set(areas) if areas is not None else None
+        indicators = set(indicators) if indicators is not None else None
+        return [
+            p for p in self.partitions
+            if (areas is None or p["ref_area"] in areas)
+            and (indicators is None or p["indicator"] in indicators)
+            and (start is None or p["max_year"] >= start)
+            and (end is None or p["min_year"] <= end)
+        ]
+
+_manifests: Dict[Path, tuple] = {}  # root -> (manifest mtime_ns, Manifest)
+_lock = threading.Lock()
+
+def load_manifest(root) -> Optional[Manifest]:
+    """The published manifest under `root` (None if there is none), re-read only when the file changes."""
+    path = Path(root) / MANIFEST
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    cached = _manifests.get(path)
+    if cached is None or cached[0] != mtime:
+        with _lock:
+            cached = _manifests.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = _manifests[path] = (mtime, Manifest(root, json.loads(path.read_text())))
+    return cached[1]
+
+# ---------------- reading ----------------
+def read_snapshot(root=None, areas: Optional[Iterable[str]] = None, indicators: Optional[Iterable[str]] = None,
+                  start: Optional[int] = None, end: Optional[int] = None,
+                  columns: Optional[Sequence[str]] = None, manifest: Optional[Manifest] = None):
+    """A pyarrow Table of the matching observations (call .to_pandas() for a DataFrame)."""
+    _require_pyarrow()
+    manifest = manifest or load_manifest(root)
+    if manifest is None:
+        raise FileNotFoundError(f"no snapshot manifest under {root}")
+    filters = [("year", ">=", start)] if start is not None else []
+    if end is not None:
+        filters.append(("year", "<=", end))
+    tables = [
+        pyarrow.parquet.read_table(manifest.path(p), columns=list(columns) if columns else None,
+                                   filters=filters or None, memory_map=True)
+        for p in manifest.select(areas, indicators, start, end)
+    ]
+    if not tables:
+        empty = schema().empty_table()
+        return empty.select(list(columns)) if columns else empty
+    return pyarrow.concat_tables(tables)
+
+def load(root, area: Optional[str] = None, indicators: Optional[Iterable[str]] = None,
+         start: Optional[int] = None, end: Optional[int] = None) -> pd.DataFrame:
+    """The published snapshot under `root` as a DataFrame (ref_area, indicator, year, value).
+
+    `area` narrows it to one area's partitions; the notebooks' entry point.
+    """
+    table = read_snapshot(root, areas=None if area is None else [area], indicators=indicators,
+                          start=start, end=end)
+    return table.to_pandas()
+
+# ---------------- writing ----------------
+def _partition_path(area: str, indicator: str) -> str:
+    return f"ref_area={area}/indicator={indicator}/part-0.parquet"
+
+def _write_partition(base: Path, df, row_group_size: int) -> Dict[str, Any]:
+    area, indicator = df["ref_area"].iat[0], df["indicator"].iat[0]
+    rel = _partition_path(area, indicator)
+    path = base / rel
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pyarrow.Table.from_pandas(df, schema=schema(), preserve_index=False)
+    pyarrow.parquet.write_table(table, path, row_group_size=row_group_size, compression="zstd",
+                                write_statistics=True)
+    return {"ref_area": area, "indicator": indicator, "path": rel, "rows": len(df),
+            "min_year": int(df["year"].min()), "max_year": int(df["year"].max()),
+            "bytes": path.stat().st_size}
+
+def _partitions(frames) -> Iterable:
+    """Split (ref_area, indicator, year)-ordered frames into one frame per partition.
+
+    A partition can straddle two chunks, so the last group of each chunk is held
+    back until the next chunk (or the end) shows it is complete.
+    """
+    pending = None
+    for df in frames:
+        if pending is not None:
+            df = pd.concat([pending, df], ignore_index=True)
+        groups = [g for _, g in df.groupby(["ref_area", "indicator"], sort=False)]
+        pending = groups.pop() if groups else None
+        yield from groups
+    if pending is not None and len(pending):
+        yield pending
+
+def write_snapshot(root, row_group_size: int = DEFAULT_ROW_GROUP_SIZE, keep: int = DEFAULT_KEEP,
+                   chunk_size: Optional[int] = None) -> Manifest:
+    """Write Observation to a new partitioned snapshot under `root` and publish it.
+
+    Files go to a temporary directory that is renamed into place, then the
+    manifest is swapped atomically, so readers never see a half-written snapshot.
+    The `keep` newest snapshot directories (at least the new one) stay, older ones are removed.
+    """
+    _require_pyarrow()
+    # Django pieces are imported here so notebooks can use the readers without a settings module
+    from .frames import DEFAULT_CHUNK_SIZE, iter_frames
+    from .models import Observation
+    from .versioning import table_stamp
+
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    generation, updated_at = table_stamp(Observation)
+    snapshot_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    staging = root / f".{snapshot_id}.tmp"
+
+    qs = Observation.objects.order_by("ref_area_id", "indicator", "year").values_list(
+        "ref_area_id", "indicator", "year", "value")
+    dtypes = {"ref_area": "string", "indicator": "string", "year": "int32", "value": "float64"}
+    try:
+        frames = iter_frames(qs, dtypes, chunk_size or DEFAULT_CHUNK_SIZE)
+        partitions = [_write_partition(staging, df, row_group_size) for df in _partitions(frames)]
+        staging.mkdir(parents=True, exist_ok=True)  # an empty store still gets its directory
+        os.replace(staging, root / snapshot_id)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    data = {
+        "format": FORMAT_VERSION, "id": snapshot_id,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "source": "analysis.Observation",
+        "stamp": stamp_key(generation, updated_at),
+        "columns": list(COLUMNS), "row_group_size": row_group_size,
+        "rows": sum(p["rows"] for p in partitions), "partitions": partitions,
+    }
+    tmp = root / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(data, indent=1))
+    os.replace(tmp, root / MANIFEST)
+
+    snapshots = sorted(p for p in root.iterdir() if p.is_dir() and not p.name.startswith("."))
+    for old in snapshots[:-max(keep, 1)]:
+        shutil.rmtree(old, ignore_errors=True)
+    return Manifest(root, data)
+
+def stamp_key(generation: int, updated_at) -> str:
+    """The Observation table stamp a snapshot was taken at, as stored in its manifest."""
+    return f"{generation}@{updated_at.isoformat() if updated_at else ''}"
@@ -1,3 +1,981 @@
-from django.test import TestCase
+import contextvars
+from decimal import Decimal
+import gzip
+import json
+import tempfile
+import threading
+import unittest
+from io import StringIO
+from pathlib import Path
 
-# Create your tests here.
+import numpy as np
+import pandas as pd
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from . import analytics, batch
+from .benchmarks import compare, route_paths, run_scale
+from .derived import recompute, rolling_zscore, rolling_zscores
+from .frames import pyarrow
+from .importers import import_csv_stream
+from .instrumentation import InstrumentationMiddleware, RequestSample, registry
+from . import snapshots
+from .observations import fresh_snapshot, observation_frame
+from .rankings import forget_ranking_index
+from .materialize import mode, refresh
+from .matrices import load_matrix
+from .models import (
+    EconomicIndicator, Observation, RefArea, VolatilityAnalysis, BricsComparison, StatisticalSummary,
+    AreaSummary, AreaVolatility,
+)
+from .versioning import bump_generation
+
+
+def make_indicators(*rows):
+    # rows: (year, gdp, inflation[, gdp_yoy])
+    objs = []
+    for row in rows:
+        year, gdp, infl = row[:3]
+        yoy = row[3] if len(row) > 3 else gdp
+        objs.append(EconomicIndicator(
+            year=year, gdp_zar_bn=Decimal(str(gdp)), inflation_rate=Decimal(str(infl)),
+            gdp_yoy_change=Decimal(str(yoy)), inflation_yoy_change=Decimal(str(infl)),
+            era="Post-Apartheid" if year >= 1994 else "Apartheid",
+        ))
+    created = EconomicIndicator.objects.bulk_create(objs)
+    bump_generation(EconomicIndicator)  # as every bulk write path does
+    return created
+
+
+class PanelContextTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((1985, -1.21, 16.29), (1993, 1.23, 9.72), (2008, 3.19, 10.07), (2020, -6.17, 3.21))
+
+    def test_kpis_computed_in_one_pass(self):
+        resp = self.client.get(reverse('database_panel'))
+        ctx = resp.context
+        eras = {row['era']: row for row in ctx['kpi_era']}
+        self.assertEqual(eras['Apartheid']['years_count'], 2)
+        self.assertEqual(eras['Post-Apartheid']['best_gdp'], Decimal('3.19'))
+        self.assertEqual([r['year'] for r in ctx['best']], [2008])
+        self.assertEqual([r['year'] for r in ctx['worst']], [2020])
+        self.assertEqual([r['year'] for r in ctx['recent']], [2020])
+        row = next(r for r in ctx['indicators'] if r['year'] == 2020)
+        self.assertEqual((row['growth_category'], row['inflation_category']), ("Recession/Decline", "Target Range"))
+
+    def test_cached_panel_renders_without_queries_until_write(self):
+        self.client.get(reverse('database_panel'))
+        with self.assertNumQueries(1):  # just the indicator table page
+            self.client.get(reverse('database_panel'))
+
+        EconomicIndicator.objects.filter(year=2020).first().delete()
+        resp = self.client.get(reverse('database_panel'))
+        self.assertEqual([r['year'] for r in resp.context['worst']], [1985])
+
+    def test_year_search_filters_cached_rows(self):
+        resp = self.client.get(reverse('database_panel'), {'year': 1993})
+        self.assertEqual(resp.context['search_row']['year'], 1993)
+        self.assertEqual(len(resp.context['indicators']), 1)
+
+
+class BulkImportTests(TestCase):
+    def test_economic_upsert_reports_inserted_updated_rejected(self):
+        make_indicators((2008, 3.19, 10.07))
+        csv_text = (
+            "year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflation_yoy_change\n"
+            "2008,3.50,9.00,3.50,9.00\n"
+            "2009,-1.54,7.22,-1.54,7.22\n"
+            "20x0,1,1,1,1\n"
+            "2010,3.04,4.09,3.04,4.09\n"
+        )
+        report = import_csv_stream('economic', StringIO(csv_text), chunk_size=2)
+        self.assertEqual((report.inserted, report.updated, report.rejected), (2, 1, 1))
+        self.assertEqual(EconomicIndicator.objects.get(year=2008).gdp_zar_bn, Decimal('3.50'))
+        self.assertEqual(EconomicIndicator.objects.get(year=2009).era, "Post-Apartheid")
+
+    def test_volatility_rows_for_unknown_years_are_rejected(self):
+        make_indicators((2020, -6.17, 3.21))
+        csv_text = (
+            "year,gdp_yoy_change,inflation_yoy_change,volatility_flag,is_outlier,notes\n"
+            "2020,-2.45,3.21,True,True,COVID-19\n"
+            "1900,0,0,False,False,nope\n"
+        )
+        with CaptureQueriesContext(connection) as ctx:
+            report = import_csv_stream('volatility', StringIO(csv_text))
+        data_queries = [q for q in ctx.captured_queries if 'analysis_datageneration' not in q['sql']
+                        and 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(len(data_queries), 3)  # year lookup, existing keys, upsert
+        self.assertEqual((report.inserted, report.rejected), (1, 1))
+        self.assertTrue(VolatilityAnalysis.objects.get(indicator__year=2020).is_outlier)
+
+    def test_blank_required_values_are_rejected_not_fatal(self):
+        csv_text = (
+            "year,gdp_zar_bn,inflation_rate\n"
+            "2008,,9.00\n"
+            "2009,-1.54,NULL\n"
+            "2010,3.04,4.09\n"
+        )
+        report = import_csv_stream('economic', StringIO(csv_text))
+        self.assertEqual((report.inserted, report.rejected), (1, 2))
+        self.assertIn("gdp_zar_bn", report.errors[0])
+        self.assertEqual(list(EconomicIndicator.objects.values_list('year', flat=True)), [2010])
+
+    def test_repeated_keys_count_as_duplicates(self):
+        csv_text = (
+            "year,gdp_zar_bn,inflation_rate\n"
+            "2008,3.19,10.07\n"
+            "2008,3.50,9.00\n"
+        )
+        for chunk_size in (1000, 1):  # within one chunk, and across chunks
+            EconomicIndicator.objects.all().delete()
+            report = import_csv_stream('economic', StringIO(csv_text), chunk_size=chunk_size)
+            self.assertEqual((report.inserted, report.updated, report.duplicates), (1, 0, 1), chunk_size)
+            self.assertEqual(EconomicIndicator.objects.get(year=2008).gdp_zar_bn, Decimal('3.50'))
+
+    def test_bad_header_raises(self):
+        with self.assertRaises(ValueError):
+            import_csv_stream('stats', StringIO("indicator,mean_value\nGDP,1\n"))
+
+
+class StreamingExportTests(TestCase):
+    def test_performance_summary_csv_streams_sql_labels(self):
+        make_indicators((1993, 1.23, 9.72), (2004, 4.55, -0.69))
+        resp = self.client.get(reverse('export_performance_summary_csv'))
+        self.assertTrue(resp.streaming)
+        lines = b"".join(resp.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], "year,gdp_zar_bn,inflation_rate,era,growth_category,inflation_category")
+        self.assertEqual(lines[1], "1993,1.23,9.72,Apartheid,Moderate Growth,High Inflation")
+        self.assertEqual(lines[2], "2004,4.55,-0.69,Post-Apartheid,High Growth,Low Inflation")
+
+    def test_all_exports_stream(self):
+        make_indicators((2008, 3.19, 10.07))
+        for name in ('export_economic_csv', 'export_volatility_csv', 'export_brics_csv', 'export_stats_csv'):
+            resp = self.client.get(reverse(name))
+            self.assertTrue(resp.streaming, name)
+            self.assertIn('attachment', resp['Content-Disposition'])
+
+
+class SeedCommandTests(TestCase):
+    def test_seeds_embedded_dataset(self):
+        call_command('seed_db', stdout=StringIO())
+        self.assertEqual(EconomicIndicator.objects.count(), 63)
+        self.assertEqual(EconomicIndicator.objects.get(year=1993).era, "Apartheid")
+        self.assertEqual(EconomicIndicator.objects.get(year=1994).era, "Post-Apartheid")
+        covid = VolatilityAnalysis.objects.get(indicator_id=2020)
+        self.assertEqual((covid.gdp_yoy_change, covid.is_outlier), (Decimal('-6.43'), True))
+        self.assertEqual(covid.notes, "COVID-19 pandemic impact")  # curated notes survive
+        self.assertTrue(VolatilityAnalysis.objects.get(indicator_id=2009).is_outlier)
+
+    def test_seeds_from_source_directory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            Path(tmp, "economic_indicators.csv").write_text(
+                "id,year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflation_yoy_change,era\n"
+                "1,2019,0.26,4.12,0.26,4.12,\n"
+                "2,2020,-6.17,3.21,,3.21,Post-Apartheid\n"
+            )
+            Path(tmp, "volatility_analysis.csv").write_text(
+                "year,gdp_yoy_change,inflation_yoy_change,volatility_flag,is_outlier,notes\n"
+                "2020,-2.45,3.21,True,True,COVID-19\n"
+                "1985,-2.10,4.20,True,True,not seeded\n"
+            )
+            out = StringIO()
+            call_command('seed_db', source=tmp, batch_size=1, stdout=out)
+        self.assertIn("rows/s", out.getvalue())
+        self.assertIsNone(EconomicIndicator.objects.get(year=2019).gdp_yoy_change)
+        self.assertEqual(EconomicIndicator.objects.get(year=2020).gdp_yoy_change, Decimal('-6.43'))
+        self.assertEqual(list(VolatilityAnalysis.objects.values_list('indicator_id', flat=True)), [2020])
+
+
+WIDE_CSV = (
+    "FREQ_ID,REF_AREA_ID,REF_AREA_NAME,INDICATOR_ID,COMMENT_TS,1961,1962,1963\n"
+    "A,ZAF,South Africa,WB_WDI_NY_GDP_MKTP_KD_ZG,GDP growth,3.84,6.18,7.37\n"
+    "A,ABW,Aruba,WB_WDI_NY_GDP_MKTP_KD_ZG,GDP growth,,,16.08\n"
+)
+
+
+class WorldBankIngestTests(TestCase):
+    def test_unpivots_every_area_and_skips_gaps(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp, "GDP.csv")
+            path.write_text(WIDE_CSV)
+            call_command('ingest_worldbank', dataset=[f"gdp={path}"], chunksize=1, stdout=StringIO())
+            # reloading replaces rather than duplicates
+            call_command('ingest_worldbank', dataset=[f"gdp={path}"], stdout=StringIO())
+        self.assertEqual(RefArea.objects.get(code="ABW").name, "Aruba")
+        self.assertEqual(Observation.objects.filter(indicator="gdp").count(), 4)
+        self.assertEqual(
+            list(Observation.objects.filter(ref_area="ZAF").order_by("year").values_list("year", "value")),
+            [(1961, 3.84), (1962, 6.18), (1963, 7.37)],
+        )
+
+    def test_converted_matrix_is_memory_mapped_and_read_by_ingest(self):
+        with tempfile.TemporaryDirectory() as tmp, self.settings(ANALYSIS_MATRIX_DIR=Path(tmp, "matrices")):
+            path = Path(tmp, "GDP.csv")
+            path.write_text(WIDE_CSV)
+            call_command('convert_worldbank', dataset=[f"gdp={path}"], stdout=StringIO())
+            matrix = load_matrix(Path(tmp, "matrices"), "gdp")
+            self.assertIsInstance(matrix.values, np.memmap)
+            self.assertEqual((matrix.areas.tolist(), matrix.years.tolist()), (["ZAF", "ABW"], [1961, 1962, 1963]))
+            years, values = matrix.series("ABW", start=1962)
+            self.assertTrue(np.shares_memory(values, matrix.values))  # a view, not a copy
+            self.assertEqual(years.tolist(), [1962, 1963])
+            np.testing.assert_array_equal(values, [np.nan, 16.08])
+            self.assertIsNone(matrix.series("XXX"))
+
+            out = StringIO()
+            call_command('ingest_worldbank', dataset=[f"gdp={path}"], stdout=out)
+            self.assertIn("from gdp.npy", out.getvalue())
+            self.assertEqual(Observation.objects.filter(indicator="gdp").count(), 4)
+
+            path.write_text(WIDE_CSV.replace("3.84", "4.00"))  # the CSV moved on: parse it again
+            self.assertFalse(matrix.is_fresh(path))
+            out = StringIO()
+            call_command('ingest_worldbank', dataset=[f"gdp={path}"], stdout=out)
+            self.assertIn("from GDP.csv", out.getvalue())
+            self.assertEqual(Observation.objects.get(ref_area="ZAF", year=1961).value, 4.0)
+
+
+class CountryScopedEndpointTests(TestCase):
+    def setUp(self):
+        make_indicators((1993, 1.23, 9.72), (2008, 3.19, 10.07))
+        RefArea.objects.create(code="ABW", name="Aruba")
+        Observation.objects.bulk_create([
+            Observation(ref_area_id="ABW", indicator="gdp", year=1990, value=4.0),
+            Observation(ref_area_id="ABW", indicator="inflation", year=1990, value=5.0),
+            Observation(ref_area_id="ABW", indicator="gdp", year=2000, value=8.0),
+            Observation(ref_area_id="ABW", indicator="inflation", year=2000, value=3.0),
+            Observation(ref_area_id="ABW", indicator="gdp", year=2001, value=1.0),  # no inflation value
+        ])
+
+    def test_series_defaults_to_home_area_tables(self):
+        data = self.client.get(reverse('api_series_economic')).json()
+        self.assertEqual(data['years'], [1993, 2008])
+
+    def test_series_for_other_area_reads_observations(self):
+        data = self.client.get(reverse('api_series_economic'), {'area': 'abw'}).json()
+        self.assertEqual(data, {'years': [1990, 2000], 'gdp': [4.0, 8.0], 'inflation': [5.0, 3.0]})
+        self.assertEqual(self.client.get(reverse('api_series_economic'), {'area': 'XXX'}).status_code, 404)
+
+    def test_era_comparison_for_other_area(self):
+        rows = self.client.get('/api/apartheid-comparison/', {'area': 'ABW'}).json()
+        self.assertEqual([(r['era'], r['years_count'], r['mean_gdp']) for r in rows],
+                         [('Apartheid', 1, 4.0), ('Post-Apartheid', 1, 8.0)])
+
+
+class ChartPayloadTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((1964, 7.94, 2.53), (1986, 0.02, 18.65), (2004, 4.55, -0.69), (2020, -6.17, 3.21))
+
+    def test_payloads_match_notebook_maths(self):
+        data = self.client.get(reverse('api_chart', args=['bar'])).json()
+        self.assertAlmostEqual(data['bar_gdp'][0], (7.94 + 0.02) / 2)
+        line = self.client.get(reverse('api_chart', args=['line'])).json()
+        self.assertEqual(line['years'], [1986, 2004, 2020])
+        self.assertAlmostEqual(line['gdp'][0], 0.02 - 7.94)
+        extremes = self.client.get(reverse('api_chart', args=['bar_extremes'])).json()
+        self.assertEqual(extremes['labels'][0], "Best GDP\n(1964, Pre-Apartheid)")
+        self.assertEqual(extremes['labels'][3], "Worst Inflation\n(1986, Pre-Apartheid)")
+        self.assertEqual(self.client.get(reverse('api_chart', args=['nope'])).status_code, 404)
+
+    def test_revalidation_returns_304_until_data_changes(self):
+        url = reverse('api_chart', args=['scatter'])
+        first = self.client.get(url)
+        self.assertIn('Last-Modified', first)
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(again.status_code, 304)
+
+        EconomicIndicator.objects.get(year=2020).save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+class ConditionalGetTests(TestCase):
+    API = ['/api/apartheid-comparison/', '/api/high-volatility/', '/api/performance-summary/',
+           '/api/recent-trends/', '/api/outliers/', '/api/avg-by-era/', '/api/series/economic/']
+
+    def setUp(self):
+        cache.clear()
+        make_indicators((2008, 3.19, 10.07), (2020, -6.17, 3.21))
+
+    def test_matching_etag_short_circuits_before_the_orm(self):
+        for url in self.API:
+            etag = self.client.get(url)['ETag']
+            self.assertFalse(etag.startswith('W/'), url)
+            with self.assertNumQueries(0):
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304, url)
+
+    def test_writes_only_invalidate_tables_they_touch(self):
+        perf = self.client.get('/api/performance-summary/')['ETag']
+        vol = self.client.get('/api/high-volatility/')['ETag']
+        VolatilityAnalysis.objects.create(indicator_id=2008, volatility_flag=True)
+        self.assertEqual(self.client.get('/api/performance-summary/', HTTP_IF_NONE_MATCH=perf).status_code, 304)
+        self.assertEqual(self.client.get('/api/high-volatility/', HTTP_IF_NONE_MATCH=vol).status_code, 200)
+
+
+class MaterializationTests(TestCase):
+    def test_seed_materializes_stats_from_indicators(self):
+        call_command('seed_db', stdout=StringIO())
+        gdp = StatisticalSummary.objects.get(indicator="GDP (ZAR bn)")
+        self.assertEqual(gdp.sample_size, 63)
+        self.assertEqual(gdp.mean_value, Decimal('2.79'))
+        self.assertEqual(StatisticalSummary.objects.get(indicator="Inflation (%)").max_value, Decimal('18.65'))
+        post = BricsComparison.objects.get(period_type="post-brics")
+        self.assertEqual((post.start_year, post.end_year), (2010, 2023))
+        self.assertEqual(post.gdp_range_min, Decimal('-6.17'))
+
+    def test_write_refreshes_only_periods_containing_the_year(self):
+        make_indicators((1995, 3.10, 8.68), (2015, 1.32, 4.54))
+        refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            ei = EconomicIndicator.objects.get(year=2015)
+            ei.gdp_zar_bn = Decimal('5.00')
+            ei.save()
+        post = BricsComparison.objects.get(period_type="post-brics")
+        self.assertEqual(post.mean_gdp_zar_bn, Decimal('5.00'))
+        self.assertEqual(refresh([2015])['brics'], 1)
+        self.assertEqual(refresh([2010])['brics'], 2)  # boundary year feeds both windows
+        self.assertEqual(StatisticalSummary.objects.get(indicator="GDP (ZAR bn)").max_value, Decimal('5.00'))
+
+
+    def test_periods_left_without_data_lose_their_rows(self):
+        make_indicators((1995, 3.10, 8.68), (2015, 1.32, 4.54))
+        refresh()
+        with self.captureOnCommitCallbacks(execute=True):
+            EconomicIndicator.objects.filter(year=2015).delete()
+        self.assertEqual(list(BricsComparison.objects.values_list('period_type', flat=True)), ['pre-brics'])
+        self.assertEqual(StatisticalSummary.objects.get(indicator="GDP (ZAR bn)").sample_size, 1)
+
+        EconomicIndicator.objects.all().delete()
+        refresh()
+        self.assertFalse(BricsComparison.objects.exists())
+        self.assertFalse(StatisticalSummary.objects.exists())
+
+
+class DerivedMetricsTests(TestCase):
+    def setUp(self):
+        # a steady 2% +/- 0.5 series, so a jump stands out against the rolling window
+        make_indicators(*[(y, 2 + (0.5 if y % 2 else -0.5), 5) for y in range(2000, 2016)])
+        recompute()
+
+    def _edit(self, year, gdp):
+        with self.captureOnCommitCallbacks(execute=True):
+            ei = EconomicIndicator.objects.get(year=year)
+            ei.gdp_zar_bn = Decimal(gdp)
+            ei.save()
+
+    def test_write_recomputes_the_year_and_its_successor(self):
+        self.assertIsNone(EconomicIndicator.objects.get(year=2000).gdp_yoy_change)
+        self._edit(2010, '4.00')
+        yoy = dict(EconomicIndicator.objects.values_list('year', 'gdp_yoy_change'))
+        self.assertEqual((yoy[2009], yoy[2010], yoy[2011]), (Decimal('1.00'), Decimal('1.50'), Decimal('-1.50')))
+        self.assertEqual(recompute([2010]), {"yoy": 0, "volatility": 0})  # already consistent
+
+    def test_spike_is_flagged_then_cleared(self):
+        self._edit(2012, '9.00')
+        spike = VolatilityAnalysis.objects.get(indicator_id=2012)
+        self.assertTrue(spike.volatility_flag and spike.is_outlier)
+        self.assertIn("z-score", spike.notes)
+        spike.notes = "checked"
+        spike.save()
+
+        self._edit(2012, '1.50')
+        spike.refresh_from_db()
+        self.assertEqual((spike.volatility_flag, spike.notes), (False, "checked"))
+        self.assertFalse(VolatilityAnalysis.objects.filter(volatility_flag=True).exists())
+
+    def test_import_derives_yoy_instead_of_trusting_the_file(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            import_csv_stream('economic', StringIO(
+                "year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflation_yoy_change\n"
+                "2016,3.00,6.00,99,99\n"
+            ))
+        row = EconomicIndicator.objects.get(year=2016)
+        self.assertEqual((row.gdp_yoy_change, row.inflation_yoy_change), (Decimal('0.50'), Decimal('1.00')))
+
+
+class ColumnarCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((1993, 1.23, 9.72), (2013, 2.49, 5.75), (2020, -6.17, 3.21))
+
+    def test_read_endpoints_slice_columns_without_queries(self):
+        urls = ['/api/series/economic/', '/api/performance-summary/', '/api/recent-trends/',
+                '/api/avg-by-era/', '/api/apartheid-comparison/']
+        for url in urls:
+            self.client.get(url)
+        with self.assertNumQueries(0):
+            for url in urls:
+                self.assertEqual(self.client.get(url).status_code, 200, url)
+
+        recent = self.client.get('/api/recent-trends/').json()
+        self.assertEqual([r['year'] for r in recent], [2020, 2013])
+        self.assertEqual(recent[0]['gdp_zar_bn'], -6.17)
+        perf = self.client.get('/api/performance-summary/').json()
+        self.assertEqual(perf[0]['growth_category'], "Moderate Growth")
+
+    def test_write_reloads_columns(self):
+        self.client.get('/api/series/economic/')
+        EconomicIndicator.objects.filter(year=2020).delete()
+        self.assertEqual(self.client.get('/api/series/economic/').json()['years'], [1993, 2013])
+
+
+class JsonRendererTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((2013, 2.49, 5.75), (2020, -6.17, 3.21))
+
+    def test_columnar_layout_and_quantization(self):
+        cols = self.client.get('/api/recent-trends/', {'layout': 'columns'}).json()
+        self.assertEqual(cols['year'], [2020, 2013])
+        self.assertEqual(cols['gdp_zar_bn'], [-6.17, 2.49])
+        avg = self.client.get('/api/avg-by-era/', {'digits': 0}).json()
+        self.assertEqual(avg[0]['avg_gdp'], -2.0)
+        self.assertEqual(self.client.get('/api/recent-trends/', {'layout': 'xml'}).status_code, 400)
+
+    def test_stdlib_fallback_renders_the_same_document(self):
+        fast = self.client.get('/api/performance-summary/').json()
+        with self.settings(ANALYSIS_JSON_BACKEND='json'):
+            self.assertEqual(self.client.get('/api/performance-summary/').json(), fast)
+
+
+class IndicatorPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators(*[(y, 1.5, 4.0) for y in range(1990, 2000)])
+
+    def test_keyset_pages_walk_the_filtered_table(self):
+        self.client.get(reverse('api_indicators'))  # warm the generation snapshot
+        years, after = [], None
+        while True:
+            params = {'limit': 3, 'year_from': 1992, 'era': 'Apartheid'}
+            if after:
+                params['after'] = after
+            with self.assertNumQueries(1):
+                body = self.client.get(reverse('api_indicators'), params).json()
+            years += [r['year'] for r in body['data']]
+            after = body['next']
+            if after is None:
+                break
+        self.assertEqual(years, [1992, 1993])
+        first = self.client.get(reverse('api_indicators'), {'limit': 4}).json()
+        self.assertEqual((first['next'], first['data'][0]['growth_category']), ("ZAF:1993", "Moderate Growth"))
+        self.assertEqual(self.client.get(reverse('api_indicators'), {'era': 'Bronze'}).status_code, 400)
+
+    def test_other_areas_page_over_observations(self):
+        RefArea.objects.bulk_create([RefArea(code="BRA", name="Brazil"), RefArea(code="IND", name="India")])
+        Observation.objects.bulk_create([
+            Observation(ref_area_id=a, indicator=i, year=y, value=v)
+            for a in ("BRA", "IND") for y in (2000, 2001) for i, v in (("gdp", 4.2), ("inflation", 7.5))
+        ])
+        page = self.client.get(reverse('api_indicators'), {'area': 'ind,bra', 'limit': 3}).json()
+        self.assertEqual([(r['ref_area'], r['year']) for r in page['data']], [("BRA", 2000), ("BRA", 2001), ("IND", 2000)])
+        self.assertEqual((page['data'][0]['inflation_rate'], page['data'][0]['growth_category']), (7.5, "High Growth"))
+        rest = self.client.get(reverse('api_indicators'), {'area': 'BRA,IND', 'after': page['next']}).json()
+        self.assertEqual([(r['ref_area'], r['year']) for r in rest['data']], [("IND", 2001)])
+
+    def test_panel_renders_first_page_and_lazy_rows(self):
+        with self.settings(ANALYSIS_TABLE_PAGE_SIZE=4):
+            resp = self.client.get(reverse('database_panel'))
+            self.assertEqual([r['year'] for r in resp.context['indicators']], [1990, 1991, 1992, 1993])
+            self.assertContains(resp, "after=ZAF%3A1993")
+            more = self.client.get(reverse('indicator_rows'), {'after': 'ZAF:1997'})
+        self.assertContains(more, "<td>1998", count=1)
+        self.assertNotContains(more, "Load more")
+
+
+class AsyncEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((1993, 1.23, 9.72), (2009, -1.54, 7.22), (2020, -6.17, 3.21))
+        VolatilityAnalysis.objects.create(indicator_id=2009, volatility_flag=True, is_outlier=True, notes="GFC")
+
+    async def test_async_twins_match_sync_endpoints(self):
+        for name in ('apartheid-comparison', 'high-volatility', 'performance-summary', 'recent-trends',
+                     'outliers', 'avg-by-era', 'series/economic'):
+            sync = await self.async_client.get(f'/api/{name}/')
+            resp = await self.async_client.get(f'/api/async/{name}/')
+            self.assertEqual(resp.json(), sync.json(), name)
+            self.assertEqual(resp['ETag'], sync['ETag'], name)
+            again = await self.async_client.get(f'/api/async/{name}/', headers={'if-none-match': resp['ETag']})
+            self.assertEqual(again.status_code, 304, name)
+
+    async def test_dashboard_gathers_every_section(self):
+        body = (await self.async_client.get('/api/async/dashboard/', {'layout': 'columns'})).json()
+        self.assertEqual(body['outliers']['year'], [2009])
+        self.assertEqual(body['recent_trends']['year'], [2020])
+        self.assertEqual(body['series']['years'], [1993, 2009, 2020])
+        self.assertEqual({r for r in body}, {'apartheid_comparison', 'high_volatility', 'performance_summary',
+                                             'recent_trends', 'outliers', 'avg_by_era', 'series'})
+
+
+class BootstrapTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators((1993, 1.23, 9.72), (2008, 3.19, 10.07), (2020, -6.17, 3.21))
+        refresh()
+
+    def test_one_response_carries_every_section(self):
+        resp = self.client.get(reverse('api_bootstrap'), headers={'accept-encoding': 'gzip'})
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        body = json.loads(gzip.decompress(resp.content))['sections']
+        self.assertEqual(set(body), {'charts', 'kpis', 'volatility', 'brics', 'stats'})
+        self.assertEqual(body['charts']['data']['scatter']['gdp'], [1.23, 3.19, -6.17])
+        self.assertEqual({r['indicator'] for r in body['stats']['data']}, {"GDP (ZAR bn)", "Inflation (%)"})
+
+    def test_sections_the_client_holds_are_skipped_until_they_change(self):
+        first = self.client.get(reverse('api_bootstrap')).json()['sections']
+        have = [f"{name}@{s['version']}" for name, s in first.items()]
+        again = self.client.get(reverse('api_bootstrap'), {'have': have}).json()['sections']
+        self.assertTrue(all(s.get('unchanged') for s in again.values()))
+
+        VolatilityAnalysis.objects.create(indicator_id=2008, volatility_flag=True)
+        after = self.client.get(reverse('api_bootstrap'), {'have': have}).json()['sections']
+        self.assertEqual([n for n, s in after.items() if 'data' in s], ['volatility'])
+
+
+class CompressionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        make_indicators(*[(1980 + i, 1.0 + i / 10, 5.0 + i / 10) for i in range(40)])
+
+    def test_large_api_responses_are_gzipped_with_a_weak_etag(self):
+        plain = self.client.get('/api/performance-summary/')
+        resp = self.client.get('/api/performance-summary/', headers={'accept-encoding': 'gzip'})
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', resp['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(resp.content)), plain.json())
+        self.assertLess(len(resp.content), len(plain.content))
+        self.assertEqual(resp['ETag'], 'W/' + plain['ETag'])
+        again = self.client.get('/api/performance-summary/', headers={'accept-encoding': 'gzip',
+                                                                       'if-none-match': resp['ETag']})
+        self.assertEqual(again.status_code, 304)
+
+    def test_small_responses_and_other_paths_are_left_alone(self):
+        with self.settings(ANALYSIS_COMPRESS_MIN_BYTES=10**6):
+            resp = self.client.get('/api/performance-summary/', headers={'accept-encoding': 'gzip'})
+        self.assertFalse(resp.has_header('Content-Encoding'))
+        resp = self.client.get(reverse('database_panel'), headers={'accept-encoding': 'gzip'})
+        self.assertFalse(resp.has_header('Content-Encoding'))
+
+    def test_csv_exports_stream_compressed(self):
+        resp = self.client.get(reverse('export_economic_csv'), headers={'accept-encoding': 'gzip'})
+        self.assertTrue(resp.streaming)
+        self.assertEqual(resp['Content-Encoding'], 'gzip')
+        lines = gzip.decompress(b"".join(resp.streaming_content)).decode().splitlines()
+        self.assertEqual(len(lines), 41)
+
+    def test_collectstatic_writes_gzip_siblings(self):
+        with tempfile.TemporaryDirectory() as root, self.settings(STATIC_ROOT=root):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            source = (Path(root) / 'css' / 'dashboard.css').read_bytes()
+            self.assertEqual(gzip.decompress((Path(root) / 'css' / 'dashboard.css.gz').read_bytes()), source)
+
+
+class BenchmarkSuiteTests(TestCase):
+    def test_every_route_import_export_and_command_is_measured(self):
+        results = run_scale(1, repeat=1)
+        cases = [r['case'] for r in results]
+        self.assertEqual(cases[0], 'command seed_db')
+        self.assertEqual(cases[1:-2], [label for label, _ in route_paths()])
+        self.assertEqual(cases[-2:], ['POST import_csv (economic)', 'command export_to_pandas'])
+        self.assertTrue(all(r.get('status', 200) < 500 for r in results), results)
+        self.assertEqual({r['rows'] for r in results}, {63})
+        panel = next(r for r in results if r['case'] == 'GET /database/panel/')
+        self.assertGreater(panel['queries'], panel['warm_queries'])
+        json.dumps(results)
+
+    def test_compare_flags_slower_and_chattier_cases(self):
+        before = [{'scale': 1, 'case': 'a', 'warm_ms': 10.0, 'queries': 2},
+                  {'scale': 1, 'case': 'b', 'warm_ms': 0.2, 'queries': 1}]
+        after = [{'scale': 1, 'case': 'a', 'warm_ms': 20.0, 'queries': 3},
+                 {'scale': 1, 'case': 'b', 'warm_ms': 0.6, 'queries': 1}]
+        self.assertEqual(compare(after, before), ['1x a: 10.0 -> 20.0 ms warm', '1x a: 2 -> 3 queries'])
+
+
+@override_settings(ANALYSIS_INSTRUMENTATION=True)
+class InstrumentationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        registry.reset()
+        make_indicators((2008, 3.19, 10.07), (2020, -6.17, 3.21))
+
+    def test_server_timing_and_prometheus_histograms(self):
+        resp = self.client.get(reverse('database_panel'))
+        self.assertRegex(resp['Server-Timing'], r'^app;dur=[\d.]+, db;dur=[\d.]+;desc="\d+ queries, 0 duplicate"$')
+        self.client.get(reverse('database_panel'))
+
+        metrics = self.client.get(reverse('metrics'))
+        self.assertEqual(metrics.status_code, 200)
+        self.assertTrue(metrics['Content-Type'].startswith('text/plain; version=0.0.4'))
+        body = metrics.content.decode()
+        self.assertIn('analysis_requests_total{view="database_panel",status="200"} 2', body)
+        self.assertIn('analysis_request_duration_seconds_bucket{view="database_panel",le="+Inf"} 2', body)
+        self.assertIn('analysis_db_queries_count{view="database_panel"} 2', body)
+        self.assertIn('# TYPE analysis_response_size_bytes histogram', body)
+        self.assertNotIn('view="metrics"', body)
+
+    def test_repeated_statements_count_as_duplicates(self):
+        sample = RequestSample()
+        with connection.execute_wrapper(sample):
+            for _ in range(3):
+                list(EconomicIndicator.objects.filter(year=2008))
+            list(EconomicIndicator.objects.filter(year=2020))
+        self.assertEqual((sample.count, sample.duplicates), (4, 2))
+
+    async def test_async_views_are_counted(self):
+        resp = await self.async_client.get('/api/async/outliers/')
+        self.assertRegex(resp['Server-Timing'], r'desc="[1-9]\d* queries')
+
+    def test_sql_on_other_threads_is_charged_to_the_request(self):
+        # what sync_to_async does for the async ORM: run on an executor thread with the caller's context
+        def query():
+            with connections['default'].cursor() as cursor:
+                cursor.execute("SELECT 1")
+            connections['default'].close()
+
+        def get_response(request):
+            worker = threading.Thread(target=contextvars.copy_context().run, args=(query,))
+            worker.start()
+            worker.join()
+            return HttpResponse()
+
+        resp = InstrumentationMiddleware(get_response)(RequestFactory().get('/'))
+        self.assertIn('desc="1 queries', resp['Server-Timing'])
+
+    def test_metrics_is_local_only_and_off_by_default(self):
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='203.0.113.9').status_code, 404)
+        with self.settings(ANALYSIS_INSTRUMENTATION=False):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+
+class ExportToPandasTests(TestCase):
+    def setUp(self):
+        make_indicators((1993, 1.23, 9.72), (2008, 3.19, 10.07), (2020, -6.17, 3.21))
+        VolatilityAnalysis.objects.create(indicator_id=2008, volatility_flag=True, notes="GFC")
+        self.out = tempfile.TemporaryDirectory()
+        self.addCleanup(self.out.cleanup)
+
+    def test_chunked_csv_has_typed_columns(self):
+        call_command('export_to_pandas', '--chunk-size', '2', '--output-dir', self.out.name, stdout=StringIO())
+        econ = pd.read_csv(Path(self.out.name) / 'economic_indicators.csv')
+        self.assertEqual(econ['year'].tolist(), [1993, 2008, 2020])
+        self.assertEqual(econ['gdp_zar_bn'].dtype, 'float64')
+        self.assertEqual(econ['gdp_zar_bn'].tolist(), [1.23, 3.19, -6.17])
+        self.assertEqual(econ['era'].tolist(), ['Apartheid', 'Post-Apartheid', 'Post-Apartheid'])
+        vol = pd.read_csv(Path(self.out.name) / 'volatility_analysis.csv')
+        self.assertEqual(vol[['year', 'volatility_flag', 'notes']].values.tolist(), [[2008, True, 'GFC']])
+
+    def test_compressed_csv_and_empty_tables(self):
+        call_command('export_to_pandas', '--tables', 'observations', '--compression', 'gzip',
+                     '--output-dir', self.out.name, stdout=StringIO())
+        body = gzip.decompress((Path(self.out.name) / 'observations.csv.gz').read_bytes()).decode()
+        self.assertEqual(body.strip(), 'ref_area,indicator,year,value')
+
+    @unittest.skipIf(pyarrow is not None, "pyarrow is installed")
+    def test_binary_formats_need_pyarrow(self):
+        with self.assertRaisesMessage(CommandError, 'needs pyarrow'):
+            call_command('export_to_pandas', '--format', 'parquet', '--output-dir', self.out.name, stdout=StringIO())
+
+    @unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+    def test_parquet_and_feather_round_trip(self):
+        for fmt, read in (('parquet', pd.read_parquet), ('feather', pd.read_feather)):
+            call_command('export_to_pandas', '--tables', 'economic', '--format', fmt, '--chunk-size', '2',
+                         '--output-dir', self.out.name, stdout=StringIO())
+            df = read(Path(self.out.name) / f'economic_indicators.{fmt}')
+            self.assertEqual(df['year'].tolist(), [1993, 2008, 2020], fmt)
+            self.assertEqual(str(df['era'].dtype), 'category', fmt)
+
+
+class SnapshotStoreTests(TestCase):
+    MANIFEST = {'id': 's1', 'stamp': '1@', 'partitions': [
+        {'ref_area': 'ZAF', 'indicator': 'gdp', 'path': 'ref_area=ZAF/indicator=gdp/part-0.parquet',
+         'rows': 3, 'min_year': 1990, 'max_year': 2020},
+        {'ref_area': 'ZAF', 'indicator': 'inflation', 'path': 'ref_area=ZAF/indicator=inflation/part-0.parquet',
+         'rows': 3, 'min_year': 1990, 'max_year': 2020},
+        {'ref_area': 'BRA', 'indicator': 'gdp', 'path': 'ref_area=BRA/indicator=gdp/part-0.parquet',
+         'rows': 2, 'min_year': 2010, 'max_year': 2011},
+    ]}
+
+    def setUp(self):
+        cache.clear()
+        self.root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.root.cleanup)
+
+    def test_manifest_prunes_partitions_by_key_and_year_range(self):
+        m = snapshots.Manifest(self.root.name, self.MANIFEST)
+        self.assertEqual([(p['ref_area'], p['indicator']) for p in m.select(areas=['ZAF'])],
+                         [('ZAF', 'gdp'), ('ZAF', 'inflation')])
+        self.assertEqual([p['ref_area'] for p in m.select(indicators=['gdp'], end=2005)], ['ZAF'])
+        self.assertEqual(m.select(areas=['BRA'], start=2012), [])
+
+    def test_partitions_straddling_chunks_are_joined(self):
+        chunks = [pd.DataFrame({'ref_area': ['BRA', 'ZAF'], 'indicator': ['gdp', 'gdp'], 'year': [2010, 1990]}),
+                  pd.DataFrame({'ref_area': ['ZAF', 'ZAF'], 'indicator': ['gdp', 'inflation'], 'year': [1991, 1990]})]
+        parts = [(g['ref_area'].iat[0], g['indicator'].iat[0], g['year'].tolist())
+                 for g in snapshots._partitions(chunks)]
+        self.assertEqual(parts, [('BRA', 'gdp', [2010]), ('ZAF', 'gdp', [1990, 1991]), ('ZAF', 'inflation', [1990])])
+
+    def observation_queries(self, ctx):
+        return [q for q in ctx.captured_queries if 'analysis_observation' in q['sql']]
+
+    def test_bulk_reads_skip_a_stale_snapshot(self):
+        RefArea.objects.create(code='BRA', name='Brazil')
+        Observation.objects.bulk_create([Observation(ref_area_id='BRA', indicator=i, year=2010, value=v)
+                                         for i, v in (('gdp', 7.5), ('inflation', 5.0))])
+        bump_generation(Observation)
+        Path(self.root.name, snapshots.MANIFEST).write_text(json.dumps(self.MANIFEST))
+        with self.settings(ANALYSIS_SNAPSHOT_DIR=self.root.name):
+            self.assertIsNone(fresh_snapshot())  # stamp '1@' is not the table's
+            with CaptureQueriesContext(connection) as ctx:
+                df = observation_frame()
+            self.assertEqual(len(self.observation_queries(ctx)), 1)
+            self.assertEqual(df['value'].tolist(), [7.5, 5.0])
+
+    @unittest.skipIf(snapshots.pyarrow is None, "pyarrow is not installed")
+    def test_written_snapshot_loads_until_the_table_changes(self):
+        RefArea.objects.bulk_create([RefArea(code='BRA', name='Brazil'), RefArea(code='IND', name='India')])
+        Observation.objects.bulk_create([
+            Observation(ref_area_id=a, indicator=i, year=y, value=y - 2000 + (i == 'inflation'))
+            for a in ('BRA', 'IND') for i in ('gdp', 'inflation') for y in range(2000, 2010)])
+        bump_generation(Observation)
+        with self.settings(ANALYSIS_SNAPSHOT_DIR=self.root.name):
+            call_command('snapshot_observations', '--row-group-size', '4', stdout=StringIO())
+            manifest = fresh_snapshot()
+            self.assertEqual(len(manifest.partitions), 4)
+            table = snapshots.read_snapshot(self.root.name, areas=['IND'], indicators=['gdp'], start=2008)
+            self.assertEqual(table.column('year').to_pylist(), [2008, 2009])
+            df = snapshots.load(self.root.name, area='BRA', start=2008)
+            self.assertEqual(df.columns.tolist(), ['ref_area', 'indicator', 'year', 'value'])
+            self.assertEqual(df['value'].tolist(), [8.0, 9.0, 9.0, 10.0])
+
+            with CaptureQueriesContext(connection) as ctx:
+                from_snapshot = observation_frame()
+            self.assertEqual(self.observation_queries(ctx), [])
+            Observation.objects.filter(ref_area_id='BRA', year=2009).delete()
+            self.assertIsNone(fresh_snapshot())
+            with CaptureQueriesContext(connection) as ctx:
+                from_database = observation_frame()
+            self.assertEqual(len(self.observation_queries(ctx)), 1)
+            kept = from_snapshot.query("ref_area != 'BRA' or year != 2009").reset_index(drop=True)
+            pd.testing.assert_frame_equal(kept, from_database)
+
+
+class AnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        analytics.memo.clear()
+        rng = np.random.default_rng(1)
+        self.gdp, self.infl = rng.normal(3, 2, 30).round(2), rng.normal(8, 4, 30).round(2)
+        make_indicators(*zip(range(1990, 2020), self.gdp.tolist(), self.infl.tolist()))
+
+    def test_rolling_kernels_match_pandas(self):
+        x, y = pd.Series(self.gdp), pd.Series(self.infl)
+        for w in (3, 5, 30):
+            mean, std = analytics.rolling_moments(x.to_numpy(), w)
+            np.testing.assert_allclose(mean, x.rolling(w).mean().dropna())
+            np.testing.assert_allclose(std, x.rolling(w).std().dropna())
+            np.testing.assert_allclose(analytics.rolling_corr(x.to_numpy(), y.to_numpy(), w),
+                                       x.rolling(w).corr(y).dropna(), atol=1e-9)
+        self.assertEqual(analytics.rolling_moments(x.to_numpy(), 31)[0].size, 0)
+        self.assertTrue(np.isnan(analytics.rolling_corr(np.ones(4), np.arange(4.0), 3)).all())
+
+    def test_lagged_xcorr_finds_the_lead(self):
+        x = np.sin(np.arange(40) / 3.0)
+        out = analytics.lagged_xcorr(x, np.roll(x, 2), 4)
+        self.assertEqual(out['lag'][np.argmax(out['corr'])], 2)
+        self.assertEqual(out['pairs'].tolist(), [36, 37, 38, 39, 40, 39, 38, 37, 36])
+        self.assertAlmostEqual(out['corr'][4], np.corrcoef(x, np.roll(x, 2))[0, 1])
+        self.assertEqual(analytics.lagged_xcorr(x[:6], x[:6], 50)['lag'].tolist(), [-3, -2, -1, 0, 1, 2, 3])
+
+    def test_rolling_endpoint_for_a_year_range(self):
+        body = self.client.get(reverse('api_analytics_rolling'),
+                               {'window': 5, 'start': 2000, 'end': 2009, 'layout': 'columns'}).json()
+        self.assertEqual(body['data']['end_year'], list(range(2004, 2010)))
+        expected = pd.Series(self.gdp[10:20]).rolling(5).mean().dropna()
+        np.testing.assert_allclose(body['data']['x_mean'], expected)
+        self.assertEqual((body['x'], body['y'], body['start'], body['end']), ('gdp', 'inflation', 2000, 2009))
+
+        lags = self.client.get(reverse('api_analytics_xcorr'), {'max_lag': 2}).json()['data']
+        self.assertEqual([r['lag'] for r in lags], [-2, -1, 0, 1, 2])
+        self.assertAlmostEqual(lags[2]['corr'], np.corrcoef(self.gdp, self.infl)[0, 1])
+
+    def test_bad_parameters_are_400(self):
+        for params in ({'window': 1}, {'window': 'x'}, {'x': 'pop'}, {'start': 2010, 'end': 2000}):
+            resp = self.client.get(reverse('api_analytics_rolling'), params)
+            self.assertEqual(resp.status_code, 400, params)
+        for max_lag in (-1, analytics.MAX_LAG + 1):
+            resp = self.client.get(reverse('api_analytics_xcorr'), {'max_lag': max_lag})
+            self.assertEqual(resp.status_code, 400, max_lag)
+
+    def test_results_are_memoized_until_the_table_changes(self):
+        url = reverse('api_analytics_rolling')
+        first = self.client.get(url, {'window': 3}).json()
+        self.client.get(url, {'window': 3})
+        self.assertEqual((analytics.memo.misses, analytics.memo.hits), (1, 1))
+        EconomicIndicator.objects.filter(year=1990).update(gdp_zar_bn=Decimal('50'))
+        bump_generation(EconomicIndicator)
+        second = self.client.get(url, {'window': 3}).json()
+        self.assertEqual(analytics.memo.misses, 2)
+        self.assertNotEqual(first['data'][0]['x_mean'], second['data'][0]['x_mean'])
+
+    def test_segment_stats_match_pandas_per_segment(self):
+        years = np.arange(1990, 2020)
+        values = np.array([1.0, 2.0, 2.0, 5.0, 3.0, 3.0] * 5)
+        bounds = analytics.segment_bounds(years, [1995, 2001, 2001, 2030])  # repeated and past-the-end breaks
+        self.assertEqual(np.diff(bounds).tolist(), [5, 6, 0, 19, 0])
+        stats = analytics.segment_stats(values, bounds)
+        for i, (lo, hi) in enumerate(zip(bounds[:-1], bounds[1:])):
+            part = pd.Series(values[lo:hi])
+            if part.empty:
+                self.assertTrue(all(np.isnan(v[i]) for v in stats.values()))
+                continue
+            self.assertAlmostEqual(stats['mean'][i], part.mean())
+            self.assertEqual(stats['median'][i], part.median())
+            self.assertEqual(stats['mode'][i], mode(part.to_numpy()))
+            self.assertEqual(stats['range'][i], part.max() - part.min())
+            self.assertAlmostEqual(stats['std'][i], part.std(ddof=0))
+
+    def test_periods_endpoint_splits_at_every_break(self):
+        url = reverse('api_analytics_periods')
+        rows = self.client.get(url, {'breaks': '2010,2000', 'start': 1995}).json()['data']
+        self.assertEqual([(r['segment'], r['years_count']) for r in rows],
+                         [('1995-1999', 5), ('2000-2009', 10), ('2010-', 10)])
+        self.assertAlmostEqual(rows[1]['gdp_median'], float(np.median(self.gdp[10:20])))
+        self.assertAlmostEqual(rows[2]['inflation_std'], float(self.infl[20:].std()))
+
+        default = self.client.get(url).json()  # the apartheid_comparison split
+        eras = self.client.get('/api/apartheid-comparison/').json()
+        self.assertEqual(default['breaks'], [1994])
+        self.assertEqual([r['years_count'] for r in default['data']], [e['years_count'] for e in eras])
+        self.assertAlmostEqual(default['data'][1]['gdp_mean'], eras[1]['mean_gdp'])
+
+        # breaks outside [start, end] don't split it, and a segment without years is dropped
+        rows = self.client.get(url, {'breaks': '1994,2005,2030', 'start': 2000, 'end': 2012}).json()['data']
+        self.assertEqual([(r['segment'], r['start_year'], r['end_year'], r['years_count']) for r in rows],
+                         [('2000-2004', 2000, 2004, 5), ('2005-2012', 2005, 2012, 8)])
+        rows = self.client.get(url, {'breaks': '2040', 'start': 2030}).json()['data']
+        self.assertEqual(rows, [])
+
+        self.client.get(url, {'breaks': '2000,2010', 'start': 1995})  # same set, other order: cached
+        self.assertEqual(analytics.memo.hits, 1)
+        self.assertEqual(self.client.get(url, {'breaks': '19x4'}).status_code, 400)
+
+    def test_least_recently_used_entries_are_evicted(self):
+        memo = analytics.LRUCache(maxsize=lambda: 2)
+        for key in ('a', 'b', 'a', 'c'):
+            memo.get_or_compute(key, lambda: key.upper())
+        self.assertEqual(list(memo._data), ['a', 'c'])
+
+
+class RankingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        forget_ranking_index()
+        growth = {'BRA': 3.0, 'CHN': 9.5, 'IND': 7.0, 'USA': 2.0, 'ZAF': 2.0, 'ZWE': -4.0, 'WLD': 3.1}
+        RefArea.objects.bulk_create([RefArea(code=c, name=c.title()) for c in growth])
+        Observation.objects.bulk_create(
+            [Observation(ref_area_id=c, indicator='gdp', year=2010, value=v) for c, v in growth.items()]
+            + [Observation(ref_area_id=c, indicator='gdp', year=2011, value=1.0) for c in ('BRA', 'ZAF')]
+            + [Observation(ref_area_id='ZAF', indicator='inflation', year=2010, value=4.3)])
+        bump_generation(Observation, RefArea)
+
+    def test_top_and_bottom_k_per_year(self):
+        url = reverse('api_leaderboard')
+        body = self.client.get(url, {'year': 2010, 'k': 3}).json()
+        self.assertEqual([(r['rank'], r['code']) for r in body['data']], [(1, 'CHN'), (2, 'IND'), (3, 'BRA')])
+        self.assertEqual((body['indicator'], body['of']), ('gdp', 6))  # WLD is an aggregate, not ranked
+        bottom = self.client.get(url, {'year': 2010, 'k': 3, 'order': 'bottom'}).json()['data']
+        self.assertEqual([(r['rank'], r['code']) for r in bottom], [(6, 'ZWE'), (4, 'USA'), (4, 'ZAF')])
+        latest = self.client.get(url).json()
+        self.assertEqual((latest['year'], latest['data'][0]['rank'], len(latest['data'])), (2011, 1, 2))
+        self.assertEqual(self.client.get(url, {'year': 1900}).status_code, 404)
+        self.assertEqual(self.client.get(url, {'k': 0}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'order': 'middle'}).status_code, 400)
+
+    def test_percentile_rank_of_an_area(self):
+        url = reverse('api_ranking_position')
+        pos = self.client.get(url, {'year': 2010}).json()  # the home area by default
+        self.assertEqual((pos['area'], pos['rank'], pos['of'], pos['value']), ('ZAF', 4, 6, 2.0))
+        self.assertAlmostEqual(pos['percentile'], (1 + 0.5 * 2) / 6 * 100)
+        self.assertAlmostEqual(self.client.get(url, {'area': 'CHN', 'year': 2010}).json()['percentile'], 100 * 5.5 / 6)
+        self.assertEqual(self.client.get(url, {'area': 'WLD', 'year': 2010}).status_code, 404)
+
+    def test_index_is_rebuilt_when_observations_change(self):
+        url = reverse('api_ranking_position')
+        with CaptureQueriesContext(connection) as q:
+            self.client.get(url, {'area': 'ZWE', 'year': 2010})
+            self.client.get(url, {'area': 'BRA', 'year': 2010})
+        self.assertEqual(sum('analysis_observation' in x['sql'] for x in q.captured_queries), 1)
+        Observation.objects.filter(ref_area_id='ZWE', year=2010).update(value=20.0)
+        bump_generation(Observation)
+        self.assertEqual(self.client.get(url, {'area': 'ZWE', 'year': 2010}).json()['rank'], 1)
+
+
+class BatchAnalyticsTests(TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.series = {}
+        for code in ('BRA', 'IND', 'ZAF', 'WLD'):
+            years = np.array([y for y in range(1961, 2024) if rng.random() > 0.1])  # with gaps
+            self.series[code] = (years, rng.normal(3, 3, years.size).round(1))
+        RefArea.objects.bulk_create([RefArea(code=c, name=c) for c in self.series])
+        Observation.objects.bulk_create([
+            Observation(ref_area_id=c, indicator=i, year=y, value=v + (i == 'inflation') * 5)
+            for c, (years, values) in self.series.items() for i in ('gdp', 'inflation')
+            for y, v in zip(years.tolist(), values.tolist())])
+
+    def test_vectorized_zscores_match_the_per_year_loop(self):
+        for code, (years, values) in self.series.items():
+            deltas = batch.yoy_changes(years, values)
+            expected = rolling_zscore(years, deltas, years.tolist(), 10, 5)
+            got = rolling_zscores(years, deltas, 10, 5)
+            self.assertEqual(set(years[~np.isnan(got)].tolist()), set(expected), code)
+            np.testing.assert_allclose([got[years == y][0] for y in expected], list(expected.values()))
+
+    def test_shards_keep_each_area_whole(self):
+        areas = np.array(['A', 'A', 'B', 'C', 'C', 'D'], dtype=object)
+        offsets = np.array([[0, 5], [5, 9], [9, 30], [30, 31], [31, 40], [40, 41]])
+        tasks = batch.shards(areas, offsets, 3)
+        self.assertEqual([t[:, 0].tolist() for t in tasks], [[0, 1, 2], [3, 4, 5]])
+        self.assertEqual(batch.shards(areas[:0], offsets[:0], 3), [])
+
+    def test_every_area_gets_the_suite_and_workers_agree(self):
+        call_command('batch_analytics', '--workers', '1', stdout=StringIO())
+        inline = list(AreaSummary.objects.order_by('ref_area', 'indicator', 'period').values_list(
+            'ref_area', 'indicator', 'period', 'sample_size', 'mean_value', 'mode_value', 'volatile_years'))
+        flagged = list(AreaVolatility.objects.order_by('ref_area', 'indicator', 'year').values_list(
+            'ref_area', 'indicator', 'year', 'z_score'))
+        out = StringIO()
+        call_command('batch_analytics', '--workers', '2', stdout=out)
+        self.assertIn('with 2 workers', out.getvalue())
+        self.assertEqual(list(AreaSummary.objects.order_by('ref_area', 'indicator', 'period').values_list(
+            'ref_area', 'indicator', 'period', 'sample_size', 'mean_value', 'mode_value', 'volatile_years')), inline)
+        self.assertEqual(list(AreaVolatility.objects.order_by('ref_area', 'indicator', 'year').values_list(
+            'ref_area', 'indicator', 'year', 'z_score')), flagged)
+
+        years, values = self.series['ZAF']
+        pre = AreaSummary.objects.get(ref_area='ZAF', indicator='gdp', period='pre-brics')
+        part = values[(years >= 1990) & (years <= 2010)]
+        self.assertEqual((pre.start_year, pre.end_year, pre.sample_size), (1990, 2010, part.size))
+        self.assertAlmostEqual(pre.median_value, float(np.median(part)))
+        self.assertEqual(pre.mode_value, mode(part))
+        self.assertAlmostEqual(pre.std_dev, float(part.std()))
+        total = AreaSummary.objects.get(ref_area='ZAF', indicator='inflation', period='all')
+        self.assertAlmostEqual(total.mean_value, float(values.mean()) + 5)
+        self.assertEqual(total.volatile_years,
+                         AreaVolatility.objects.filter(ref_area='ZAF', indicator='inflation').count())
+        self.assertEqual(AreaSummary.objects.filter(period='all').count(), 8)
+
+    def test_workers_must_be_positive(self):
+        with self.assertRaises(CommandError):
+            call_command('batch_analytics', '--workers', '0', stdout=StringIO())
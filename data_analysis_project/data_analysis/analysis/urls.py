@@ -2,7 +2,7 @@
 
 # analysis/urls.py
 from django.urls import path
-from . import views
+from . import async_views, views
 
 urlpatterns = [
     # Your main dashboard (home page)
@@ -11,6 +11,7 @@ urlpatterns = [
     # Database (full page is still available, but we won’t navigate to it)
     path("database/", views.database_dashboard, name="database_dashboard"),
     path("database/panel/", views.database_panel, name="database_panel"),
+    path("database/panel/rows/", views.indicator_rows, name="indicator_rows"),  # HTMX load-more
 
     # CRUD (EconomicIndicator)
     path("database/indicator/add/", views.indicator_create, name="indicator_add"),
@@ -18,7 +19,20 @@ urlpatterns = [
     path("database/indicator/<int:year>/delete/", views.indicator_delete, name="indicator_delete"),
 
     # Chart JSON
-    path("api/series/economic/", views.series_economic, name="api_series_economic"),
+    path("api/series/economic/", views.series_economic, name="api_series_economic"),  # ?area=ISO3 for other countries
+    path("api/areas/", views.ref_areas, name="api_ref_areas"),
+    path("api/indicators/", views.indicator_table, name="api_indicators"),  # keyset pages: ?after=&year_from=&year_to=&era=&area=
+    path("api/charts/<str:name>/", views.chart_data, name="api_chart"),  # scatter | line | gdpMean | bar | bar_extremes
+    path("api/bootstrap/", views.dashboard_bootstrap, name="api_bootstrap"),  # all charts + KPIs; ?have=section@version
+
+    # Analytics: rolling windows, lagged cross-correlation and period splits of gdp / inflation
+    path("api/analytics/rolling/", views.analytics_rolling, name="api_analytics_rolling"),  # ?x=&y=&window=&start=&end=&area=
+    path("api/analytics/xcorr/", views.analytics_xcorr, name="api_analytics_xcorr"),  # ?x=&y=&max_lag=&start=&end=&area=
+    path("api/analytics/periods/", views.analytics_periods, name="api_analytics_periods"),  # ?breaks=1994,2010&start=&end=&area=
+
+    # Cross-country rankings (aggregates such as WLD are left out)
+    path("api/rankings/", views.leaderboard, name="api_leaderboard"),  # ?indicator=&year=&k=&order=top|bottom
+    path("api/rankings/position/", views.ranking_position, name="api_ranking_position"),  # ?area=&indicator=&year=
 
     # CSV export
     path("database/export/economic.csv",            views.export_economic_csv,          name="export_economic_csv"),
@@ -31,12 +45,25 @@ urlpatterns = [
     path("database/import/csv/", views.import_csv, name="import_csv"),
 
     # JSON API you already expose
-    path("api/apartheid-comparison/", views.apartheid_comparison),
+    path("api/apartheid-comparison/", views.apartheid_comparison),  # ?area=ISO3 as above
     path("api/high-volatility/",      views.high_volatility_years),
     path("api/performance-summary/",  views.performance_summary),
     path("api/recent-trends/",        views.recent_trends),
     path("api/outliers/",             views.outlier_years),
     path("api/avg-by-era/",           views.avg_by_era),
+
+    # Async (ASGI) twins of the read-only endpoints above, plus everything in one response
+    path("api/async/apartheid-comparison/", async_views.apartheid_comparison),
+    path("api/async/high-volatility/",      async_views.high_volatility_years),
+    path("api/async/performance-summary/",  async_views.performance_summary),
+    path("api/async/recent-trends/",        async_views.recent_trends),
+    path("api/async/outliers/",             async_views.outlier_years),
+    path("api/async/avg-by-era/",           async_views.avg_by_era),
+    path("api/async/series/economic/",      async_views.series_economic),
+    path("api/async/dashboard/",            async_views.dashboard_data, name="api_async_dashboard"),
+
+    # Prometheus scrape target (ANALYSIS_INSTRUMENTATION on; loopback / INTERNAL_IPS only)
+    path("metrics", views.metrics, name="metrics"),
 ]
 
 
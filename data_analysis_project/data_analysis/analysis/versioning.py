@@ -0,0 +1,127 @@
+# analysis/versioning.py
+# Table-level generation numbers. Every write to a tracked table bumps its row in
+# DataGeneration (signals.py for ORM saves/deletes, explicitly after bulk writes).
+# Cached analytics are keyed on the generations they read, and the JSON API turns
+# them into strong ETags so unchanged resources answer 304 without running a query.
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
+
+from .models import DataGeneration
+
+SNAPSHOT_KEY = "analysis:generations"
+DEFAULT_SNAPSHOT_TTL = 5  # seconds another process may serve a superseded generation
+
+def _table(model) -> str:
+    return model._meta.db_table
+
+def _snapshot() -> dict:
+    """{table: (generation, updated_at)} for every tracked table, one tiny query when not cached."""
+    snap = cache.get(SNAPSHOT_KEY)
+    if snap is None:
+        snap = {t: (g, u) for t, g, u in DataGeneration.objects.values_list('table', 'generation', 'updated_at')}
+        cache.set(SNAPSHOT_KEY, snap, _snapshot_ttl())
+    return snap
+
+async def _asnapshot() -> dict:
+    # same as _snapshot(), through the async cache and ORM APIs
+    snap = await cache.aget(SNAPSHOT_KEY)
+    if snap is None:
+        snap = {t: (g, u) async for t, g, u in
+                DataGeneration.objects.values_list('table', 'generation', 'updated_at')}
+        await cache.aset(SNAPSHOT_KEY, snap, _snapshot_ttl())
+    return snap
+
+def _snapshot_ttl() -> int:
+    return getattr(settings, 'ANALYSIS_GENERATION_TTL', DEFAULT_SNAPSHOT_TTL)
+
+def _forget_snapshot():
+    cache.delete(SNAPSHOT_KEY)
+
+def _generations(snap: dict, models) -> tuple:
+    return tuple(snap.get(_table(m), (0, None))[0] for m in models)
+
+def _last_modified(snap: dict, models):
+    tables = [_table(m) for m in models] if models else list(snap)
+    stamps = [snap[t][1] for t in tables if t in snap]
+    return max(stamps) if stamps else None
+
+def _etag(snap: dict, models) -> str:
+    return '"' + ".".join(f"{_table(m)}-{g}" for m, g in zip(models, _generations(snap, models))) + '"'
+
+def generations(*models) -> tuple:
+    return _generations(_snapshot(), models)
+
+def data_version(*models) -> int:
+    """Sum of the generations of `models` (all tracked tables if none given); only ever grows."""
+    snap = _snapshot()
+    if not models:
+        return sum(g for g, _ in snap.values())
+    return sum(_generations(snap, models))
+
+def data_last_modified(*models):
+    return _last_modified(_snapshot(), models)
+
+def table_stamp(model) -> tuple:
+    """(generation, updated_at) of one table: changes on every write, even after a reset."""
+    snap = _snapshot()
+    return _generations(snap, [model])[0], _last_modified(snap, [model])
+
+async def atable_stamp(model) -> tuple:
+    snap = await _asnapshot()
+    return _generations(snap, [model])[0], _last_modified(snap, [model])
+
+def bump_generation(*models) -> None:
+    now = timezone.now()
+    for model in models:
+        table = _table(model)
+        if not DataGeneration.objects.filter(table=table).update(generation=F('generation') + 1, updated_at=now):
+            DataGeneration.objects.get_or_create(table=table, defaults={'generation': 1})
+    _forget_snapshot()
+    # and again once the transaction lands, in case someone re-cached the old value meanwhile
+    transaction.on_commit(_forget_snapshot)
+
+def etag_for(*models) -> str:
+    return _etag(_snapshot(), models)
+
+def versioned(*models):
+    """Conditional-GET decorator: strong ETag + Last-Modified from the tables a view reads.
+
+    If-None-Match / If-Modified-Since are checked before the view body runs, so a
+    revalidation that matches costs no ORM work at all. Async views read the
+    generations through the async cache/ORM instead of Django's (sync) condition().
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapped(request, *args, **kwargs):
+                snap = await _asnapshot()
+                etag, modified = _etag(snap, models), _last_modified(snap, models)
+                timestamp = int(modified.timestamp()) if modified else None
+                response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                if request.method in ("GET", "HEAD"):
+                    if timestamp and not response.has_header("Last-Modified"):
+                        response.headers["Last-Modified"] = http_date(timestamp)
+                    response.headers.setdefault("ETag", etag)
+                return response
+            return cache_control(no_cache=True)(async_wrapped)
+
+        @cache_control(no_cache=True)  # always revalidate; unchanged resources come back as 304
+        @condition(etag_func=lambda request, *a, **kw: etag_for(*models),
+                   last_modified_func=lambda request, *a, **kw: data_last_modified(*models))
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            return view(request, *args, **kwargs)
+        return wrapped
+    return decorator
@@ -1,191 +1,120 @@
 from django.shortcuts import render
 
 # analysis/views.py
-from decimal import Decimal
 import csv
 from io import TextIOWrapper
 from typing import Dict, Any
 
 from django.contrib import messages
-from django.db import transaction, models  # models imported so models.F and functions work
-from django.db.models import (
-    Avg, Max, Min, Count, Case, When, CharField, F
-)
-from django.http import HttpResponse, JsonResponse
+from django.db import transaction
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from . import analytics, endpoints, rankings
+from .bootstrap import BOOTSTRAP_MODELS, bootstrap_payload, parse_have
+from .charts import CHART_NAMES, chart_payloads
+from .columns import indicator_columns
 from .forms import EconomicIndicatorForm
 from .models import (
-    EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary
+    EconomicIndicator, VolatilityAnalysis, BricsComparison, StatisticalSummary, RefArea, Observation
 )
+from .importers import import_csv_stream
+from .instrumentation import metrics_allowed, registry
+from .observations import requested_area, area_series, area_era_comparison
+from .pagination import ERAS, PageQuery, indicator_page
+from .panel import panel_data, growth_category_expr, inflation_category_expr
+from .renderers import FastJsonResponse, table_response
+from .versioning import versioned
 
 # ---------------- Home / visualization page (your existing page) ----------------
 def dashboard(request):
     return render(request, 'home/dashboard.html')
 
-# ---------------- JSON endpoints (unchanged) ----------------
+# ---------------- JSON endpoints ----------------
+# Each is @versioned on the tables it reads: strong ETag, 304 before any query.
+# Home-area indicator reads are sliced from the in-process columns (columns.py).
+@versioned(EconomicIndicator, Observation)
 def apartheid_comparison(request):
-    qs = EconomicIndicator.objects.values("era").annotate(
-        years_count=Count("id"),
-        mean_gdp=Avg("gdp_zar_bn"),
-        mean_inflation=Avg("inflation_rate"),
-        best_gdp=Max("gdp_zar_bn"),
-        worst_gdp=Min("gdp_zar_bn"),
-    ).order_by("era")
-    return JsonResponse(list(qs), safe=False)
-
+    area = requested_area(request)
+    if area:
+        rows = area_era_comparison(area)
+        if not rows:
+            return FastJsonResponse({'error': f"No observations for area {area}."}, status=404)
+        return table_response(request, rows)
+    return table_response(request, endpoints.era_comparison_rows(indicator_columns()))
+
+@versioned(VolatilityAnalysis, EconomicIndicator)
 def high_volatility_years(request):
-    qs = (
-        VolatilityAnalysis.objects.filter(volatility_flag=True)
-        .select_related("indicator")
-        .values(
-            year=F("indicator__year"),
-            gdp_yoy_change=F("gdp_yoy_change"),
-            inflation_yoy_change=F("inflation_yoy_change"),
-            notes=F("notes"),
-            gdp_zar_bn=F("indicator__gdp_zar_bn"),
-            era=F("indicator__era"),
-        )
-        .order_by("indicator__year")
-    )
-    return JsonResponse(list(qs), safe=False)
+    return table_response(request, list(endpoints.high_volatility_qs()))
 
+@versioned(EconomicIndicator)
 def performance_summary(request):
-    growth_category = Case(
-        When(gdp_yoy_change__gt=3, then=models.Value("High Growth")),
-        When(gdp_yoy_change__gte=0, gdp_yoy_change__lte=3, then=models.Value("Moderate Growth")),
-        default=models.Value("Recession/Decline"),
-        output_field=CharField(),
-    )
-    inflation_category = Case(
-        When(inflation_rate__lt=3, then=models.Value("Low Inflation")),
-        When(inflation_rate__gte=3, inflation_rate__lte=6, then=models.Value("Target Range")),
-        default=models.Value("High Inflation"),
-        output_field=CharField(),
-    )
-    qs = EconomicIndicator.objects.values("year", "gdp_zar_bn", "inflation_rate", "era").annotate(
-        growth_category=growth_category,
-        inflation_category=inflation_category,
-    ).order_by("year")
-    return JsonResponse(list(qs), safe=False)
+    return table_response(request, endpoints.performance_table(indicator_columns()))
 
+@versioned(EconomicIndicator)
 def recent_trends(request):
-    qs = EconomicIndicator.objects.filter(year__gte=2013).values(
-        "year", "gdp_zar_bn", "inflation_rate", "gdp_yoy_change"
-    ).order_by("-year")
-    return JsonResponse(list(qs), safe=False)
+    return table_response(request, endpoints.recent_table(indicator_columns()))
 
+@versioned(VolatilityAnalysis, EconomicIndicator)
 def outlier_years(request):
-    qs = VolatilityAnalysis.objects.filter(is_outlier=True).values(
-        year=F("indicator__year"),
-        gdp_yoy_change=F("gdp_yoy_change"),
-        inflation_yoy_change=F("inflation_yoy_change"),
-        notes=F("notes"),
-    ).order_by("indicator__year")
-    return JsonResponse(list(qs), safe=False)
+    return table_response(request, list(endpoints.outliers_qs()))
 
+@versioned(EconomicIndicator)
 def avg_by_era(request):
-    qs = EconomicIndicator.objects.values("era").annotate(
-        avg_gdp=models.functions.Round(Avg("gdp_zar_bn"), 2),
-        avg_inflation=models.functions.Round(Avg("inflation_rate"), 2),
-    )
-    return JsonResponse(list(qs), safe=False)
+    return table_response(request, endpoints.avg_by_era_rows(indicator_columns()))
 
 # ---------------- helpers shared by dashboard & panel ----------------
-def era_for_year(year: int) -> str:
-    return "Post-Apartheid" if year >= 1994 else "Apartheid"
-
-def _growth_label(v):
-    if v is None: return "Unknown"
-    if v > 3: return "High Growth"
-    if Decimal('0') <= v <= 3: return "Moderate Growth"
-    return "Recession/Decline"
-
-def _inflation_label(v):
-    if v is None: return "Unknown"
-    if v < 3: return "Low Inflation"
-    if 3 <= v <= 6: return "Target Range"
-    return "High Inflation"
-
-def _csv_response(filename: str) -> HttpResponse:
-    resp = HttpResponse(content_type='text/csv; charset=utf-8')
+class _Echo:
+    # csv.writer only needs .write(); hand each formatted line straight back
+    def write(self, value):
+        return value
+
+def _csv_stream(filename: str, header, rows) -> StreamingHttpResponse:
+    writer = csv.writer(_Echo())
+
+    def lines():
+        yield writer.writerow(header)
+        for r in rows:
+            yield writer.writerow(r)
+
+    resp = StreamingHttpResponse(lines(), content_type='text/csv; charset=utf-8')
     resp['Content-Disposition'] = f'attachment; filename="{filename}"'
     return resp
 
 def build_database_context(request) -> Dict[str, Any]:
+    # KPIs come from the cached panel snapshot; the indicator table is one keyset page
+    data = panel_data()
     year_q = request.GET.get('year')
-    indicators_qs = EconomicIndicator.objects.order_by('year')
+    try:
+        query = PageQuery.from_request(request)
+    except ValueError as e:
+        messages.error(request, str(e))
+        query = PageQuery()
+    page = indicator_page(query)
     search_row = None
 
-    if year_q:
-        try:
-            y = int(year_q)
-            search_row = EconomicIndicator.objects.filter(year=y).first()
-            if search_row:
-                indicators_qs = indicators_qs.filter(year=y)
-            else:
-                messages.warning(request, f"No record found for year {y}.")
-        except ValueError:
-            messages.error(request, "Year must be a number (e.g. 2010).")
-
-    indicators = list(indicators_qs)
-    perf = {ei.year: (_growth_label(ei.gdp_yoy_change), _inflation_label(ei.inflation_rate)) for ei in indicators}
-
-    kpi_era = EconomicIndicator.objects.values('era').annotate(
-        years_count=Count('id'),
-        mean_gdp=Avg('gdp_zar_bn'),
-        mean_inflation=Avg('inflation_rate'),
-        best_gdp=Max('gdp_zar_bn'),
-        worst_gdp=Min('gdp_zar_bn'),
-    ).order_by('era')
-
-    volatility = (
-        VolatilityAnalysis.objects
-            .filter(volatility_flag=True)
-            .select_related('indicator')
-            .annotate(
-                year=F('indicator__year'),
-                gdp_zar_bn=F('indicator__gdp_zar_bn'),
-                era=F('indicator__era'),
-            )
-            .values('year','gdp_yoy_change','inflation_yoy_change','notes','gdp_zar_bn','era')
-            .order_by('indicator__year')
-    )
-
-    brics = BricsComparison.objects.order_by('period_type', 'start_year')
-    stats = StatisticalSummary.objects.order_by('indicator')
-
-    best = EconomicIndicator.objects.filter(
-        gdp_zar_bn=EconomicIndicator.objects.aggregate(Max('gdp_zar_bn'))['gdp_zar_bn__max']
-    ).values('year','gdp_zar_bn','inflation_rate','era')
-    worst = EconomicIndicator.objects.filter(
-        gdp_zar_bn=EconomicIndicator.objects.aggregate(Min('gdp_zar_bn'))['gdp_zar_bn__min']
-    ).values('year','gdp_zar_bn','inflation_rate','era')
-
-    recent = EconomicIndicator.objects.filter(year__gte=2013).values(
-        'year','gdp_zar_bn','inflation_rate','gdp_yoy_change'
-    ).order_by('-year')
-    avg_by_era = EconomicIndicator.objects.values('era').annotate(
-        avg_gdp=Avg('gdp_zar_bn'),
-        avg_inflation=Avg('inflation_rate'),
-    ).order_by('era')
+    if year_q and query.year_from is not None:
+        search_row = page['rows'][0] if page['rows'] else None
+        if search_row is None:
+            messages.warning(request, f"No record found for year {query.year_from}.")
 
     return {
-        'indicators': indicators,
-        'perf': perf,
-        'kpi_era': kpi_era,
-        'volatility': volatility,
-        'brics': brics,
-        'stats': stats,
-        'best': list(best),
-        'worst': list(worst),
-        'recent': list(recent),
-        'avg_by_era': list(avg_by_era),
+        **data,
+        **_page_context(query, page),
         'form': EconomicIndicatorForm(),
         'year_q': year_q or "",
+        'eras': ERAS,
         'search_row': search_row,
     }
 
+def _page_context(query: PageQuery, page: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        'indicators': page['rows'],
+        'page_query': query,
+        'editable': query.home_only,  # Observation rows have no edit/delete views
+        'next_query': query.querystring(page['next']) if page['next'] else "",
+    }
+
 # ---------------- HTML pages ----------------
 def database_dashboard(request):
     # standalone database page
@@ -197,6 +126,15 @@ def database_panel(request):
     ctx = build_database_context(request)
     return render(request, 'analysis/database_panel.html', ctx)
 
+def indicator_rows(request):
+    # HTMX "load more" for the panel table: the next page of <tr>s plus a new load-more row
+    try:
+        query = PageQuery.from_request(request)
+    except ValueError as e:
+        return HttpResponseBadRequest(str(e))
+    return render(request, 'analysis/_indicator_rows.html',
+                  {**_page_context(query, indicator_page(query)), 'lazy': True})
+
 # ---------------- CRUD ----------------
 @transaction.atomic
 def indicator_create(request):
@@ -233,61 +171,129 @@ def indicator_delete(request, year):
     return redirect('database_dashboard')
 
 # ---------------- Chart JSON ----------------
+@versioned(EconomicIndicator, Observation)
 def series_economic(request):
-    qs = EconomicIndicator.objects.order_by('year').values('year','gdp_zar_bn','inflation_rate')
-    years = [r['year'] for r in qs]
-    gdp = [float(r['gdp_zar_bn']) for r in qs]
-    infl = [float(r['inflation_rate']) for r in qs]
-    return JsonResponse({'years': years, 'gdp': gdp, 'inflation': infl})
+    area = requested_area(request)
+    if area:
+        series = area_series(area)
+        if not series['years']:
+            return FastJsonResponse({'error': f"No observations for area {area}."}, status=404)
+        return FastJsonResponse(series)
+    return FastJsonResponse(endpoints.series_payload(indicator_columns()))
+
+@versioned(EconomicIndicator)
+def chart_data(request, name):
+    if name not in CHART_NAMES:
+        raise Http404(f"Unknown chart {name!r}")
+    return FastJsonResponse(chart_payloads()[name])
+
+@versioned(*BOOTSTRAP_MODELS)
+def dashboard_bootstrap(request):
+    # charts + KPIs in one response; ?have=<section>@<version> skips sections the client already holds
+    return FastJsonResponse(bootstrap_payload(parse_have(request.GET.getlist('have'))))
+
+@versioned(EconomicIndicator, Observation)
+def indicator_table(request):
+    # one keyset page of the indicator table; pass back "next" as ?after= for the following page
+    try:
+        query = PageQuery.from_request(request)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    page = indicator_page(query)
+    return table_response(request, page['rows'], meta={'next': page['next']})
+
+# ---------------- Analytics ----------------
+def _analytics(request, compute, *fields):
+    try:
+        query = analytics.AnalyticsQuery.from_request(request)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    return table_response(request, compute(query), meta=query.meta(*fields))
+
+@versioned(EconomicIndicator, Observation)
+def analytics_rolling(request):
+    # ?x=&y=&window=&start=&end=&area= -> per-window mean/std of x and y and their correlation
+    return _analytics(request, analytics.rolling, 'x', 'y', 'window')
+
+@versioned(EconomicIndicator, Observation)
+def analytics_xcorr(request):
+    # ?x=&y=&max_lag=&start=&end=&area= -> corr(x[t], y[t + lag]) for each lag
+    return _analytics(request, analytics.xcorr, 'x', 'y', 'max_lag')
+
+@versioned(EconomicIndicator, Observation)
+def analytics_periods(request):
+    # ?breaks=1994,2010&start=&end=&area= -> mean/median/mode/range/std of each series per period
+    return _analytics(request, analytics.periods, 'breaks')
+
+# ---------------- Rankings ----------------
+@versioned(Observation, RefArea)
+def leaderboard(request):
+    # ?indicator=&year=&k=&order=top|bottom -> the k best (or worst) countries that year
+    try:
+        params = rankings.parse_request(request)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    index = rankings.ranking_index()
+    indicator, year = params['indicator'], index.year(params['indicator'], params['year'])
+    board = index.boards.get((indicator, year))
+    if board is None:
+        return FastJsonResponse({'error': f"No {indicator} observations for year {year}."}, status=404)
+    return table_response(request, index.leaders(indicator, year, params['k'], params['order']),
+                          meta={'indicator': indicator, 'year': year, 'order': params['order'], 'of': len(board)})
+
+@versioned(Observation, RefArea)
+def ranking_position(request):
+    # ?area=&indicator=&year= -> the area's rank and percentile among countries reporting that year
+    try:
+        params = rankings.parse_request(request)
+    except ValueError as e:
+        return FastJsonResponse({'error': str(e)}, status=400)
+    index = rankings.ranking_index()
+    year = index.year(params['indicator'], params['year'])
+    position = index.position(params['indicator'], year, params['area'])
+    if position is None:
+        return FastJsonResponse({'error': f"{params['area']} is not ranked for {params['indicator']} in {year}."},
+                                status=404)
+    return FastJsonResponse(position)
+
+@versioned(RefArea)
+def ref_areas(request):
+    return table_response(request, list(RefArea.objects.values('code', 'name')))
 
 # ---------------- CSV export ----------------
+# Exports stream rows straight off a server-side cursor, so memory stays flat
+# and the first bytes go out before the query has been fully read.
+EXPORT_CHUNK_SIZE = 2000
+
 def export_economic_csv(request):
-    resp = _csv_response('economic_indicators.csv')
-    w = csv.writer(resp)
-    w.writerow(['year','gdp_zar_bn','inflation_rate','gdp_yoy_change','inflation_yoy_change','era'])
-    for r in EconomicIndicator.objects.order_by('year').values_list(
-            'year','gdp_zar_bn','inflation_rate','gdp_yoy_change','inflation_yoy_change','era'):
-        w.writerow(r)
-    return resp
+    cols = ['year','gdp_zar_bn','inflation_rate','gdp_yoy_change','inflation_yoy_change','era']
+    rows = EconomicIndicator.objects.order_by('year').values_list(*cols)
+    return _csv_stream('economic_indicators.csv', cols, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
 def export_volatility_csv(request):
-    resp = _csv_response('volatility_analysis.csv')
-    w = csv.writer(resp)
-    w.writerow(['year','gdp_yoy_change','inflation_yoy_change','volatility_flag','is_outlier','notes'])
-    qs = (VolatilityAnalysis.objects.select_related('indicator')
-          .order_by('indicator__year')
-          .values_list('indicator__year','gdp_yoy_change','inflation_yoy_change','volatility_flag','is_outlier','notes'))
-    for r in qs: w.writerow(r)
-    return resp
+    header = ['year','gdp_yoy_change','inflation_yoy_change','volatility_flag','is_outlier','notes']
+    rows = (VolatilityAnalysis.objects
+            .order_by('indicator__year')
+            .values_list('indicator__year','gdp_yoy_change','inflation_yoy_change','volatility_flag','is_outlier','notes'))
+    return _csv_stream('volatility_analysis.csv', header, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
 def export_brics_csv(request):
-    resp = _csv_response('brics_comparison.csv')
-    w = csv.writer(resp)
-    w.writerow(['period_type','start_year','end_year','mean_gdp_zar_bn','median_inflation',
-                'gdp_range_min','gdp_range_max','inflation_mode','insights'])
-    for r in BricsComparison.objects.order_by('start_year').values_list(
-            'period_type','start_year','end_year','mean_gdp_zar_bn','median_inflation',
-            'gdp_range_min','gdp_range_max','inflation_mode','insights'):
-        w.writerow(r)
-    return resp
+    cols = ['period_type','start_year','end_year','mean_gdp_zar_bn','median_inflation',
+            'gdp_range_min','gdp_range_max','inflation_mode','insights']
+    rows = BricsComparison.objects.order_by('start_year').values_list(*cols)
+    return _csv_stream('brics_comparison.csv', cols, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
 def export_stats_csv(request):
-    resp = _csv_response('statistical_summary.csv')
-    w = csv.writer(resp)
-    w.writerow(['indicator','mean_value','median_value','std_dev','min_value','max_value','sample_size'])
-    for r in StatisticalSummary.objects.order_by('indicator').values_list(
-            'indicator','mean_value','median_value','std_dev','min_value','max_value','sample_size'):
-        w.writerow(r)
-    return resp
+    cols = ['indicator','mean_value','median_value','std_dev','min_value','max_value','sample_size']
+    rows = StatisticalSummary.objects.order_by('indicator').values_list(*cols)
+    return _csv_stream('statistical_summary.csv', cols, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
 def export_performance_summary_csv(request):
-    resp = _csv_response('performance_summary.csv')
-    w = csv.writer(resp)
-    w.writerow(['year','gdp_zar_bn','inflation_rate','era','growth_category','inflation_category'])
-    for ei in EconomicIndicator.objects.order_by('year'):
-        w.writerow([ei.year, ei.gdp_zar_bn, ei.inflation_rate, ei.era,
-                    _growth_label(ei.gdp_yoy_change), _inflation_label(ei.inflation_rate)])
-    return resp
+    cols = ['year','gdp_zar_bn','inflation_rate','era','growth_category','inflation_category']
+    rows = (EconomicIndicator.objects.order_by('year')
+            .annotate(growth_category=growth_category_expr(), inflation_category=inflation_category_expr())
+            .values_list(*cols))
+    return _csv_stream('performance_summary.csv', cols, rows.iterator(chunk_size=EXPORT_CHUNK_SIZE))
 
 # ---------------- CSV import ----------------
 @transaction.atomic
@@ -297,94 +303,25 @@ def import_csv(request):
 
     model = request.POST.get('target_model')  # 'economic' | 'volatility' | 'brics' | 'stats'
     wrapper = TextIOWrapper(request.FILES['csv_file'].file, encoding=request.encoding or 'utf-8')
-    reader = csv.DictReader(wrapper)
-
-    def _dec(v):
-        return None if v in (None,'','NULL','null') else Decimal(v.replace(',', '.'))
-
-    def _bool(v):
-        if isinstance(v, bool): return v
-        s = (v or '').strip().lower()
-        return s in ('1','true','t','yes','y')
+    try:
+        chunk_size = int(request.POST.get('chunk_size') or 0) or None
+    except ValueError:
+        chunk_size = None
 
     try:
-        if model == 'economic':
-            need = {'year','gdp_zar_bn','inflation_rate','gdp_yoy_change','inflation_yoy_change'}
-            if not need.issubset(reader.fieldnames or []):
-                raise ValueError("Economic CSV must have: year,gdp_zar_bn,inflation_rate,gdp_yoy_change,inflation_yoy_change[,era]")
-            for row in reader:
-                year = int(row['year'])
-                era = row.get('era') or era_for_year(year)
-                EconomicIndicator.objects.update_or_create(
-                    year=year,
-                    defaults=dict(
-                        gdp_zar_bn=_dec(row['gdp_zar_bn']),
-                        inflation_rate=_dec(row['inflation_rate']),
-                        gdp_yoy_change=_dec(row['gdp_yoy_change']),
-                        inflation_yoy_change=_dec(row['inflation_yoy_change']),
-                        era=era,
-                    )
-                )
-
-        elif model == 'volatility':
-            need = {'year','gdp_yoy_change','inflation_yoy_change','volatility_flag','is_outlier','notes'}
-            if not need.issubset(reader.fieldnames or []):
-                raise ValueError(f"Volatility CSV must have headers: {sorted(need)}")
-            for row in reader:
-                ind = EconomicIndicator.objects.get(year=int(row['year']))
-                VolatilityAnalysis.objects.update_or_create(
-                    indicator=ind,
-                    defaults=dict(
-                        gdp_yoy_change=_dec(row['gdp_yoy_change']),
-                        inflation_yoy_change=_dec(row['inflation_yoy_change']),
-                        volatility_flag=_bool(row['volatility_flag']),
-                        is_outlier=_bool(row['is_outlier']),
-                        notes=row.get('notes',''),
-                    )
-                )
-
-        elif model == 'brics':
-            need = {'period_type','start_year','end_year','mean_gdp_zar_bn','median_inflation',
-                    'gdp_range_min','gdp_range_max','inflation_mode','insights'}
-            if not need.issubset(reader.fieldnames or []):
-                raise ValueError(f"BRICS CSV must have headers: {sorted(need)}")
-            for row in reader:
-                BricsComparison.objects.update_or_create(
-                    period_type=row['period_type'],
-                    start_year=int(row['start_year']),
-                    end_year=int(row['end_year']),
-                    defaults=dict(
-                        mean_gdp_zar_bn=_dec(row['mean_gdp_zar_bn']),
-                        median_inflation=_dec(row['median_inflation']),
-                        gdp_range_min=_dec(row['gdp_range_min']),
-                        gdp_range_max=_dec(row['gdp_range_max']),
-                        inflation_mode=_dec(row['inflation_mode']),
-                        insights=row.get('insights',''),
-                    )
-                )
-
-        elif model == 'stats':
-            need = {'indicator','mean_value','median_value','std_dev','min_value','max_value','sample_size'}
-            if not need.issubset(reader.fieldnames or []):
-                raise ValueError(f"Statistical Summary CSV must have headers: {sorted(need)}")
-            for row in reader:
-                StatisticalSummary.objects.update_or_create(
-                    indicator=row['indicator'],
-                    defaults=dict(
-                        mean_value=_dec(row['mean_value']),
-                        median_value=_dec(row['median_value']),
-                        std_dev=_dec(row['std_dev']),
-                        min_value=_dec(row['min_value']),
-                        max_value=_dec(row['max_value']),
-                        sample_size=int(row['sample_size']) if row.get('sample_size') else None,
-                    )
-                )
-        else:
-            raise ValueError("Unknown target model for import.")
-
-        messages.success(request, "CSV import completed successfully.")
+        report = import_csv_stream(model, wrapper, chunk_size=chunk_size)
+        messages.success(request, f"CSV import completed: {report.summary()}.")
+        if report.errors:
+            messages.warning(request, "Rejected rows: " + "; ".join(report.errors))
     except Exception as e:
         transaction.set_rollback(True)
         messages.error(request, f"CSV import failed: {e}")
 
-    return redirect('database_dashboard')
\ No newline at end of file
+    return redirect('database_dashboard')
+
+# ---------------- Instrumentation ----------------
+def metrics(request):
+    # Prometheus text exposition of this process's request/query histograms
+    if not metrics_allowed(request):
+        raise Http404
+    return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
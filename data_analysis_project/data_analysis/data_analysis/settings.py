@@ -42,7 +42,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'analysis.instrumentation.InstrumentationMiddleware',  # inert unless ANALYSIS_INSTRUMENTATION
     'django.middleware.security.SecurityMiddleware',
+    'analysis.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -124,7 +126,61 @@ STATICFILES_DIRS = [BASE_DIR / "static"]  # optional but very common
 # Where collectstatic will gather files for production
 STATIC_ROOT = BASE_DIR / "staticfiles"
 
+# collectstatic also writes .gz (and .br, with brotli installed) siblings of each text asset
+# (.css/.js/.json/.svg: css/dashboard.css and the admin's CSS/JS), for the front server to serve precompressed
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "analysis.compression.PrecompressedStaticFilesStorage"},
+}
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Analysis app
+# Rows per bulk upsert when importing CSVs (can be overridden per upload with chunk_size)
+ANALYSIS_IMPORT_CHUNK_SIZE = 1000
+# Seconds a process may reuse its cached table generations (DataGeneration) before re-reading
+# them; writes in the same process take effect immediately, other workers within this window
+ANALYSIS_GENERATION_TTL = 5
+
+# Derived data (YoY deltas, volatility flags, StatisticalSummary, BricsComparison) is
+# refreshed after indicator writes; BRICS windows are inclusive (period_type, start_year,
+# end_year), as in jordan.ipynb
+ANALYSIS_MATERIALIZE_ON_WRITE = True
+ANALYSIS_BRICS_PERIODS = [("pre-brics", 1990, 2010), ("post-brics", 2010, 2023)]
+# A year is volatile when its YoY delta is ANALYSIS_VOLATILITY_Z standard deviations from the
+# previous ANALYSIS_VOLATILITY_WINDOW years' deltas (an outlier past ANALYSIS_OUTLIER_Z)
+ANALYSIS_VOLATILITY_WINDOW = 10
+ANALYSIS_VOLATILITY_MIN_PERIODS = 5
+ANALYSIS_VOLATILITY_Z = 2.0
+ANALYSIS_OUTLIER_Z = 3.0
+# JSON renderer for api/*: "auto" uses orjson when installed, else the stdlib encoder ("json");
+# floats are rounded to ANALYSIS_JSON_FLOAT_DIGITS decimals unless a request passes ?digits=N
+ANALYSIS_JSON_BACKEND = "auto"
+ANALYSIS_JSON_FLOAT_DIGITS = None
+# Responses under these path prefixes are gzip/brotli encoded once they reach
+# ANALYSIS_COMPRESS_MIN_BYTES (streamed CSV exports always are)
+ANALYSIS_COMPRESS_PATHS = ("/api/", "/database/export/")
+ANALYSIS_COMPRESS_MIN_BYTES = 1024
+# Per-request wall/DB time, query and duplicate-query counts and response size: reported in a
+# Server-Timing header and as Prometheus histograms at /metrics (off by default)
+ANALYSIS_INSTRUMENTATION = False
+# Area served by the curated EconomicIndicator tables; other areas read from Observation
+ANALYSIS_HOME_AREA = "ZAF"
+# Wide-format World Bank files (one row per country, one column per year) loaded by
+# `manage.py ingest_worldbank`; keys are the indicator codes stored on Observation
+ANALYSIS_DATASETS_DIR = BASE_DIR.parent.parent / "python_analytics" / "datasets"
+WORLD_BANK_DATASETS = {
+    "gdp": ANALYSIS_DATASETS_DIR / "GDP.csv",
+    "inflation": ANALYSIS_DATASETS_DIR / "Inflation1.csv",
+}
+# float64 area x year matrices of the WDI CSVs (`manage.py convert_worldbank`), memory-mapped on
+# load; ingest_worldbank reads these instead of re-parsing a CSV they were converted from
+ANALYSIS_MATRIX_DIR = BASE_DIR / "matrices"
+# Partitioned Parquet snapshots of Observation (`manage.py snapshot_observations`, needs pyarrow);
+# snapshots.load() reads them for bulk / notebook loads; per-area series stay on the database
+ANALYSIS_SNAPSHOT_DIR = BASE_DIR / "snapshots"
+# Rolling / cross-correlation results kept per process (least recently used evicted first)
+ANALYSIS_ANALYTICS_CACHE_SIZE = 256